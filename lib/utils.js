@@ -1,4 +1,5 @@
 const hashSync = require('bcryptjs').hashSync;
+const createHash = require('crypto').createHash;
 const randomBytes = require('crypto').randomBytes;
 const Deepcopy = require('deepcopy');
 const Fs = require('fs');
@@ -6,6 +7,7 @@ const Fs = require('fs');
 const saltRounds = 10;
 
 const {
+  eventAuxDataTable,
   loweringsTable,
   cruisesTable
 } = require('../config/db_constants');
@@ -52,6 +54,23 @@ const addEventRecordIDs = async (request, records) => {
 
 };
 
+// Extend an events query so that events whose aux_data records changed since
+// modified_since are matched as well as events that changed themselves.
+const addAuxDataChangesToQuery = async (request, query) => {
+
+  if (!request.query.modified_since) {
+    return query;
+  }
+
+  const modified_since = new Date(request.query.modified_since);
+  const event_ids = await request.mongo.db.collection(eventAuxDataTable).distinct('event_id', { modified_ts: { $gte: modified_since } });
+
+  delete query.modified_ts;
+  query.$or = [{ modified_ts: { $gte: modified_since } }, { _id: { $in: event_ids } }];
+
+  return query;
+};
+
 const arrayMove = (arr, old_index, new_index) => {
 
   if (new_index >= arr.length) {
@@ -65,6 +84,14 @@ const arrayMove = (arr, old_index, new_index) => {
   return arr; // for testing
 };
 
+// Build a strong entity tag from a response payload so clients can revalidate
+// cached responses with If-None-Match and receive a 304 when unchanged.
+const buildETag = (payload) => {
+
+  const body = (typeof payload === 'string') ? payload : JSON.stringify(payload);
+  return createHash('sha1').update(body).digest('hex');
+};
+
 const buildEventCSVHeaders = (flat_events) => {
 
   let csv_headers = flat_events.reduce((headers, event) => {
@@ -170,6 +197,11 @@ const buildEventsQuery = (request, start_ts = new Date('1970-01-01T00:00:00.000Z
     query.ts.$lte = stop_ts;
   }
 
+  //Change filtering
+  if (request.query.modified_since) {
+    query.modified_ts = { $gte: new Date(request.query.modified_since) };
+  }
+
   // console.log("query:", query);
   return query;
 };
@@ -236,6 +268,7 @@ const flattenEventObjs = (event_objs) => {
     });
 
     delete copied_event.event_options;
+    delete copied_event.modified_ts;
 
     copied_event.ts = copied_event.ts.toISOString();
     copied_event.id = copied_event.id.toString('hex');
@@ -353,7 +386,9 @@ const rmDir = (dirPath) => {
 };
 
 module.exports = {
+  addAuxDataChangesToQuery,
   addEventRecordIDs,
+  buildETag,
   buildEventCSVHeaders,
   buildEventsQuery,
   flattenEventObjs,
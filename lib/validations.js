@@ -245,27 +245,39 @@ const auxDataQuery = Joi.object({
   freetext: Joi.alternatives().try(
     Joi.string(),
     Joi.array().items(Joi.string())
-  ).optional()
+  ).optional(),
+  modified_since: Joi.date().iso().optional()
 }).optional().label('auxDataQuery');
 
 const auxDataCreatePayload = Joi.object({
   id: Joi.string().length(24).optional(),
   event_id: Joi.string().length(24).required(),
   data_source: Joi.string().min(1).max(100).required(),
-  data_array: Joi.array().items(auxDataDataItem)
+  data_array: Joi.array().items(auxDataDataItem),
+  modified_ts: Joi.date().iso().optional()
 }).label('auxDataCreatePayload');
 
+const auxDataBulkPayload = Joi.array().items(auxDataCreatePayload).min(1).max(1000).required().label('auxDataBulkPayload');
+
+const auxDataBulkResponse = Joi.object({
+  insertedCount: Joi.number().integer(),
+  updatedCount: Joi.number().integer(),
+  skippedCount: Joi.number().integer()
+}).label('auxDataBulkResponse');
+
 const auxDataUpdatePayload = Joi.object({
   event_id: Joi.string().length(24).optional(),
   data_source: Joi.string().min(1).max(100).optional(),
-  data_array: Joi.array().items(auxDataDataItem).optional()
+  data_array: Joi.array().items(auxDataDataItem).optional(),
+  modified_ts: Joi.date().iso().optional()
 }).required().min(1).label('auxDataUpdatePayload');
 
 const auxDataResponse = Joi.object({
   id: Joi.object(),
   event_id: Joi.object(),
   data_source: Joi.string(),
-  data_array: Joi.array().items(auxDataDataItem)
+  data_array: Joi.array().items(auxDataDataItem),
+  modified_ts: Joi.date().iso().optional()
 }).label('auxDataResponse');
 
 const auxDataSuccessResponse = Joi.alternatives().try(
@@ -297,8 +309,10 @@ const eventExportResponse = Joi.object({
         Joi.number()
       ),
       data_uom: Joi.string()
-    }))
+    })),
+    modified_ts: Joi.date().iso().optional()
   })),
+  modified_ts: Joi.date().iso().optional(),
   cruise_id: Joi.string().optional(),
   lowering_id: Joi.string().optional()
 }).label('eventExportSuccessResponse');
@@ -328,7 +342,8 @@ const eventExportQuery = Joi.object({
     Joi.array().items(Joi.string()).optional()
   ).optional(),
   freetext: Joi.string().optional(),
-  add_record_ids: Joi.boolean().optional()
+  add_record_ids: Joi.boolean().optional(),
+  modified_since: Joi.date().iso().optional()
 }).optional().label('eventExportQuery');
 
 const eventExportSingleQuery = Joi.object({
@@ -419,6 +434,10 @@ const eventParam = Joi.object({
   id: Joi.string().length(24).required()
 }).label('eventParam');
 
+const eventIDsPayload = Joi.object({
+  ids: Joi.array().items(Joi.string().length(24)).min(1).max(1000).required()
+}).label('eventIDsPayload');
+
 const eventCountSuccessResponse = Joi.object({
   events: Joi.number().integer()
 }).label('eventCountSuccessResponse');
@@ -446,7 +465,8 @@ const eventQuery = Joi.object({
     Joi.string(),
     Joi.array().items(Joi.string()).optional()
   ),
-  add_record_ids: Joi.boolean().optional()
+  add_record_ids: Joi.boolean().optional(),
+  modified_since: Joi.date().iso().optional()
 }).optional().label('eventQuery');
 
 const eventResponse = Joi.object({
@@ -459,6 +479,7 @@ const eventResponse = Joi.object({
     event_option_value: Joi.string().allow('')
   })),
   event_free_text: Joi.string().allow(''),
+  modified_ts: Joi.date().iso().optional(),
   cruise_id: Joi.string().optional(),
   lowering_id: Joi.string().optional()
 }).label('eventResponse');
@@ -483,7 +504,8 @@ const eventCreatePayload = Joi.object({
     event_option_name: Joi.string().required(),
     event_option_value: Joi.string().allow('').required()
   })).optional(),
-  event_free_text: Joi.string().allow('').optional()
+  event_free_text: Joi.string().allow('').optional(),
+  modified_ts: Joi.date().iso().optional()
 }).label('eventCreatePayload');
 
 const eventCreateResponse = Joi.object({
@@ -500,7 +522,8 @@ const eventUpdatePayload = Joi.object({
     event_option_name: Joi.string().required(),
     event_option_value: Joi.string().allow('').required()
   })).optional(),
-  event_free_text: Joi.string().allow('').optional()
+  event_free_text: Joi.string().allow('').optional(),
+  modified_ts: Joi.date().iso().optional()
 }).required().min(1).label('eventUpdateResponse');
 
 
@@ -642,6 +665,8 @@ const userSuccessResponse = Joi.alternatives().try(
 module.exports = {
   authorizationHeader,
   autoLoginPayload,
+  auxDataBulkPayload,
+  auxDataBulkResponse,
   auxDataCreatePayload,
   auxDataDataItem,
   auxDataParam,
@@ -675,6 +700,7 @@ module.exports = {
   eventExportQuery,
   eventExportSingleQuery,
   eventExportSuccessResponse,
+  eventIDsPayload,
   eventParam,
   eventQuery,
   eventSingleQuery,
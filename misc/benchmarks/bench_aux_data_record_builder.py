@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+'''
+FILE:           bench_aux_data_record_builder.py
+
+DESCRIPTION:    Offline benchmark of the SealogInfluxAuxDataRecordBuilder
+                record building paths fed by FakeInfluxClient.  Covers the
+                inserter's INLINE_CONFIG seapath case and a large multi-field
+                config at 1, 1k and 100k events and reports the per-event
+                latency (with and without the time spent in the fake
+                influxDB), the peak memory allocated (on up to 1k events) and
+                the queries issued.
+                _build_query and _build_aux_data_dict are also timed on their
+                own.
+
+BUGS:
+NOTES:          Requires misc/influx_sealog/settings.py.  No influxDB server
+                is contacted.  The vectorized path requires pandas.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import time
+import timeit
+import logging
+import tracemalloc
+from datetime import timedelta
+import yaml
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.benchmarks.fake_influx import DATA_START, FakeInfluxClient
+from misc.influx_sealog import vectorized
+from misc.influx_sealog.aux_data_record_builder import QUERY_LOOKBACK, TS_FORMAT, SealogInfluxAuxDataRecordBuilder
+
+DEFAULT_SIZES = (1, 1000, 100000)
+
+MODES = ('per_event', 'batch', 'vectorized')
+
+# Seconds between the synthetic events.
+EVENT_INTERVAL = 1.3
+
+# tracemalloc slows the record building ~10x, the peak memory is measured
+# on the first ALLOCATION_SAMPLE events only.
+ALLOCATION_SAMPLE = 1000
+
+# The INLINE_CONFIG of sealog_aux_data_inserter_influx.
+SEAPATH_CONFIG = yaml.safe_load('''
+data_source: realtimeVesselPosition
+query_measurements:
+    - seapath1
+aux_record_lookup:
+    S1HeadingTrue:
+        name: heading
+        uom: deg
+        round: 3
+    S1Latitude:
+        name: latitude
+        uom: ddeg
+        round: 6
+        modify:
+            -
+                test:
+                    -
+                        field: S1NorS
+                        eq: "S"
+                operation:
+                    -
+                        multiply: -1
+    S1Longitude:
+        name: longitude
+        uom: deg
+        round: 6
+        modify:
+            -
+                test:
+                    -
+                        field: S1EorW
+                        eq: "W"
+                operation:
+                    -
+                        multiply: -1
+    S1NorS:
+        no_output: true
+    S1EorW:
+        no_output: true
+''')
+
+SEAPATH_SERIES = {
+    'seapath1': {
+        'S1HeadingTrue': (1.0, 'float'),
+        'S1Latitude': (1.0, 'float'),
+        'S1Longitude': (1.0, 'float'),
+        'S1NorS': (1.0, 'ns'),
+        'S1EorW': (1.0, 'ew')
+    }
+}
+
+
+def multi_field_case(measurements=3, fields=16):
+    '''
+    Return the (config, series) of a large config reading fields float
+    fields from each of measurements measurements, a quarter of them with a
+    modify rule, plus an integer counter and a no_output flag field.
+    '''
+
+    aux_record_lookup = {}
+    series = {}
+
+    for measurement_idx in range(measurements):
+        measurement = 'sensor{}'.format(measurement_idx)
+        flag = 'M{}Flag'.format(measurement_idx)
+
+        series[measurement] = {flag: (2.0, 'ns'), 'M{}Count'.format(measurement_idx): (1.0, 'int')}
+        aux_record_lookup[flag] = {'no_output': True}
+        aux_record_lookup['M{}Count'.format(measurement_idx)] = {'name': 'count_{}'.format(measurement_idx)}
+
+        for field_idx in range(fields):
+            field = 'M{}F{}'.format(measurement_idx, field_idx)
+            series[measurement][field] = (0.5 + field_idx % 3, 'float')
+
+            lookup = {'name': field.lower(), 'uom': 'unit', 'round': 1 + field_idx % 4}
+
+            if field_idx % 4 == 0:
+                lookup['modify'] = [{
+                    'test': [{'field': flag, 'eq': 'S'}, {'field': field, 'gt': 900}],
+                    'operation': [{'multiply': -1}, {'add': 10}]
+                }]
+
+            aux_record_lookup[field] = lookup
+
+    config = {
+        'data_source': 'multiField',
+        'query_measurements': list(series),
+        'aux_record_lookup': aux_record_lookup
+    }
+
+    return config, series
+
+
+def build_events(count):
+    '''
+    Return count synthetic events, EVENT_INTERVAL seconds apart.
+    '''
+
+    first = DATA_START + QUERY_LOOKBACK
+
+    return [
+        {'id': '{:024x}'.format(idx), 'ts': (first + timedelta(seconds=idx * EVENT_INTERVAL)).strftime(TS_FORMAT)}
+        for idx in range(count)
+    ]
+
+
+def _run_mode(builder, events, mode):
+    '''
+    Build the aux_data records of the events with the given mode, returns
+    the number of records.
+    '''
+
+    if mode == 'per_event':
+        return sum(1 for event in events if builder.build_aux_data_record(event))
+
+    return sum(1 for _ in builder.build_aux_data_records(events, vectorized_mode=mode == 'vectorized'))
+
+
+def run_case(config, series, count, mode, allocations=True):
+    '''
+    Benchmark one config, event count and mode.  Returns a dict of results.
+    '''
+
+    client = FakeInfluxClient(series)
+    events = build_events(count)
+
+    # warm up, the first vectorized call pays for the pandas imports
+    _run_mode(SealogInfluxAuxDataRecordBuilder(client, config), events[:1], mode)
+    client.reset()
+
+    builder = SealogInfluxAuxDataRecordBuilder(client, config)
+
+    started = time.perf_counter()
+    records = _run_mode(builder, events, mode)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        'data_source': config['data_source'],
+        'events': count,
+        'mode': mode,
+        'records': records,
+        'queries': client.queries,
+        'us_per_event': elapsed / count * 1e6,
+        'builder_us_per_event': (elapsed - client.query_seconds) / count * 1e6
+    }
+
+    if allocations:
+        builder = SealogInfluxAuxDataRecordBuilder(client, config)
+
+        tracemalloc.start()
+        _run_mode(builder, events[:ALLOCATION_SAMPLE], mode)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result['peak_kib'] = peak / 1024
+
+    return result
+
+
+def run_micro(config, series, number=10000):
+    '''
+    Time _build_query and _build_aux_data_dict on their own.  Returns the
+    per-call cost in microseconds.
+    '''
+
+    client = FakeInfluxClient(series)
+    builder = SealogInfluxAuxDataRecordBuilder(client, config)
+    event = build_events(1)[0]
+
+    influx_data = {}
+
+    for table in client.query(query=builder._build_query(event['ts'])): # pylint: disable=protected-access
+        for record in table.records:
+            influx_data[record.get_field()] = record.get_value()
+
+    build_query = min(timeit.repeat(lambda: builder._build_query(event['ts']), number=number, repeat=5)) # pylint: disable=protected-access
+    build_dict = min(timeit.repeat(lambda: builder._build_aux_data_dict(event['id'], influx_data), number=number, repeat=5)) # pylint: disable=protected-access
+
+    return {
+        'data_source': config['data_source'],
+        'build_query_us': build_query / number * 1e6,
+        'build_aux_data_dict_us': build_dict / number * 1e6
+    }
+
+
+# -------------------------------------------------------------------------------------
+# Required python code for running the script as a stand-alone utility
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='aux_data record builder benchmark')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='event counts to benchmark')
+    parser.add_argument('-m', '--modes', nargs='+', choices=MODES, default=list(MODES), help='record building paths to benchmark')
+    parser.add_argument('--max_per_event', type=int, default=DEFAULT_SIZES[-1], help='skip the per_event path above this many events')
+    parser.add_argument('--skip_allocations', action='store_true', help='do not measure the peak memory (faster)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+
+    parsed_args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    cases = [(SEAPATH_CONFIG, SEAPATH_SERIES), multi_field_case()]
+    modes = [mode for mode in parsed_args.modes if mode != 'vectorized' or vectorized.HAS_PANDAS]
+
+    results = []
+    micro = [run_micro(config, series) for config, series in cases]
+
+    for config, series in cases:
+        for size in parsed_args.sizes:
+            for mode in modes:
+                if mode == 'per_event' and size > parsed_args.max_per_event:
+                    continue
+
+                results.append(run_case(config, series, size, mode, not parsed_args.skip_allocations))
+
+    if parsed_args.json:
+        print(json.dumps({'micro': micro, 'results': results}, indent=2))
+        sys.exit(0)
+
+    for row in micro:
+        print("{:<24} _build_query: {:.2f} us  _build_aux_data_dict: {:.2f} us".format(row['data_source'], row['build_query_us'], row['build_aux_data_dict_us']))
+
+    print()
+    print("{:<24}{:>8} {:<11}{:>9}{:>9}{:>12}{:>14}{:>12}".format('data_source', 'events', 'mode', 'records', 'queries', 'us/event', 'builder us/ev', 'peak KiB*'))
+
+    for row in results:
+        print("{:<24}{:>8} {:<11}{:>9}{:>9}{:>12.1f}{:>14.1f}{:>12}".format(
+            row['data_source'], row['events'], row['mode'], row['records'], row['queries'], row['us_per_event'], row['builder_us_per_event'],
+            '{:.0f}'.format(row['peak_kib']) if 'peak_kib' in row else '-'))
+
+    print()
+    print("* measured on the first {} events".format(ALLOCATION_SAMPLE))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+'''
+FILE:           bench_aux_record_lookup.py
+
+DESCRIPTION:    Micro-benchmark comparing the per-record cost of building an
+                aux_data record by interpreting the aux_record_lookup rules
+                (the original implementation, reproduced below) against the
+                rules compiled by SealogInfluxAuxDataRecordBuilder.
+
+BUGS:
+NOTES:          Requires misc/influx_sealog/settings.py.  No influxDB server
+                is contacted.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import timeit
+import logging
+import yaml
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.influx_sealog.aux_data_record_builder import SealogInfluxAuxDataRecordBuilder
+
+AUX_DATA_CONFIG = yaml.safe_load('''
+data_source: realtimeVesselPosition
+query_measurements:
+    - seapath1
+aux_record_lookup:
+    S1HeadingTrue:
+        name: heading
+        uom: deg
+        round: 3
+    S1Latitude:
+        name: latitude
+        uom: ddeg
+        round: 6
+        modify:
+            -
+                test:
+                    -
+                        field: S1NorS
+                        eq: "S"
+                operation:
+                    -
+                        multiply: -1
+    S1Longitude:
+        name: longitude
+        uom: deg
+        round: 6
+        modify:
+            -
+                test:
+                    -
+                        field: S1EorW
+                        eq: "W"
+                operation:
+                    -
+                        multiply: -1
+    S1Depth:
+        name: depth
+        uom: m
+        round: 1
+        modify:
+            -
+                test:
+                    -
+                        field: S1Depth
+                        gt: 6000
+                operation:
+                    -
+                        subtract: 6000
+                    -
+                        divide: 2
+    S1NorS:
+        no_output: true
+    S1EorW:
+        no_output: true
+''')
+
+INFLUX_DATA = {
+    'S1HeadingTrue': 123.45678,
+    'S1Latitude': 41.5243123,
+    'S1Longitude': 70.6712345,
+    'S1Depth': 6543.21,
+    'S1NorS': 'N',
+    'S1EorW': 'W'
+}
+
+
+class _NoQueryClient():
+    '''
+    Placeholder for the influxDB client, the benchmark never runs a query.
+    '''
+
+    def query_api(self):
+        '''
+        Return the query api.
+        '''
+        return self
+
+
+def legacy_build_aux_data_dict(aux_record_lookup, data_source, event_id, influx_data): # pylint: disable=too-many-branches
+    '''
+    The aux_record_lookup interpreter used before the rules were compiled,
+    with the gte/lte operands fixed so both implementations agree.
+    '''
+
+    aux_data_record = {
+        'event_id': event_id,
+        'data_source': data_source,
+        'data_array': []
+    }
+
+    logging.debug("raw values: %s", json.dumps(influx_data, indent=2))
+
+    if not influx_data:
+        return None
+
+    for key, value in aux_record_lookup.items(): # pylint: disable=too-many-nested-blocks
+        try:
+            if "no_output" in value and value['no_output'] is True:
+                continue
+
+            output_value = influx_data[key]
+
+            if "modify" in value:
+                logging.debug("modify found in record")
+                for mod_op in value['modify']:
+                    test_result = True
+
+                    if 'test' in mod_op:
+                        logging.debug("test found in mod_op")
+                        test_result = False
+
+                        for test in mod_op['test']:
+                            logging.debug(json.dumps(test))
+
+                            if 'field' in test:
+
+                                if test['field'] not in influx_data:
+                                    logging.error("test field data not in influx query")
+                                    return None
+
+                                if 'eq' in test and influx_data[test['field']] == test['eq']:
+                                    test_result = True
+                                    break
+
+                                if 'gt' in test and influx_data[test['field']] > test['gt']:
+                                    test_result = True
+                                    break
+
+                                if 'gte' in test and influx_data[test['field']] >= test['gte']:
+                                    test_result = True
+                                    break
+
+                                if 'lt' in test and influx_data[test['field']] < test['lt']:
+                                    test_result = True
+                                    break
+
+                                if 'lte' in test and influx_data[test['field']] <= test['lte']:
+                                    test_result = True
+                                    break
+
+                                if 'ne' in test and influx_data[test['field']] != test['ne']:
+                                    test_result = True
+                                    break
+
+                    if test_result and 'operation' in mod_op:
+                        logging.debug("operation found in mod_op")
+                        for operan in mod_op['operation']:
+
+                            if 'add' in operan:
+                                output_value += operan['add']
+
+                            if 'subtract' in operan:
+                                output_value -= operan['subtract']
+
+                            if 'multiply' in operan:
+                                output_value *= operan['multiply']
+
+                            if 'divide' in operan:
+                                output_value /= operan['divide']
+
+            aux_data_record['data_array'].append({
+                'data_name': value['name'],
+                'data_value': str(round(output_value, value['round'])) if 'round' in value else str(output_value),
+                'data_uom': value['uom'] if 'uom' in value else ''
+            })
+        except Exception as err:
+            logging.warning("Problem adding %s", key)
+            logging.debug(str(err))
+            continue
+
+    if len(aux_data_record['data_array']) > 0:
+        return aux_data_record
+
+    return None
+
+
+def run_benchmark(number):
+    '''
+    Time both implementations and return the (legacy, compiled) per-record
+    cost in microseconds.
+    '''
+
+    builder = SealogInfluxAuxDataRecordBuilder(_NoQueryClient(), AUX_DATA_CONFIG)
+
+    legacy_record = legacy_build_aux_data_dict(AUX_DATA_CONFIG['aux_record_lookup'], AUX_DATA_CONFIG['data_source'], 'event', INFLUX_DATA)
+    compiled_record = builder._build_aux_data_dict('event', INFLUX_DATA) # pylint: disable=protected-access
+
+    if legacy_record != compiled_record:
+        raise RuntimeError("compiled aux_record_lookup output differs from the legacy output")
+
+    legacy = min(timeit.repeat(lambda: legacy_build_aux_data_dict(AUX_DATA_CONFIG['aux_record_lookup'], AUX_DATA_CONFIG['data_source'], 'event', INFLUX_DATA), number=number, repeat=5))
+    compiled = min(timeit.repeat(lambda: builder._build_aux_data_dict('event', INFLUX_DATA), number=number, repeat=5)) # pylint: disable=protected-access
+
+    return legacy / number * 1e6, compiled / number * 1e6
+
+
+# -------------------------------------------------------------------------------------
+# Required python code for running the script as a stand-alone utility
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='aux_record_lookup micro-benchmark')
+    parser.add_argument('-n', '--number', type=int, default=100000, help='records built per timing run')
+
+    parsed_args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    legacy_us, compiled_us = run_benchmark(parsed_args.number)
+
+    print("legacy:   {:.2f} us/record".format(legacy_us))
+    print("compiled: {:.2f} us/record".format(compiled_us))
+    print("speedup:  {:.2f}x".format(legacy_us / compiled_us))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+'''
+FILE:           fake_influx.py
+
+DESCRIPTION:    This script contains FakeInfluxClient, a stand-in for the
+                influxDB client used by the benchmarks.  It answers the Flux
+                queries built by SealogInfluxAuxDataRecordBuilder and
+                InfluxQueryPlanner with synthetic FluxTable/FluxRecord objects
+                so the record building path can be measured without a live
+                influxDB.
+
+BUGS:
+NOTES:          Only the parts of the Flux queries built by this repo are
+                understood: the range, the measurement/field filters and
+                limit(n:1).  The data is generated on the fly, every field is
+                sampled on a fixed period starting at DATA_START.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import re
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from influxdb_client.client.flux_table import FluxRecord, FluxTable, TableList
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# Time of the first synthetic value of every field.
+DATA_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+_RANGE = re.compile(r'range\(start: (\S+), stop: ([^)\s]+)\)')
+_MEASUREMENT_FIELDS = re.compile(r'r\["_measurement"\] == "([^"]+)" and \(([^)]*)\)')
+_MEASUREMENT = re.compile(r'r\["_measurement"\] == "([^"]+)"')
+_FIELD = re.compile(r'r\["_field"\] == "([^"]+)"')
+
+
+def synthetic_value(kind, index):
+    '''
+    Return the value of the index-th sample of a field of the given kind:
+    'float', 'int', 'ns' (N/S hemisphere) or 'ew' (E/W hemisphere).
+    '''
+
+    if kind == 'int':
+        return index % 10000
+
+    if kind == 'ns':
+        return 'S' if index % 7 == 0 else 'N'
+
+    if kind == 'ew':
+        return 'W' if index % 5 == 0 else 'E'
+
+    return 1000.0 * math.sin(index / 100.0) + index % 97 / 7.0
+
+
+class FakeInfluxClient():
+    '''
+    Class that stands in for both the InfluxDBClient and its query_api.
+    series maps measurement -> field -> (period in seconds, kind).  queries
+    counts the queries answered and query_seconds the time spent answering
+    them.
+    '''
+
+    def __init__(self, series):
+
+        self._series = series
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def query_api(self):
+        '''
+        Return the query api, the client itself.
+        '''
+        return self
+
+    def reset(self):
+        '''
+        Reset the query counters.
+        '''
+
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def _selected(self, query):
+        '''
+        Return the (measurement, field) pairs selected by the query filters.
+        '''
+
+        pairs = _MEASUREMENT_FIELDS.findall(query)
+
+        if pairs:
+            selected = [(measurement, field) for measurement, fields in pairs for field in _FIELD.findall(fields)]
+        else:
+            selected = [(measurement, field) for measurement in _MEASUREMENT.findall(query) for field in _FIELD.findall(query)]
+
+        return [(measurement, field) for measurement, field in selected if field in self._series.get(measurement, {})]
+
+    def _samples(self, query):
+        '''
+        Yield (measurement, field, [(time, value), ...]) for the query.
+        '''
+
+        match = _RANGE.search(query)
+        start = datetime.strptime(match.group(1), TS_FORMAT).replace(tzinfo=timezone.utc)
+        stop = datetime.strptime(match.group(2), TS_FORMAT).replace(tzinfo=timezone.utc)
+        latest_only = 'limit(n:1)' in query
+
+        for measurement, field in self._selected(query):
+            period, kind = self._series[measurement][field]
+
+            first = max(math.ceil((start - DATA_START).total_seconds() / period), 0)
+            last = math.ceil((stop - DATA_START).total_seconds() / period) - 1
+
+            if last < first:
+                continue
+
+            indexes = [last] if latest_only else range(first, last + 1)
+
+            yield measurement, field, [(DATA_START + timedelta(seconds=index * period), synthetic_value(kind, index)) for index in indexes]
+
+    def query(self, query=None, **kwargs): # pylint: disable=unused-argument
+        '''
+        Return the query result as a TableList, one FluxTable per
+        measurement/field.
+        '''
+
+        started = time.perf_counter()
+        tables = TableList()
+
+        for measurement, field, samples in self._samples(query):
+            table = FluxTable()
+            table_id = len(tables)
+
+            table.records = [
+                FluxRecord(table_id, {'result': '_result', 'table': table_id, '_time': sample_time, '_value': value, '_field': field, '_measurement': measurement})
+                for sample_time, value in samples
+            ]
+
+            tables.append(table)
+
+        self.queries += 1
+        self.query_seconds += time.perf_counter() - started
+
+        return tables
+
+    def query_data_frame(self, query=None, **kwargs): # pylint: disable=unused-argument
+        '''
+        Return the query result as DataFrames, one per value type like the
+        influxDB client does for tables with different schemas.
+        '''
+
+        started = time.perf_counter()
+        columns = {}
+
+        for measurement, field, samples in self._samples(query):
+            frame = columns.setdefault(type(samples[0][1]).__name__, {'_time': [], '_measurement': [], '_field': [], '_value': []})
+
+            for sample_time, value in samples:
+                frame['_time'].append(sample_time)
+                frame['_measurement'].append(measurement)
+                frame['_field'].append(field)
+                frame['_value'].append(value)
+
+        frames = [pd.DataFrame(frame) for frame in columns.values()]
+
+        self.queries += 1
+        self.query_seconds += time.perf_counter() - started
+
+        if len(frames) == 1:
+            return frames[0]
+
+        return frames if frames else pd.DataFrame()
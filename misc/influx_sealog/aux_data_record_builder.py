@@ -18,16 +18,304 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 '''
 import sys
 import json
+import bisect
 import logging
-from datetime import datetime, timedelta
+import operator
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
 from urllib3.exceptions import NewConnectionError
 from influxdb_client.rest import ApiException
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.influx_sealog import vectorized
+from misc.influx_sealog.query_cache import QueryResultCache, parse_query_resolution, quantize_ts
 from misc.influx_sealog.settings import INFLUX_SERVER_URL, INFLUX_TOKEN, INFLUX_ORG, INFLUX_BUCKET
 
+# How far back from the event ts to look for influx data, unless set with
+# query_lookback in the data source config.
+QUERY_LOOKBACK = timedelta(minutes=1)
+
+# Maximum time span of the events retrieved with a single influx query by
+# build_aux_data_records.
+DEFAULT_QUERY_WINDOW = timedelta(minutes=10)
+
+TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# aux_record_lookup modify test comparisons, in the order they are evaluated.
+TEST_OPERATORS = {
+    'eq': operator.eq,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'ne': operator.ne
+}
+
+# aux_record_lookup modify operations, in the order they are applied.
+OPERATIONS = {
+    'add': operator.add,
+    'subtract': operator.sub,
+    'multiply': operator.mul,
+    'divide': operator.truediv
+}
+
+
+class MissingTestFieldError(KeyError):
+    '''
+    Raised when the field used by a modify test is not in the influx data.
+    '''
+
+
+def _compile_test(key, test):
+    '''
+    Validate a modify test and return it as a (field, comparisons) tuple where
+    comparisons is a list of (function, operand) tuples.
+    '''
+
+    if not isinstance(test, dict) or 'field' not in test:
+        raise ValueError("aux_record_lookup {}: modify test is missing the field".format(key))
+
+    unknown = set(test) - set(TEST_OPERATORS) - {'field'}
+    if unknown:
+        raise ValueError("aux_record_lookup {}: unknown modify test(s): {}".format(key, ', '.join(sorted(unknown))))
+
+    return test['field'], [(compare, test[name]) for name, compare in TEST_OPERATORS.items() if name in test]
+
+
+def _compile_operations(key, operations):
+    '''
+    Validate the modify operations and return them as a list of (function,
+    operand) tuples.
+    '''
+
+    compiled = []
+
+    for operan in operations:
+        unknown = set(operan) - set(OPERATIONS) if isinstance(operan, dict) else {str(operan)}
+        if unknown:
+            raise ValueError("aux_record_lookup {}: unknown modify operation(s): {}".format(key, ', '.join(sorted(unknown))))
+
+        for name, operation in OPERATIONS.items():
+            if name not in operan:
+                continue
+
+            if isinstance(operan[name], bool) or not isinstance(operan[name], (int, float)):
+                raise ValueError("aux_record_lookup {}: {} operand must be a number".format(key, name))
+
+            if name == 'divide' and operan[name] == 0:
+                raise ValueError("aux_record_lookup {}: divide by zero".format(key))
+
+            compiled.append((operation, operan[name]))
+
+    return compiled
+
+
+def _build_predicate(field, comparisons):
+    '''
+    Return a predicate(influx_data) that is True if any of the comparisons
+    of the field value is true.
+    '''
+
+    def predicate(influx_data):
+        if field not in influx_data:
+            raise MissingTestFieldError(field)
+
+        field_value = influx_data[field]
+
+        for compare, operand in comparisons:
+            if compare(field_value, operand):
+                return True
+
+        return False
+
+    return predicate
+
+
+def _build_modifier(tests, operations):
+    '''
+    Return a modifier(value, influx_data) that applies the operations to the
+    value if any of the tests are true.  tests is None when the modify entry
+    has no tests.
+    '''
+
+    predicates = [_build_predicate(field, comparisons) for field, comparisons in tests] if tests is not None else None
+
+    def modifier(value, influx_data):
+        if predicates is not None:
+            for predicate in predicates:
+                if predicate(influx_data):
+                    break
+            else:
+                return value
+
+        for operation, operand in operations:
+            value = operation(value, operand)
+
+        return value
+
+    return modifier
+
+
+CompiledLookup = namedtuple('CompiledLookup', ['field', 'data_name', 'data_uom', 'modifiers', 'formatter', 'rules', 'digits'])
+
+
+def compile_aux_record_lookup(aux_record_lookup):
+    '''
+    Validate an aux_record_lookup config and compile each output field into a
+    CompiledLookup.  modifiers and formatter are the callables applied to a
+    single value, rules holds the (tests, operations) of each modify entry
+    for the vectorized path.  Fields with no_output set are left out.  Raises
+    ValueError if the config is invalid.
+    '''
+
+    compiled = []
+
+    for key, value in aux_record_lookup.items():
+
+        # entries without settings are only used by modify tests
+        if not value or value.get('no_output') is True:
+            continue
+
+        if 'name' not in value:
+            raise ValueError("aux_record_lookup {}: missing name".format(key))
+
+        if 'round' in value and (isinstance(value['round'], bool) or not isinstance(value['round'], int)):
+            raise ValueError("aux_record_lookup {}: round must be an integer".format(key))
+
+        rules = [
+            (
+                [_compile_test(key, test) for test in mod_op['test']] if 'test' in mod_op else None,
+                _compile_operations(key, mod_op.get('operation', []))
+            )
+            for mod_op in value.get('modify', [])
+        ]
+
+        digits = value.get('round')
+
+        if digits is not None:
+            formatter = lambda output_value, digits=digits: str(round(output_value, digits))
+        else:
+            formatter = str
+
+        compiled.append(CompiledLookup(key, value['name'], value.get('uom', ''), [_build_modifier(*rule) for rule in rules], formatter, rules, digits))
+
+    return compiled
+
+
+def parse_query_lookback(query_lookback):
+    '''
+    Return the query_lookback of a data source config, seconds or a list of
+    seconds, as a sorted list of timedeltas.  A list is tried in order by the
+    per-event queries, widening the lookback only when the narrower one
+    returns no data.  Raises ValueError if the value is invalid.
+    '''
+
+    if query_lookback is None:
+        return [QUERY_LOOKBACK]
+
+    steps = query_lookback if isinstance(query_lookback, list) else [query_lookback]
+
+    if not steps or any(isinstance(step, bool) or not isinstance(step, (int, float)) or step <= 0 for step in steps):
+        raise ValueError("query_lookback must be a positive number of seconds or a list of them")
+
+    return [timedelta(seconds=step) for step in sorted(set(steps))]
+
+
+def run_query(query_api, query, data_frame=False):
+    '''
+    Run the query using the influxDB query_api.  Returns the query result, as
+    a pandas DataFrame if data_frame is True, or None if the query failed.
+    '''
+
+    try:
+        if data_frame:
+            return query_api.query_data_frame(query=query)
+
+        return query_api.query(query=query)
+
+    except NewConnectionError:
+        logging.error("InfluxDB connection error, verify URL: %s", INFLUX_SERVER_URL)
+
+    except ApiException as err:
+        _, value, _ = sys.exc_info()
+
+        if str(value).startswith("(400)"):
+            logging.error("InfluxDB API error, verify org: %s", INFLUX_ORG)
+        elif str(value).startswith("(401)"):
+            logging.error("InfluxDB API error, verify token: %s", INFLUX_TOKEN)
+        elif str(value).startswith("(404)"):
+            logging.error("InfluxDB API error, verify bucket: %s", INFLUX_BUCKET)
+        else:
+            raise err
+
+    except Exception as err:
+        logging.error("Error with query:")
+        logging.error(query.replace("|>", '\n'))
+        logging.error(str(err))
+
+    return None
+
+
+def group_events(events, window):
+    '''
+    Sort the events by ts and group them into lists of (ts, event) tuples
+    spanning no more than window.  Yields (first event ts, last event ts,
+    group).
+    '''
+
+    timed_events = []
+
+    for event in events:
+        try:
+            timed_events.append((datetime.strptime(event['ts'], TS_FORMAT).replace(tzinfo=timezone.utc), event))
+        except (KeyError, ValueError) as err:
+            logging.warning("Skipping event with invalid ts: %s", event.get('id'))
+            logging.debug(str(err))
+
+    timed_events.sort(key=lambda timed_event: timed_event[0])
+
+    group = []
+
+    for event_ts, event in timed_events:
+        if group and event_ts - group[0][0] > window:
+            yield group[0][0], group[-1][0], group
+            group = []
+
+        group.append((event_ts, event))
+
+    if group:
+        yield group[0][0], group[-1][0], group
+
+
+def build_timed_values(records):
+    '''
+    Return the influx query records as a dict of (measurement, field) ->
+    (time, value), the last record of each measurement/field wins.
+    '''
+
+    return {(record.get_measurement(), record.get_field()): (record.get_time(), record.get_value()) for record in records}
+
+
+def build_series(records):
+    '''
+    Return the influx query records as a dict of field -> (times, values)
+    with the times sorted in ascending order.
+    '''
+
+    series = {}
+
+    for record in records:
+        series.setdefault(record.get_field(), []).append((record.get_time(), record.get_value()))
+
+    for points in series.values():
+        points.sort(key=lambda point: point[0])
+
+    return {field: ([point[0] for point in points], [point[1] for point in points]) for field, points in series.items()}
+
+
 class SealogInfluxAuxDataRecordBuilder():
     '''
     Class that handles the construction of an influxDB query and using the
@@ -39,35 +327,39 @@ class SealogInfluxAuxDataRecordBuilder():
         self._query_measurements = aux_data_config['query_measurements']
         self._query_fields = list(aux_data_config['aux_record_lookup'].keys())
         self._aux_record_lookup = aux_data_config['aux_record_lookup']
+        self._compiled_lookup = compile_aux_record_lookup(self._aux_record_lookup)
         self._data_source = aux_data_config['data_source']
+        self._lookback_steps = parse_query_lookback(aux_data_config.get('query_lookback'))
+        self._query_resolution = parse_query_resolution(aux_data_config.get('query_resolution'))
+        self._query_cache = QueryResultCache()
+        self._lookback_stats = {}
+        self._lookback_stats_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
     @staticmethod
-    def _build_query_range(ts): # pylint: disable=invalid-name
+    def _build_query_range(ts, lookback=QUERY_LOOKBACK): # pylint: disable=invalid-name
         '''
         Builds the temporal range for the influxDB query based on the provided
-        timestamp (ts).
+        timestamp (ts) and lookback.
         '''
         try:
-            start_ts = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S.%fZ") - timedelta(minutes=1)
-            return "start: {}, stop: {}".format(start_ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),ts)
+            start_ts = datetime.strptime(ts, TS_FORMAT) - lookback
+            return "start: {}, stop: {}".format(start_ts.strftime(TS_FORMAT),ts)
         except Exception as err:
             logging.debug(str(err))
             return None
 
-    def _build_query(self, ts): # pylint: disable=invalid-name
+    def _build_query(self, ts, lookback=None): # pylint: disable=invalid-name
         '''
-        Builds the complete influxDB query using the provided timestamp (ts)
-        and the class instance's query_measurements and query_fields values.
+        Builds the complete influxDB query using the provided timestamp (ts),
+        lookback (defaults to the widest lookback) and the class instance's
+        query_measurements and query_fields values.
         '''
 
-        query_range = self._build_query_range(ts)
+        query_range = self._build_query_range(ts, lookback or self.lookback)
 
         try:
-            query = 'from(bucket: "{}")\n'.format(INFLUX_BUCKET)
-            query += '|> range({})\n'.format(query_range)
-            query += '|> filter(fn: (r) => {})\n'.format(' or '.join([ 'r["_measurement"] == "{}"'.format(q_measurement) for q_measurement in self._query_measurements]))
-            query += '|> filter(fn: (r) => {})\n'.format(' or '.join([ 'r["_field"] == "{}"'.format(q_field) for q_field in self._query_fields]))
+            query = self._build_query_filter(query_range)
             query += '|> sort(columns: ["_time"], desc: true)\n'
             query += '|> limit(n:1)'
         except Exception as err:
@@ -80,150 +372,264 @@ class SealogInfluxAuxDataRecordBuilder():
         logging.debug("Query: %s", query)
         return query
 
-    def _build_aux_data_dict(self, event_id, influx_query_result): # pylint: disable=too-many-branches
+    def _build_query_filter(self, query_range):
         '''
-        Internal method to build the sealog aux_data record using the event_id,
-        influx_query_result and the class instance's datasource value.
+        Builds the part of the influxDB query selecting the class instance's
+        query_measurements and query_fields within the query_range.
         '''
 
-        aux_data_record = {
-            'event_id': event_id,
-            'data_source': self._data_source,
-            'data_array': []
-        }
+        query = 'from(bucket: "{}")\n'.format(INFLUX_BUCKET)
+        query += '|> range({})\n'.format(query_range)
+        query += '|> filter(fn: (r) => {})\n'.format(' or '.join([ 'r["_measurement"] == "{}"'.format(q_measurement) for q_measurement in self._query_measurements]))
+        query += '|> filter(fn: (r) => {})\n'.format(' or '.join([ 'r["_field"] == "{}"'.format(q_field) for q_field in self._query_fields]))
 
-        influx_data = {
-        }
+        return query
 
-        for table in influx_query_result:
-            for record in table.records:
+    def _build_window_query(self, start_ts, stop_ts):
+        '''
+        Builds the influxDB query returning all values of the class instance's
+        query_measurements and query_fields between start_ts and stop_ts.
+        '''
 
-                influx_data[record.get_field()] = record.get_value()
+        query_range = "start: {}, stop: {}".format(start_ts.strftime(TS_FORMAT), stop_ts.strftime(TS_FORMAT))
 
-        logging.debug("raw values: %s", json.dumps(influx_data, indent=2))
+        try:
+            query = self._build_query_filter(query_range)
+            query += '|> keep(columns: ["_time", "_field", "_value"])'
+        except Exception as err:
+            logging.error("Error building query string")
+            logging.error(" - Range: %s", query_range)
+            logging.error(" - Measurements: %s", self._query_measurements)
+            logging.error(" - Fields: %s", self._query_fields)
+            raise err
+
+        logging.debug("Query: %s", query)
+        return query
+
+    def _run_query(self, query, data_frame=False):
+        '''
+        Run the query against the influxDB.  Returns the query result, as a
+        pandas DataFrame if data_frame is True, or None if the query failed.
+        '''
+
+        return run_query(self._influxdb_client, query, data_frame)
+
+    def _build_aux_data_dict(self, event_id, influx_data):
+        '''
+        Internal method to build the sealog aux_data record using the event_id,
+        influx_data (field name -> value) and the class instance's compiled
+        aux_record_lookup and datasource values.
+        '''
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("raw values: %s", json.dumps(influx_data, indent=2, default=str))
 
         if not influx_data:
             return None
 
-        for key, value in self._aux_record_lookup.items(): # pylint: disable=too-many-nested-blocks
-            try:
-                if "no_output" in value and value['no_output'] is True:
-                    continue
+        data_array = []
 
+        for key, data_name, data_uom, modifiers, formatter, _, _ in self._compiled_lookup:
+            try:
                 output_value = influx_data[key]
 
-                if "modify" in value:
-                    logging.debug("modify found in record")
-                    for mod_op in value['modify']:
-                        test_result = True
+                for modifier in modifiers:
+                    output_value = modifier(output_value, influx_data)
 
-                        if 'test' in mod_op:
-                            logging.debug("test found in mod_op")
-                            test_result = False
+                data_array.append({
+                    'data_name': data_name,
+                    'data_value': formatter(output_value),
+                    'data_uom': data_uom
+                })
 
-                            for test in mod_op['test']:
-                                logging.debug(json.dumps(test))
+            except MissingTestFieldError:
+                logging.error("test field data not in influx query")
+                return None
 
-                                if 'field' in test:
+            except Exception as err:
+                logging.warning("Problem adding %s", key)
+                logging.debug(str(err))
+                continue
+
+        if len(data_array) > 0:
+            return {
+                'event_id': event_id,
+                'data_source': self._data_source,
+                'data_array': data_array
+            }
+
+        return None
 
-                                    if test['field'] not in influx_data:
-                                        logging.error("test field data not in influx query")
-                                        return None
+    def _record_lookback(self, lookback, count=1):
+        '''
+        Count the lookback needed for count events, None if no data was
+        found.
+        '''
 
-                                    if 'eq' in test and influx_data[test['field']] == test['eq']:
-                                        test_result = True
-                                        break
+        key = lookback.total_seconds() if lookback is not None else 'none'
 
-                                    if 'gt' in test and influx_data[test['field']] > test['gt']:
-                                        test_result = True
-                                        break
+        with self._lookback_stats_lock:
+            self._lookback_stats[key] = self._lookback_stats.get(key, 0) + int(count)
 
-                                    if 'gte' in test and influx_data[test['field']] >= test['gt']:
-                                        test_result = True
-                                        break
+    def select_values(self, event_ts, timed_data, query_lookback):
+        '''
+        Return the influx_data (field name -> value) for the event from the
+        timed_data (field name -> (time, value)) retrieved with a query
+        reaching query_lookback before the event ts (a tz-aware datetime).
+        The narrowest lookback step holding the latest value is used and only
+        the values within that step are kept.  Returns None if a wider query
+        is needed.
+        '''
 
-                                    if 'lt' in test and influx_data[test['field']] < test['lt']:
-                                        test_result = True
-                                        break
+        lookback = None
 
-                                    if 'lte' in test and influx_data[test['field']] <= test['lt']:
-                                        test_result = True
-                                        break
+        if timed_data:
+            age = event_ts - max(value_time for value_time, _ in timed_data.values())
+            lookback = next((step for step in self._lookback_steps if age <= step), None)
 
-                                    if 'ne' in test and influx_data[test['field']] != test['ne']:
-                                        test_result = True
-                                        break
+        if lookback is None or lookback > query_lookback:
+            if query_lookback < self.lookback:
+                return None
 
-                        if test_result and 'operation' in mod_op:
-                            logging.debug("operation found in mod_op")
-                            for operan in mod_op['operation']:
+            self._record_lookback(None)
+            return {}
 
-                                if 'add' in operan:
-                                    output_value += operan['add']
+        self._record_lookback(lookback)
 
-                                if 'subtract' in operan:
-                                    output_value -= operan['subtract']
+        return {field: value for field, (value_time, value) in timed_data.items() if event_ts - value_time <= lookback}
 
-                                if 'multiply' in operan:
-                                    output_value *= operan['multiply']
+    def build_aux_data_record(self, event):
+        '''
+        Build the aux_data record for the given event.  With several lookback
+        steps configured the narrowest query is tried first and widened only
+        when it returns no data.  The event ts is rounded down to the
+        query_resolution and the events in the same bucket share the query
+        results.
+        '''
 
-                                if 'divide' in operan:
-                                    output_value /= operan['divide']
+        try:
+            event_ts = quantize_ts(datetime.strptime(event['ts'], TS_FORMAT).replace(tzinfo=timezone.utc), self._query_resolution)
+        except ValueError as err:
+            logging.warning("Skipping event with invalid ts: %s", event.get('id'))
+            logging.debug(str(err))
+            return None
 
-                aux_data_record['data_array'].append({
-                    'data_name': value['name'],
-                    'data_value': str(round(output_value, value['round'])) if 'round' in value else str(output_value),
-                    'data_uom': value['uom'] if 'uom' in value else ''
-                })
-            except Exception as err:
-                logging.warning("Problem adding %s", key)
-                logging.debug(str(err))
-                continue
+        for lookback in self._lookback_steps:
+            logging.debug("building query")
+            query = self._build_query(event_ts.strftime(TS_FORMAT), lookback)
 
-        if len(aux_data_record['data_array']) > 0:
-            return aux_data_record
+            # run the query against the influxDB, or reuse the result of the
+            # same query
+            query_result = self._query_cache.run(query, self._run_query)
+
+            if query_result is None:
+                return None
+
+            timed_data = {field: timed_value for (_, field), timed_value in build_timed_values(record for table in query_result for record in table.records).items()}
+            influx_data = self.select_values(event_ts, timed_data, lookback)
+
+            if influx_data is not None:
+                return self.build_aux_data_record_from_values(event, influx_data)
 
         return None
 
-    def build_aux_data_record(self, event):
+    def build_aux_data_record_from_values(self, event, influx_data):
         '''
-        Build the aux_data record for the given event.
+        Build the aux_data record for the given event from the influx_data
+        (field name -> value) retrieved for it.
         '''
 
-        logging.debug("building query")
-        query = self._build_query(event['ts'])
+        return self._build_aux_data_dict(event['id'], influx_data)
 
-        logging.debug("Query: %s", query)
-        # run the query against the influxDB
-        try:
-            query_result = self._influxdb_client.query(query=query)
+    def build_window_records(self, group, series):
+        '''
+        Yield the aux_data records of the (ts, event) tuples in the group
+        using a bisect as-of join per event and field on the series (field ->
+        sorted times and values, see build_series).
+        '''
+
+        for event_ts, event in group:
+            timed_data = {}
+
+            for field, (times, values) in series.items():
+
+                # latest value before the event ts, the influx range stop
+                # used by build_aux_data_record is exclusive.
+                idx = bisect.bisect_left(times, event_ts) - 1
 
-        except NewConnectionError:
-            logging.error("InfluxDB connection error, verify URL: %s", INFLUX_SERVER_URL)
+                if idx >= 0 and times[idx] >= event_ts - self.lookback:
+                    timed_data[field] = (times[idx], values[idx])
 
-        except ApiException as err:
-            _, value, _ = sys.exc_info()
+            influx_data = self.select_values(event_ts, timed_data, self.lookback)
+            aux_data_record = self._build_aux_data_dict(event['id'], influx_data)
 
-            if str(value).startswith("(400)"):
-                logging.error("InfluxDB API error, verify org: %s", INFLUX_ORG)
-            elif str(value).startswith("(401)"):
-                logging.error("InfluxDB API error, verify token: %s", INFLUX_TOKEN)
-            elif str(value).startswith("(404)"):
-                logging.error("InfluxDB API error, verify bucket: %s", INFLUX_BUCKET)
+            if aux_data_record:
+                yield aux_data_record
             else:
-                raise err
+                logging.debug("No aux data for event: %s", event['id'])
 
-        except Exception as err:
-            logging.error("Error with query:")
-            logging.error(query.replace("|>", '\n'))
-            logging.error(str(err))
+    def build_window_records_vectorized(self, group, query_frame):
+        '''
+        Return the aux_data records of the (ts, event) tuples in the group,
+        joining the events to the query_frame (_time, _field and _value
+        columns) and applying the compiled aux_record_lookup rules as column
+        operations.
+        '''
 
-        else:
-            aux_data_record = self._build_aux_data_dict(event['id'], query_result)
+        event_times = [event_ts for event_ts, _ in group]
+        data, times = vectorized.as_of_join(event_times, query_frame, self.lookback, with_times=True)
+        data, lookbacks = vectorized.limit_to_lookback(event_times, data, times, self._lookback_steps)
 
-            return aux_data_record
+        for lookback, count in lookbacks.value_counts(dropna=False).items():
+            self._record_lookback(None if vectorized.pd.isna(lookback) else lookback.to_pytimedelta(), count)
 
-        return None
+        event_ids = [event['id'] for _, event in group]
+
+        try:
+            return vectorized.build_aux_data_records(self._compiled_lookup, self._data_source, event_ids, data)
+
+        except (TypeError, ValueError) as err:
+            logging.debug("Vectorized transform failed, building records one at a time: %s", str(err))
+
+        aux_data_records = []
+
+        for event_id, influx_data in zip(event_ids, data.to_dict('records')):
+            aux_data_record = self._build_aux_data_dict(event_id, {field: value for field, value in influx_data.items() if not vectorized.pd.isna(value)})
+
+            if aux_data_record:
+                aux_data_records.append(aux_data_record)
+
+        return aux_data_records
+
+    def build_aux_data_records(self, events, window=DEFAULT_QUERY_WINDOW, vectorized_mode=False):
+        '''
+        Build the aux_data records for the given events.  The events are
+        sorted by ts and grouped into windows spanning no more than window.
+        The influx data for each window is retrieved with a single query and
+        each event is matched to the latest value of each field recorded
+        within the lookback before the event ts, the same values
+        build_aux_data_record would use.  Set vectorized_mode to True to
+        transform each window with pandas/numpy column operations instead of
+        one record at a time (requires pandas).  Yields the aux_data records,
+        events without data are skipped.
+        '''
+
+        if vectorized_mode and not vectorized.HAS_PANDAS:
+            logging.warning("pandas is not installed, building records one at a time")
+            vectorized_mode = False
+
+        for start_ts, stop_ts, group in group_events(events, window):
+
+            query = self._build_window_query(start_ts - self.lookback, stop_ts)
+            query_result = self._run_query(query, data_frame=vectorized_mode)
+
+            if query_result is None:
+                continue
+
+            if vectorized_mode:
+                yield from self.build_window_records_vectorized(group, vectorized.concat_frames(query_result))
+            else:
+                yield from self.build_window_records(group, build_series(record for table in query_result for record in table.records))
 
     @property
     def data_source(self):
@@ -232,6 +638,43 @@ class SealogInfluxAuxDataRecordBuilder():
         '''
         return self._data_source
 
+    @property
+    def lookback(self):
+        '''
+        The widest lookback step
+        '''
+        return self._lookback_steps[-1]
+
+    @property
+    def lookback_steps(self):
+        '''
+        Getter method for the _lookback_steps property
+        '''
+        return self._lookback_steps
+
+    @property
+    def lookback_stats(self):
+        '''
+        Number of events that needed each lookback step, in seconds, and
+        'none' for events without data
+        '''
+        with self._lookback_stats_lock:
+            return dict(self._lookback_stats)
+
+    @property
+    def query_resolution(self):
+        '''
+        Getter method for the _query_resolution property
+        '''
+        return self._query_resolution
+
+    @property
+    def query_cache(self):
+        '''
+        Getter method for the _query_cache property
+        '''
+        return self._query_cache
+
     @property
     def measurements(self):
         '''
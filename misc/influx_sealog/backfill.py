@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+'''
+FILE:           backfill.py
+
+DESCRIPTION:    This script contains the worker pool used by the influx
+                aux_data inserter to backfill the aux_data of a cruise,
+                lowering or list of events.  The events are split into query
+                windows that are built and submitted concurrently, with a
+                global rate limit toward influxDB and the sealog-server API
+                and a checkpoint file of the completed event/data_source
+                pairs so an interrupted backfill can be resumed.
+
+BUGS:
+NOTES:          A window is only added to the checkpoint file once its
+                aux_data records have been accepted by the sealog-server.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import os
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.python_sealog.event_aux_data import DEFAULT_BULK_BATCH_SIZE, post_event_aux_data_bulk
+from misc.influx_sealog.aux_data_record_builder import DEFAULT_QUERY_WINDOW, group_events
+
+# Seconds between progress messages.
+DEFAULT_PROGRESS_INTERVAL = 10
+
+
+class RateLimiter():
+    '''
+    Class that limits the rate of requests shared by several threads to rate
+    requests per second, with bursts of up to burst requests.  A rate of
+    None or 0 disables the limit.
+    '''
+
+    def __init__(self, rate=None, burst=1):
+
+        self._rate = rate
+        self._burst = max(burst, 1)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        '''
+        Block until a request is allowed.
+        '''
+
+        if not self._rate:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self._rate
+
+            time.sleep(wait)
+
+    @property
+    def rate(self):
+        '''
+        Getter method for the _rate property
+        '''
+        return self._rate
+
+
+class Checkpoint():
+    '''
+    Class that records the completed (event_id, data_source) pairs in a file,
+    one tab separated pair per line, so a backfill can skip them when it is
+    restarted and still build the data_sources added to the config since.  A
+    path of None keeps the pairs in memory only.
+    '''
+
+    def __init__(self, path=None):
+
+        self._path = path
+        self._completed = set()
+        self._lock = threading.Lock()
+
+        if path and os.path.isfile(path):
+            ignored = 0
+
+            with open(path) as file:
+                for line in file:
+                    pair = tuple(line.rstrip('\n').split('\t'))
+
+                    if len(pair) == 2:
+                        self._completed.add(pair)
+                    elif line.strip():
+                        ignored += 1
+
+            if ignored:
+                logging.warning("Ignoring %d checkpoint entries without a data_source in %s", ignored, path)
+
+            logging.info("Loaded %d completed event/data_source pairs from %s", len(self._completed), path)
+
+    def add(self, pairs):
+        '''
+        Mark the (event_id, data_source) pairs as completed.
+        '''
+
+        with self._lock:
+            new_pairs = [pair for pair in pairs if pair not in self._completed]
+            self._completed.update(new_pairs)
+
+            if self._path and new_pairs:
+                with open(self._path, 'a') as file:
+                    file.write(''.join('{}\t{}\n'.format(event_id, data_source) for event_id, data_source in new_pairs))
+                    file.flush()
+                    os.fsync(file.fileno())
+
+    def __contains__(self, pair):
+        return pair in self._completed
+
+    def __len__(self):
+        return len(self._completed)
+
+    @property
+    def path(self):
+        '''
+        Getter method for the _path property
+        '''
+        return self._path
+
+
+class ProgressReporter():
+    '''
+    Class that logs the number of events processed, the throughput in events
+    per second and the estimated time remaining at most every interval
+    seconds.
+    '''
+
+    def __init__(self, total, interval=DEFAULT_PROGRESS_INTERVAL):
+
+        self._total = total
+        self._interval = interval
+        self._done = 0
+        self._records = 0
+        self._failed = 0
+        self._started = time.monotonic()
+        self._reported = self._started
+        self._lock = threading.Lock()
+
+    def update(self, events, records=0, failed=False):
+        '''
+        Add a completed (or failed) window of events.
+        '''
+
+        with self._lock:
+            self._done += events
+            self._records += records
+
+            if failed:
+                self._failed += events
+
+            now = time.monotonic()
+
+            if now - self._reported >= self._interval:
+                self._reported = now
+                logging.info(self.summary())
+
+    def summary(self):
+        '''
+        Return the progress as a string.
+        '''
+
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        rate = self._done / elapsed
+        remaining = (self._total - self._done) / rate if rate else float('inf')
+
+        return "Processed {}/{} events ({} failed, {} aux data records) in {:.1f}s, {:.1f} events/s, ~{:.0f}s remaining".format(
+            self._done, self._total, self._failed, self._records, elapsed, rate, remaining)
+
+    @property
+    def failed(self):
+        '''
+        Getter method for the _failed property
+        '''
+        return self._failed
+
+    @property
+    def events_per_second(self):
+        '''
+        Events processed per second since the start
+        '''
+        return self._done / max(time.monotonic() - self._started, 1e-6)
+
+
+def existing_aux_data_pairs(aux_data_records):
+    '''
+    Return the set of (event_id, data_source) pairs of the aux_data records.
+    '''
+
+    return {(record['event_id'], record['data_source']) for record in aux_data_records or []}
+
+
+def group_missing_events(events, data_sources, existing_pairs):
+    '''
+    Group the events by the data_sources they are missing, skipping the
+    events that already have aux_data for every data_source.  Returns a dict
+    of data_source tuple -> events.
+    '''
+
+    groups = {}
+
+    for event in events:
+        missing = tuple(data_source for data_source in data_sources if (event['id'], data_source) not in existing_pairs)
+
+        if missing:
+            groups.setdefault(missing, []).append(event)
+
+    return groups
+
+
+def _process_window(aux_data_planner, events, influx_limiter, api_limiter, dry_run, vectorized_mode):
+    '''
+    Build and submit the aux_data records for a window of events.  Returns
+    the number of records.
+    '''
+
+    influx_limiter.acquire()
+    records = list(aux_data_planner.build_aux_data_records(events, vectorized_mode=vectorized_mode, raise_on_error=True))
+
+    if dry_run:
+        return len(records)
+
+    # one bulk request per batch, each counted by the api limiter
+    for start in range(0, len(records), DEFAULT_BULK_BATCH_SIZE):
+        api_limiter.acquire()
+        post_event_aux_data_bulk(records[start:start + DEFAULT_BULK_BATCH_SIZE])
+
+    return len(records)
+
+
+def run_backfill(aux_data_planner, events, workers=1, influx_rate=None, api_rate=None, checkpoint_file=None, # pylint: disable=too-many-arguments,too-many-locals
+                 dry_run=False, vectorized_mode=False, window=DEFAULT_QUERY_WINDOW, progress_interval=DEFAULT_PROGRESS_INTERVAL):
+    '''
+    Build and submit the aux_data records for the events with a pool of
+    workers threads, one query window per task.  influx_rate and api_rate
+    limit the influxDB queries and sealog-server requests per second across
+    all workers.  The (event_id, data_source) pairs listed in the
+    checkpoint_file are skipped and the pairs of each window are added to it
+    once submitted.  Returns the number of events that failed.
+    '''
+
+    checkpoint = Checkpoint(None if dry_run else checkpoint_file)
+
+    data_sources = [builder.data_source for builder in aux_data_planner.builders]
+    pending = group_missing_events(events, data_sources, checkpoint)
+    pending_count = sum(len(group) for group in pending.values())
+
+    if pending_count < len(events):
+        logging.info("Skipping %d events already completed", len(events) - pending_count)
+
+    windows = [
+        (missing, aux_data_planner if list(missing) == data_sources else aux_data_planner.select(missing), [event for _, event in window_group])
+        for missing, group in pending.items()
+        for _, _, window_group in group_events(group, window)
+    ]
+    progress = ProgressReporter(pending_count, progress_interval)
+
+    influx_limiter = RateLimiter(influx_rate)
+    api_limiter = RateLimiter(api_rate)
+
+    logging.info("Backfilling %d events in %d windows with %d workers", pending_count, len(windows), workers)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = {
+            executor.submit(_process_window, window_planner, window_events, influx_limiter, api_limiter, dry_run, vectorized_mode): (missing, window_events)
+            for missing, window_planner, window_events in windows
+        }
+
+        for future in as_completed(futures):
+            missing, window_events = futures[future]
+
+            try:
+                records = future.result()
+            except Exception as err: # pylint: disable=broad-except
+                logging.warning("Error backfilling %d events starting at %s", len(window_events), window_events[0]['ts'])
+                logging.debug(str(err))
+                progress.update(len(window_events), failed=True)
+                continue
+
+            checkpoint.add((event['id'], data_source) for event in window_events for data_source in missing)
+            progress.update(len(window_events), records)
+
+    logging.info(progress.summary())
+
+    return progress.failed
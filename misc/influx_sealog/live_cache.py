@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+'''
+FILE:           live_cache.py
+
+DESCRIPTION:    This script contains the InfluxLiveCache class used by the
+                influx aux_data inserter in live mode to answer new events
+                from an in-memory, continuously refreshed buffer of the recent
+                influxDB values instead of querying influxDB for every event.
+
+BUGS:
+NOTES:          Values written to influxDB with timestamps older than
+                REFRESH_OVERLAP at the time of the refresh are not picked up.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.influx_sealog.aux_data_record_builder import TS_FORMAT, run_query
+
+# How much recent data is kept in memory.
+DEFAULT_BUFFER_WINDOW = timedelta(minutes=5)
+
+# Seconds between refreshes of the buffer.
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+# How far the event ts may be ahead of the last refresh and still be
+# answered from memory, after refreshing the buffer first.
+DEFAULT_MAX_LAG = timedelta(seconds=2)
+
+# Each refresh re-reads this much of the previous refresh to pick up values
+# that were written late.
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+class InfluxLiveCache():
+    '''
+    Class that keeps a time-indexed buffer of the values of every
+    measurement/field planned by an InfluxQueryPlanner, refreshed from
+    influxDB by a background thread with incremental range queries.  Events
+    whose lookback range is covered by the buffer are answered from memory,
+    older events fall back to the planner's per-event query.
+    '''
+
+    def __init__(self, influxdb_client, aux_data_planner, buffer_window=DEFAULT_BUFFER_WINDOW,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL, max_lag=DEFAULT_MAX_LAG):
+
+        self._influxdb_client = influxdb_client.query_api()
+        self._aux_data_planner = aux_data_planner
+        self._buffer_window = buffer_window
+        self._refresh_interval = refresh_interval
+        self._max_lag = max_lag
+
+        # (measurement, field) -> (sorted times, values)
+        self._buffer = {}
+        self._covered_from = None
+        self._refreshed_until = None
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._hits = 0
+        self._misses = 0
+
+        if aux_data_planner.lookback > buffer_window:
+            logging.warning("The buffer window is shorter than the query lookback, events will be queried from influxDB")
+
+    def _add_records(self, query_result):
+        '''
+        Add the query records to the buffer, skipping values already held.
+        '''
+
+        for table in query_result:
+            for record in table.records:
+                times, values = self._buffer.setdefault((record.get_measurement(), record.get_field()), ([], []))
+                record_time = record.get_time()
+
+                if not times or record_time > times[-1]:
+                    times.append(record_time)
+                    values.append(record.get_value())
+                    continue
+
+                idx = bisect.bisect_left(times, record_time)
+
+                if idx == len(times) or times[idx] != record_time:
+                    times.insert(idx, record_time)
+                    values.insert(idx, record.get_value())
+
+    def _trim(self, oldest):
+        '''
+        Drop the values recorded before oldest.
+        '''
+
+        for times, values in self._buffer.values():
+            idx = bisect.bisect_left(times, oldest)
+
+            if idx:
+                del times[:idx]
+                del values[:idx]
+
+    def refresh(self):
+        '''
+        Read the values recorded since the last refresh into the buffer.
+        Returns False if the query failed.
+        '''
+
+        now = datetime.now(timezone.utc)
+
+        with self._lock:
+            refreshed_until = self._refreshed_until
+
+        start_ts = now - self._buffer_window if refreshed_until is None else refreshed_until - REFRESH_OVERLAP
+
+        query_result = run_query(self._influxdb_client, self._aux_data_planner.build_window_query(start_ts, now))
+
+        if query_result is None:
+            return False
+
+        with self._lock:
+            self._add_records(query_result)
+
+            if self._covered_from is None:
+                self._covered_from = start_ts
+
+            self._covered_from = max(self._covered_from, now - self._buffer_window)
+            self._trim(self._covered_from)
+
+            # the background and on-demand refreshes may finish out of order
+            self._refreshed_until = now if self._refreshed_until is None else max(self._refreshed_until, now)
+
+        return True
+
+    def _run(self):
+
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as err: # pylint: disable=broad-except
+                logging.warning("Error refreshing the live influx buffer")
+                logging.debug(str(err))
+
+            self._stop.wait(self._refresh_interval)
+
+    def start(self):
+        '''
+        Load the buffer and start refreshing it in a background thread.
+        '''
+
+        if self._thread is not None:
+            return
+
+        self.refresh()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='influx_live_cache', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stop refreshing the buffer.
+        '''
+
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_values(self, ts): # pylint: disable=invalid-name
+        '''
+        Return a dict of (measurement, field) -> (time, value) of the latest
+        values recorded within the widest lookback of the builders before ts
+        (a tz-aware datetime), or None if the buffer does not cover that
+        range.  The buffer is refreshed first if ts is at most max_lag past
+        the last refresh.
+        '''
+
+        lookback = self._aux_data_planner.lookback
+
+        with self._lock:
+            refreshed_until = self._refreshed_until
+
+        if refreshed_until is not None and refreshed_until < ts <= refreshed_until + self._max_lag:
+            self.refresh()
+
+        with self._lock:
+            if self._refreshed_until is None or ts - lookback < self._covered_from or ts > self._refreshed_until:
+                return None
+
+            values = {}
+
+            for key, (times, key_values) in self._buffer.items():
+
+                # latest value before ts, matching the exclusive range stop
+                # of the per-event query
+                idx = bisect.bisect_left(times, ts) - 1
+
+                if idx >= 0 and times[idx] >= ts - lookback:
+                    values[key] = (times[idx], key_values[idx])
+
+            return values
+
+    def build_aux_data_records_for_event(self, event):
+        '''
+        Build the aux_data records of all builders for the given event from
+        the buffer, or with an influxDB query if the buffer does not cover
+        the event ts.  Returns the list of records.
+        '''
+
+        try:
+            values = self.get_values(datetime.strptime(event['ts'], TS_FORMAT).replace(tzinfo=timezone.utc))
+        except (KeyError, ValueError):
+            values = None
+
+        if values is None:
+            with self._lock:
+                self._misses += 1
+
+            logging.debug("Event %s is not covered by the live buffer, querying influxDB", event.get('id'))
+            return self._aux_data_planner.build_aux_data_records_for_event(event)
+
+        with self._lock:
+            self._hits += 1
+
+        return self._aux_data_planner.build_aux_data_records_from_values(event, values)
+
+    @property
+    def builders(self):
+        '''
+        Getter method for the builders of the planner
+        '''
+        return self._aux_data_planner.builders
+
+    @property
+    def hits(self):
+        '''
+        Number of events answered from the buffer
+        '''
+        return self._hits
+
+    @property
+    def misses(self):
+        '''
+        Number of events answered with an influxDB query
+        '''
+        return self._misses
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+'''
+FILE:           query_cache.py
+
+DESCRIPTION:    This script contains the QueryResultCache class used by the
+                influx record builder and query planner to reuse the result
+                of a per-event influxDB query for the events landing in the
+                same time bucket, i.e. several events logged within the same
+                second.
+
+BUGS:
+NOTES:          The events are bucketed by rounding their ts down to the
+                data source's query_resolution, the per-event query then
+                stops at the start of the bucket.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+# Maximum number of query results kept.
+DEFAULT_MAX_ENTRIES = 256
+
+# Query results older than this are not reused, values may still be
+# arriving in influxDB for recent events.
+DEFAULT_MAX_AGE = timedelta(seconds=30)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_query_resolution(query_resolution):
+    '''
+    Return the query_resolution of a data source config, in seconds, as a
+    timedelta or None if not set.  Raises ValueError if the value is
+    invalid.
+    '''
+
+    if query_resolution is None:
+        return None
+
+    if isinstance(query_resolution, bool) or not isinstance(query_resolution, (int, float)) or query_resolution <= 0:
+        raise ValueError("query_resolution must be a positive number of seconds")
+
+    return timedelta(seconds=query_resolution)
+
+
+def quantize_ts(event_ts, resolution):
+    '''
+    Round the event_ts (a tz-aware datetime) down to the resolution (a
+    timedelta, or None to leave it unchanged).
+    '''
+
+    if not resolution:
+        return event_ts
+
+    return event_ts - (event_ts - _EPOCH) % resolution
+
+
+class QueryResultCache():
+    '''
+    Class that keeps the results of the latest influxDB queries, keyed by the
+    query string, in a bounded LRU.  Results older than max_age are evicted.
+    '''
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE):
+
+        self._max_entries = max_entries
+        self._max_age = max_age.total_seconds()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+
+    def _evict(self, now):
+
+        while self._entries:
+            _, (added, _) = next(iter(self._entries.items()))
+
+            if now - added <= self._max_age and len(self._entries) <= self._max_entries:
+                break
+
+            self._entries.popitem(last=False)
+
+    def get(self, query):
+        '''
+        Return the cached result of the query, or None.
+        '''
+
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(query)
+
+            if entry is None or now - entry[0] > self._max_age:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(query)
+            self._hits += 1
+
+            return entry[1]
+
+    def put(self, query, query_result):
+        '''
+        Cache the result of the query.
+        '''
+
+        now = time.monotonic()
+
+        with self._lock:
+            self._entries[query] = (now, query_result)
+            self._entries.move_to_end(query)
+            self._evict(now)
+
+    def run(self, query, run):
+        '''
+        Return the cached result of the query or the result of run(query),
+        caching it unless it is None.
+        '''
+
+        query_result = self.get(query)
+
+        if query_result is None:
+            query_result = run(query)
+
+            if query_result is not None:
+                self.put(query, query_result)
+
+        return query_result
+
+    def clear(self):
+        '''
+        Discard all cached results.
+        '''
+
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hits(self):
+        '''
+        Number of queries answered from the cache
+        '''
+        return self._hits
+
+    @property
+    def misses(self):
+        '''
+        Number of queries sent to influxDB
+        '''
+        return self._misses
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+'''
+FILE:           query_planner.py
+
+DESCRIPTION:    This script contains the InfluxQueryPlanner class that merges
+                the influxDB queries of several aux_data record builders into
+                a single query per event or window and dispatches the
+                returned rows to each builder.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import logging
+import functools
+from datetime import datetime, timezone
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.influx_sealog import vectorized
+from misc.influx_sealog.query_cache import QueryResultCache, quantize_ts
+from misc.influx_sealog.aux_data_record_builder import DEFAULT_QUERY_WINDOW, QUERY_LOOKBACK, TS_FORMAT, build_series, build_timed_values, group_events, run_query
+from misc.influx_sealog.settings import INFLUX_BUCKET
+
+
+class InfluxQueryPlanner():
+    '''
+    Class that unions the query_measurements and fields of a list of
+    SealogInfluxAuxDataRecordBuilders into one influxDB query per event or
+    window.  Each measurement is only asked for the fields a builder reads
+    from it so the merged query never returns rows no builder needs.  The
+    rows are dispatched to the builders by measurement and field.
+    '''
+
+    def __init__(self, influxdb_client, aux_data_builders):
+        self._client = influxdb_client
+        self._influxdb_client = influxdb_client.query_api()
+        self._aux_data_builders = aux_data_builders
+
+        # measurement -> fields read from the measurement, in config order
+        self._query_plan = self._build_query_plan(aux_data_builders)
+
+        # the merged per-event query is only as coarse as the finest builder
+        resolutions = [builder.query_resolution for builder in aux_data_builders]
+        self._query_resolution = None if None in resolutions or not resolutions else min(resolutions)
+        self._query_cache = QueryResultCache()
+
+        # (measurement, field) pairs read by each builder
+        self._builder_keys = [
+            (builder, frozenset((measurement, field) for measurement in builder.measurements for field in builder.fields))
+            for builder in aux_data_builders
+        ]
+
+    @staticmethod
+    def _build_query_plan(aux_data_builders):
+        '''
+        Return the measurement -> fields read by the builders.
+        '''
+
+        query_plan = {}
+
+        for builder in aux_data_builders:
+            for measurement in builder.measurements:
+                fields = query_plan.setdefault(measurement, [])
+                fields.extend(field for field in builder.fields if field not in fields)
+
+        return query_plan
+
+    def _build_query_filter(self, query_range, query_plan=None):
+        '''
+        Builds the part of the influxDB query selecting the planned (or the
+        given query_plan) measurement/field pairs within the query_range.
+        '''
+
+        measurement_filters = [
+            '(r["_measurement"] == "{}" and ({}))'.format(measurement, ' or '.join(['r["_field"] == "{}"'.format(field) for field in fields]))
+            for measurement, fields in (query_plan or self._query_plan).items()
+        ]
+
+        query = 'from(bucket: "{}")\n'.format(INFLUX_BUCKET)
+        query += '|> range({})\n'.format(query_range)
+        query += '|> filter(fn: (r) => {})\n'.format(' or '.join(measurement_filters))
+
+        return query
+
+    def _build_query(self, ts, lookback=None, query_plan=None): # pylint: disable=invalid-name
+        '''
+        Builds the merged query returning the latest value of each planned
+        measurement/field within lookback (defaults to the widest lookback of
+        the builders) before the timestamp (ts).
+        '''
+
+        start_ts = datetime.strptime(ts, TS_FORMAT) - (lookback or self.lookback)
+
+        query = self._build_query_filter("start: {}, stop: {}".format(start_ts.strftime(TS_FORMAT), ts), query_plan)
+        query += '|> sort(columns: ["_time"], desc: true)\n'
+        query += '|> limit(n:1)'
+
+        logging.debug("Query: %s", query)
+        return query
+
+    def build_window_query(self, start_ts, stop_ts):
+        '''
+        Builds the merged query returning all values of the planned
+        measurement/fields between start_ts and stop_ts.
+        '''
+
+        query = self._build_query_filter("start: {}, stop: {}".format(start_ts.strftime(TS_FORMAT), stop_ts.strftime(TS_FORMAT)))
+        query += '|> keep(columns: ["_time", "_measurement", "_field", "_value"])'
+
+        logging.debug("Query: %s", query)
+        return query
+
+    def _dispatch_records(self, query_result):
+        '''
+        Yield (builder, records) for each builder with the query records read
+        by the builder.
+        '''
+
+        records = [record for table in query_result for record in table.records]
+
+        for builder, keys in self._builder_keys:
+            yield builder, [record for record in records if (record.get_measurement(), record.get_field()) in keys]
+
+    def _build_records_from_values(self, event, event_ts, values, builder_keys, query_lookback):
+        '''
+        Build the aux_data records of the builder_keys' builders from values,
+        a dict of (measurement, field) -> (time, value) retrieved within
+        query_lookback before the event ts.  Returns the records and the
+        builder_keys that need a wider query.
+        '''
+
+        aux_data_records = []
+        pending = []
+
+        for builder, keys in builder_keys:
+            influx_data = builder.select_values(event_ts, {field: timed_value for (measurement, field), timed_value in values.items() if (measurement, field) in keys}, query_lookback)
+
+            if influx_data is None:
+                pending.append((builder, keys))
+                continue
+
+            aux_data_record = builder.build_aux_data_record_from_values(event, influx_data)
+
+            if aux_data_record:
+                aux_data_records.append(aux_data_record)
+            else:
+                logging.debug("No aux data for data_source: %s", builder.data_source)
+
+        return aux_data_records, pending
+
+    def build_aux_data_records_for_event(self, event):
+        '''
+        Build the aux_data records of all builders for the given event with a
+        single influxDB query.  Builders with several lookback steps start
+        with the narrowest and the builders without data are queried again
+        with their next step.  The event ts is rounded down to the
+        query_resolution and the events in the same bucket share the query
+        results.  Returns the list of records.
+        '''
+
+        try:
+            event_ts = quantize_ts(datetime.strptime(event['ts'], TS_FORMAT).replace(tzinfo=timezone.utc), self._query_resolution)
+        except (KeyError, ValueError) as err:
+            logging.warning("Skipping event with invalid ts: %s", event.get('id'))
+            logging.debug(str(err))
+            return []
+
+        aux_data_records = []
+        pending = self._builder_keys
+        query_lookback = None
+
+        while pending:
+
+            # the next step of every pending builder
+            query_lookback = max(
+                next((step for step in builder.lookback_steps if query_lookback is None or step > query_lookback), builder.lookback)
+                for builder, _ in pending
+            )
+
+            query_plan = self._query_plan if pending is self._builder_keys else self._build_query_plan([builder for builder, _ in pending])
+            query = self._build_query(event_ts.strftime(TS_FORMAT), query_lookback, query_plan)
+            query_result = self._query_cache.run(query, functools.partial(run_query, self._influxdb_client))
+
+            if query_result is None:
+                break
+
+            values = build_timed_values(record for table in query_result for record in table.records)
+            records, pending = self._build_records_from_values(event, event_ts, values, pending, query_lookback)
+            aux_data_records.extend(records)
+
+        return aux_data_records
+
+    def build_aux_data_records_from_values(self, event, values):
+        '''
+        Build the aux_data records of all builders for the given event from
+        values, a dict of (measurement, field) -> (time, value) holding the
+        latest values within the widest lookback before the event ts.
+        Returns the list of records.
+        '''
+
+        try:
+            event_ts = datetime.strptime(event['ts'], TS_FORMAT).replace(tzinfo=timezone.utc)
+        except (KeyError, ValueError) as err:
+            logging.warning("Skipping event with invalid ts: %s", event.get('id'))
+            logging.debug(str(err))
+            return []
+
+        aux_data_records, _ = self._build_records_from_values(event, event_ts, values, self._builder_keys, self.lookback)
+
+        return aux_data_records
+
+    def build_aux_data_records(self, events, window=DEFAULT_QUERY_WINDOW, vectorized_mode=False, raise_on_error=False):
+        '''
+        Build the aux_data records of all builders for the given events.  The
+        events are grouped into windows spanning no more than window and each
+        window is retrieved with a single influxDB query shared by all
+        builders.  Set vectorized_mode to True to transform each window with
+        pandas/numpy column operations (requires pandas).  Windows whose query
+        fails are skipped unless raise_on_error is True, in which case a
+        RuntimeError is raised.  Yields the aux_data records.
+        '''
+
+        if vectorized_mode and not vectorized.HAS_PANDAS:
+            logging.warning("pandas is not installed, building records one at a time")
+            vectorized_mode = False
+
+        for start_ts, stop_ts, group in group_events(events, window):
+
+            query = self.build_window_query(start_ts - self.lookback, stop_ts)
+            query_result = run_query(self._influxdb_client, query, data_frame=vectorized_mode)
+
+            if query_result is None:
+                if raise_on_error:
+                    raise RuntimeError("influxDB query failed for the events between {} and {}".format(start_ts, stop_ts))
+
+                continue
+
+            if vectorized_mode:
+                query_frame = vectorized.concat_frames(query_result)
+
+                for builder in self._aux_data_builders:
+                    yield from builder.build_window_records_vectorized(group, vectorized.select_rows(query_frame, builder.measurements, builder.fields))
+
+                continue
+
+            for builder, records in self._dispatch_records(query_result):
+                yield from builder.build_window_records(group, build_series(records))
+
+    def select(self, data_sources):
+        '''
+        Return a planner for the builders of the given data_sources only.
+        '''
+
+        return InfluxQueryPlanner(self._client, [builder for builder in self._aux_data_builders if builder.data_source in data_sources])
+
+    @property
+    def builders(self):
+        '''
+        Getter method for the _aux_data_builders property
+        '''
+        return self._aux_data_builders
+
+    @property
+    def lookback(self):
+        '''
+        The widest lookback of the builders
+        '''
+        return max((builder.lookback for builder in self._aux_data_builders), default=QUERY_LOOKBACK)
+
+    @property
+    def query_cache(self):
+        '''
+        Getter method for the _query_cache property
+        '''
+        return self._query_cache
+
+    @property
+    def query_plan(self):
+        '''
+        Getter method for the _query_plan property
+        '''
+        return self._query_plan
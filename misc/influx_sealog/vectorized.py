@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+'''
+FILE:           vectorized.py
+
+DESCRIPTION:    This script contains the pandas/numpy implementation of the
+                aux_record_lookup transform used by the influx record builder
+                to build the aux_data records for many events at once.
+
+BUGS:           Values are rounded with numpy which may differ from python's
+                round() in the last digit for values exactly halfway between
+                two rounded values.
+NOTES:          pandas and numpy are optional.  HAS_PANDAS is False if they
+                are not installed.  Building the records this way is not
+                faster than the builder's default batch path (see
+                misc/benchmarks/bench_aux_data_record_builder.py).
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+HAS_PANDAS = pd is not None
+
+
+def concat_frames(query_result):
+    '''
+    Return the result of a query_data_frame call as a single DataFrame.  The
+    influxDB client returns a list of DataFrames when the tables have
+    different schemas, i.e. string and float fields.
+    '''
+
+    if isinstance(query_result, list):
+        frames = [frame for frame in query_result if not frame.empty]
+
+        # concat would upcast integer fields to float, keep the values as
+        # objects and let as_of_join infer the type of each field
+        if len({frame['_value'].dtype for frame in frames if '_value' in frame}) > 1:
+            frames = [frame.astype({'_value': object}) for frame in frames]
+
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    return query_result
+
+
+def select_rows(query_frame, measurements, fields):
+    '''
+    Return the rows of the query_frame for the given measurements and fields.
+    '''
+
+    if query_frame.empty or '_measurement' not in query_frame:
+        return query_frame
+
+    return query_frame[query_frame['_measurement'].isin(measurements) & query_frame['_field'].isin(fields)]
+
+
+# int64 value of NaT.
+_NAT = np.iinfo(np.int64).min if np is not None else None
+
+
+def _to_ns(values):
+    '''
+    Return the datetimes as an array of int64 nanoseconds since the epoch.
+    '''
+
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True, cache=False)).tz_convert(None).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _take(values, idx, found):
+    '''
+    Return the values at idx as a Series, NA where found is False.  Integer
+    fields stay integers.
+    '''
+
+    taken = values.iloc[idx].reset_index(drop=True)
+
+    if pd.api.types.is_integer_dtype(taken):
+        taken = taken.astype('Int64')
+
+    return taken if found.all() else taken.where(found)
+
+
+def as_of_join(event_times, query_frame, lookback, with_times=False):
+    '''
+    Return a DataFrame with one row per event time (tz-aware UTC datetimes)
+    and one column per field holding the latest value recorded before the
+    event time and within lookback, or NA.  query_frame must have the _time,
+    _field and _value columns.  Each field is joined with one binary search
+    over all the events.  Set with_times to True to also return a DataFrame
+    of the times of the values (UTC datetime64, NaT without a value).
+    '''
+
+    event_ns = _to_ns(event_times)
+    columns = {}
+    time_columns = {}
+
+    if not query_frame.empty and '_field' in query_frame:
+        tolerance = pd.Timedelta(lookback).value
+
+        for field, points in query_frame.groupby('_field', sort=False):
+            point_ns = _to_ns(points['_time'])
+            order = np.argsort(point_ns, kind='stable')
+            point_ns = point_ns[order]
+
+            # latest point strictly before the event, the influx range stop
+            # is exclusive
+            idx = np.searchsorted(point_ns, event_ns, side='left') - 1
+            found = idx >= 0
+            idx = np.where(found, idx, 0)
+            found &= event_ns - point_ns[idx] <= tolerance
+
+            columns[field] = _take(points['_value'].iloc[order].infer_objects(), idx, found)
+            time_columns[field] = np.where(found, point_ns[idx], _NAT).view('datetime64[ns]')
+
+    data = pd.DataFrame(columns, index=pd.RangeIndex(len(event_ns)))
+
+    if not with_times:
+        return data
+
+    return data, pd.DataFrame(time_columns, index=data.index)
+
+
+def limit_to_lookback(event_times, data, times, lookback_steps):
+    '''
+    Keep, for each event, only the values within the narrowest lookback step
+    holding the latest value, the values the adaptive per-event queries
+    return.  Returns the limited data and a Series of the lookback step used
+    by each event, NaT for events without data.
+    '''
+
+    if data.empty or times.empty:
+        return data, pd.Series(pd.NaT, index=data.index, dtype='timedelta64[ns]')
+
+    time_ns = times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    missing = time_ns == _NAT
+    ages = np.where(missing, np.iinfo(np.int64).max, _to_ns(event_times)[:, None] - time_ns)
+
+    steps = np.array([pd.Timedelta(step).value for step in lookback_steps], dtype=np.int64)
+    step_idx = np.searchsorted(steps, ages.min(axis=1), side='left')
+    found = step_idx < len(steps)
+    lookback_ns = steps[np.minimum(step_idx, len(steps) - 1)]
+
+    keep = found[:, None] & ~missing & (ages <= lookback_ns[:, None])
+    lookback = pd.Series(np.where(found, lookback_ns, _NAT).view('timedelta64[ns]'), index=data.index)
+
+    return data.where(keep), lookback
+
+
+def _test_mask(data, comparisons, field, reach):
+    '''
+    Return the (passed, missing) masks of a modify test for the rows in reach.
+    '''
+
+    if field not in data:
+        return np.zeros(len(data), dtype=bool), reach
+
+    column = data[field]
+    missing = column.isna().to_numpy() & reach
+    result = np.zeros(len(data), dtype=bool)
+
+    for compare, operand in comparisons:
+        result |= compare(column, operand).fillna(False).to_numpy(dtype=bool)
+
+    return result & reach & ~missing, missing
+
+
+def build_aux_data_records(compiled_lookup, data_source, event_ids, data):
+    '''
+    Apply the compiled aux_record_lookup rules to the as-of joined data (one
+    row per event id) as column operations and return the aux_data records.
+    Raises TypeError/ValueError if a rule can not be applied to a column,
+    i.e. arithmetic on a string field, the caller should fall back to the
+    per-record path.
+    '''
+
+    rows = len(data)
+    drop = np.zeros(rows, dtype=bool)
+    outputs = []
+
+    for lookup in compiled_lookup:
+        if lookup.field not in data:
+            continue
+
+        value = data[lookup.field]
+        present = value.notna().to_numpy()
+
+        for tests, operations in lookup.rules:
+
+            if tests is None:
+                passed = present
+            else:
+                passed = np.zeros(rows, dtype=bool)
+
+                for field, comparisons in tests:
+
+                    # like the per-record path, a test field without data
+                    # drops the record when the test is evaluated
+                    test_passed, missing = _test_mask(data, comparisons, field, present & ~passed)
+                    drop |= missing
+                    passed |= test_passed
+
+            if operations and passed.any():
+                modified = value
+
+                for operation, operand in operations:
+                    modified = operation(modified, operand)
+
+                value = value.where(~passed, modified)
+
+        if lookup.digits is not None:
+            if not pd.api.types.is_numeric_dtype(value) or pd.api.types.is_bool_dtype(value):
+                raise TypeError("can not round non-numeric field {}".format(lookup.field))
+
+            value = value.round(lookup.digits)
+
+        present = np.flatnonzero(present)
+
+        outputs.append((present, lookup.data_name, lookup.data_uom, value.astype(str).to_numpy(dtype=object)[present]))
+
+    if not outputs:
+        return []
+
+    # one row per output value, sorted by event keeping the lookup order
+    event_idx = np.concatenate([present for present, _, _, _ in outputs])
+    order = np.argsort(event_idx, kind='stable')
+    event_idx = event_idx[order]
+    kept = ~drop[event_idx]
+
+    data_names = np.concatenate([np.full(len(present), data_name, dtype=object) for present, data_name, _, _ in outputs])[order][kept]
+    data_values = np.concatenate([output_values for _, _, _, output_values in outputs])[order][kept]
+    data_uoms = np.concatenate([np.full(len(present), data_uom, dtype=object) for present, _, data_uom, _ in outputs])[order][kept]
+
+    data_array = [
+        {'data_name': data_name, 'data_value': data_value, 'data_uom': data_uom}
+        for data_name, data_value, data_uom in zip(data_names.tolist(), data_values.tolist(), data_uoms.tolist())
+    ]
+    counts = np.bincount(event_idx[kept], minlength=rows)
+    ends = np.cumsum(counts).tolist()
+
+    return [
+        {
+            'event_id': event_ids[idx],
+            'data_source': data_source,
+            'data_array': data_array[end - count:end]
+        }
+        for idx, (count, end) in enumerate(zip(counts.tolist(), ends)) if count
+    ]
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+'''
+FILE:           client.py
+
+DESCRIPTION:    This script contains the AsyncSealogClient class that owns the
+                shared aiohttp session used by the asyncio python_sealog
+                wrapper functions to communicate with the sealog-server API.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import time
+import asyncio
+import logging
+from collections import namedtuple
+import aiohttp
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(dirname(realpath(__file__))))))
+
+from misc.python_sealog import metrics
+from misc.python_sealog.client import DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_BACKOFF_FACTOR, DEFAULT_TIMEOUT, RETRY_STATUS_CODES
+
+# Methods that are safe to retry.
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+SealogResponse = namedtuple('SealogResponse', ['status_code', 'text', 'headers'])
+
+
+def _build_params(params):
+    '''
+    Convert a requests-style params dict into the list of (key, value) string
+    pairs accepted by aiohttp.  List values are expanded into repeated keys
+    and booleans are rendered the same way requests renders them.
+    '''
+
+    if not params:
+        return None
+
+    query = []
+
+    for key, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+
+        for item in values:
+            if item is not None:
+                query.append((key, str(item)))
+
+    return query
+
+
+class AsyncSealogClient():
+    '''
+    Class that owns a shared aiohttp.ClientSession used to talk to the
+    sealog-server API from within an asyncio event loop.  Many requests can be
+    in flight at once, bounded by the connection pool size.  Idempotent
+    requests are retried with exponential backoff.
+    '''
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, timeout=DEFAULT_TIMEOUT):
+
+        self._pool_size = pool_size
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+        self._loop = None
+
+    def _get_session(self):
+        '''
+        Return the shared session, (re)creating it if it was closed or if it
+        belongs to a different event loop.
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self._pool_size)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+            self._loop = loop
+
+        return self._session
+
+    async def request(self, method, url, headers=None, params=None, data=None):
+        '''
+        Submit a request to the sealog-server using the shared session and
+        return a SealogResponse containing the status code and body text.
+        '''
+
+        retries = self._retries if method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+
+        start = time.perf_counter()
+
+        while True:
+            try:
+                async with self._get_session().request(method, url, headers=headers, params=_build_params(params), data=data) as resp:
+                    body = await resp.read()
+                    text = await resp.text()
+
+                    if resp.status in RETRY_STATUS_CODES and attempt < retries:
+                        raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+
+                    metrics.record_request(method, url, time.perf_counter() - start, resp.status, len(body))
+
+                    return SealogResponse(resp.status, text, resp.headers)
+
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError, asyncio.TimeoutError) as error:
+                if attempt >= retries:
+                    metrics.record_request(method, url, time.perf_counter() - start)
+                    raise error
+
+                delay = self._backoff_factor * (2 ** attempt)
+                logging.debug("Retrying %s %s in %s seconds: %s", method, url, delay, str(error))
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def get(self, url, **kwargs):
+        '''
+        Submit a GET request to the sealog-server.
+        '''
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        '''
+        Submit a POST request to the sealog-server.
+        '''
+        return await self.request('POST', url, **kwargs)
+
+    async def patch(self, url, **kwargs):
+        '''
+        Submit a PATCH request to the sealog-server.
+        '''
+        return await self.request('PATCH', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        '''
+        Submit a DELETE request to the sealog-server.
+        '''
+        return await self.request('DELETE', url, **kwargs)
+
+    async def close(self):
+        '''
+        Close the shared session and all pooled connections.
+        '''
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def pool_size(self):
+        '''
+        Getter method for the _pool_size property
+        '''
+        return self._pool_size
+
+
+_default_client = None
+
+
+def get_default_client():
+    '''
+    Return the AsyncSealogClient shared by the asyncio python_sealog wrapper
+    functions, creating it on first use.
+    '''
+
+    global _default_client # pylint: disable=global-statement
+
+    if _default_client is None:
+        _default_client = AsyncSealogClient()
+
+    return _default_client
+
+
+def set_default_client(client):
+    '''
+    Replace the AsyncSealogClient shared by the asyncio python_sealog wrapper
+    functions.  Returns the previous client.
+    '''
+
+    global _default_client # pylint: disable=global-statement
+
+    previous_client = _default_client
+    _default_client = client
+
+    return previous_client
+
+
+async def close_default_client():
+    '''
+    Close the shared AsyncSealogClient, i.e. before the event loop exits.
+    '''
+
+    if _default_client is not None:
+        await _default_client.close()
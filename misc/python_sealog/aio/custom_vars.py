@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+'''
+FILE:           custom_vars.py
+
+DESCRIPTION:    This script contains the asyncio versions of the wrapper
+                functions for the sealog-server custom_vars routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import logging
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(dirname(realpath(__file__))))))
+
+from misc.python_sealog.aio.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.resolver import CUSTOM_VAR, get_default_resolver
+from misc.python_sealog.settings import API_SERVER_URL, HEADERS, CUSTOM_VAR_API_PATH
+
+@instrumented
+async def get_custom_var(var_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a custom_var record based on the var_uid.
+    '''
+
+    try:
+        url = api_server_url + CUSTOM_VAR_API_PATH + '/' + var_uid
+        req = await get_default_client().get(url, headers=headers)
+        logging.debug(req.text)
+
+        if req.status_code != 404:
+            custom_var = json.loads(req.text)
+            logging.debug(json.dumps(custom_var))
+            return custom_var
+
+    except Exception as error:
+        logging.error('Error retrieving custom variable')
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_custom_var_uid_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a custom_var uid based on the var_name.  The UID is cached by the
+    shared UIDResolver.
+    '''
+
+    uid = get_default_resolver().get(CUSTOM_VAR, api_server_url, var_name)
+
+    if uid is not None:
+        return uid
+
+    params = {
+        'name': var_name
+    }
+
+    try:
+        url = api_server_url + CUSTOM_VAR_API_PATH
+        req = await get_default_client().get(url, headers=headers, params=params)
+        logging.debug(req.text)
+
+        if req.status_code != 404:
+            custom_var = json.loads(req.text)[0]
+            return get_default_resolver().put(CUSTOM_VAR, api_server_url, var_name, custom_var['id'])
+
+    except Exception as error:
+        logging.error('Error retrieving custom variable UID')
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_custom_var_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a custom_var based on the var_name.
+    '''
+
+    params = {
+        'name': var_name
+    }
+
+    try:
+        url = api_server_url + CUSTOM_VAR_API_PATH
+        req = await get_default_client().get(url, headers=headers, params=params)
+        logging.debug(req.text)
+
+        if req.status_code != 404:
+            return json.loads(req.text)[0]
+
+    except Exception as error:
+        logging.error('Error retrieving custom variable')
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def set_custom_var(var_uid, value, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Set the value of the custom_var with the uid of var_uid.
+    '''
+
+    try:
+        payload = { "custom_var_value": value}
+        url = api_server_url + CUSTOM_VAR_API_PATH + '/' + var_uid
+        req = await get_default_client().patch(url, headers=headers, data = json.dumps(payload))
+        logging.debug(req.text)
+
+    except Exception as error:
+        logging.error('Error setting custom variable')
+        logging.debug(str(error))
+        raise error
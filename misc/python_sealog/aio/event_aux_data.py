@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_aux_data.py
+
+DESCRIPTION:    This script contains the asyncio versions of the wrapper
+                functions for the sealog-server event_aux_data routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import logging
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(dirname(realpath(__file__))))))
+
+from misc.python_sealog.aio.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENT_AUX_DATA_API_PATH
+
+@instrumented
+async def get_event_aux_data_by_cruise(cruise_uid, datasource=[], limit=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the aux_data records for the given cruise_uid and optional
+    datasource.
+    '''
+
+    if not isinstance(datasource, list):
+        logging.warning("DEPRECIATED: datasource should be an array of strings")
+        datasource = [datasource]
+
+    params = {}
+
+    if datasource:
+        params['datasource'] = datasource
+
+    if limit > 0:
+        params['limit'] = limit
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code != 404:
+            event_aux_data = json.loads(req.text)
+            logging.debug(json.dumps(event_aux_data))
+            return event_aux_data
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_event_aux_data_by_lowering(lowering_uid, datasource=[], limit=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the aux_data records for the given lowering_uid and optional
+    datasource.
+    '''
+
+    if not isinstance(datasource, list):
+        logging.warning("DEPRECIATED: datasource should be an array of strings")
+        datasource = [datasource]
+
+    params = {}
+
+    if datasource:
+        params['datasource'] = datasource
+
+    if limit > 0:
+        params['limit'] = limit
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bylowering/' + lowering_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        event_aux_data = json.loads(req.text)
+        logging.debug(json.dumps(event_aux_data))
+        return event_aux_data
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_templates.py
+
+DESCRIPTION:    This script contains the asyncio versions of the wrapper
+                functions for the sealog-server event_template routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import logging
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(dirname(realpath(__file__))))))
+
+from misc.python_sealog.aio.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENT_TEMPLATES_API_PATH
+
+@instrumented
+async def get_event_templates(system=True, non_system=True, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the event_export for the event with the given event_uid.
+    '''
+
+    if not system and not non_system:
+        logging.warning("Requesting no system templates and no non-system templates will always result in no templates")
+        return []
+
+    try:
+        url = api_server_url + EVENT_TEMPLATES_API_PATH
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code != 404:
+            event_templates = json.loads(req.text)
+
+            if not system:
+                event_templates = [template for template in event_templates if not template['system_template']]
+
+            if not non_system:
+                event_templates = [template for template in event_templates if template['system_template']]
+
+            logging.debug(json.dumps(event_templates))
+            return event_templates
+
+        return []
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
+
+    return []
+    
\ No newline at end of file
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+'''
+FILE:           events.py
+
+DESCRIPTION:    This script contains the asyncio versions of the wrapper
+                functions for the sealog-server event routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import asyncio
+import logging
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(dirname(realpath(__file__))))))
+
+from misc.python_sealog.aio.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.events import EVENT_IDS_CHUNK_SIZE
+from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENTS_API_PATH
+
+@instrumented
+async def get_event(event_uid, export_format='json', add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return an event record based on the event_uid.  Returns the record as a json
+    object by default.  Set export_format to 'csv' to return the record in csv
+    format.
+    '''
+
+    params = {
+        'format': export_format,
+        'add_record_ids': add_record_ids
+    }
+    
+    try:
+        url = api_server_url + EVENTS_API_PATH + '/' + event_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+
+            return None
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_events(export_format='json', add_record_ids=False, event_filter=[], startTS=None, stopTS=None, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return event records based on the cruise_uid.  Returns the records as json
+    objects by default.  Set export_format to 'csv' to return the records in
+    csv format.  Optionally define an event_filter to filter the returned
+    events.
+    '''
+
+    if not isinstance(event_filter, list):
+        logging.warning("DEPRECIATED: event_filter should be an array of strings")
+        event_filter = [event_filter]
+
+    params = {
+        'format': export_format,
+        'add_record_ids': add_record_ids
+    }
+
+    if event_filter:
+        params['value'] = event_filter
+
+    if startTS is not None:
+        params['startTS'] = startTS
+
+    if stopTS is not None:
+        params['stopTS'] = stopTS
+
+    try:
+        url = api_server_url + EVENTS_API_PATH
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+
+        if req.status_code == 404:
+            if export_format == 'json':
+                return []
+
+            if export_format == 'csv':
+                return ""
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_events_by_cruise(cruise_uid, export_format='json', add_record_ids=False, event_filter=[], limit=0, offset=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return event records based on the cruise_uid.  Returns the records as json
+    objects by default.  Set export_format to 'csv' to return the records in
+    csv format.  Optionally define an event_filter to filter the returned
+    events.  Optionally set limit and offset to retrieve a single page of
+    records.
+    '''
+
+    if not isinstance(event_filter, list):
+        logging.warning("DEPRECIATED: event_filter should be an array of strings")
+        event_filter = [event_filter]
+
+    params = {
+        'format': export_format,
+        'add_record_ids': add_record_ids
+    }
+
+    if event_filter:
+        params['value'] = event_filter
+
+    if limit > 0:
+        params['limit'] = limit
+
+    if offset > 0:
+        params['offset'] = offset
+
+    try:
+        url = api_server_url + EVENTS_API_PATH + '/bycruise/' + cruise_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+
+        if req.status_code == 404:
+            if export_format == 'json':
+                return []
+
+            if export_format == 'csv':
+                return ""
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_events_by_lowering(lowering_uid, export_format='json', add_record_ids=False, event_filter=[], limit=0, offset=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return event records based on the lowering_uid.  Returns the records as
+    json objects by default.  Set export_format to 'csv' to return the records
+    in csv format.  Optionally define an event_filter to filter the returned
+    events.  Optionally set limit and offset to retrieve a single page of
+    records.
+    '''
+
+    if not isinstance(event_filter, list):
+        logging.warning("DEPRECIATED: event_filter should be an array of strings")
+        event_filter = [event_filter]
+
+    params = {
+        'format': export_format,
+        'add_record_ids': add_record_ids
+    }
+
+    if event_filter:
+        params['value'] = event_filter
+
+    if limit > 0:
+        params['limit'] = limit
+
+    if offset > 0:
+        params['offset'] = offset
+
+    try:
+        url = api_server_url + EVENTS_API_PATH + '/bylowering/' + lowering_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code == 200:
+
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+
+        if req.status_code == 404:
+            if export_format == 'json':
+                return []
+
+            if export_format == 'csv':
+                return ""
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+@instrumented
+async def get_events_by_ids(event_ids, add_record_ids=False, chunk_size=EVENT_IDS_CHUNK_SIZE, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the event records for a list of event_ids.  The ids are submitted
+    chunk_size ids per request and the requests are made concurrently.  The
+    records are returned in the order of event_ids.  Unknown ids are skipped.
+    '''
+
+    if chunk_size < 1 or chunk_size > EVENT_IDS_CHUNK_SIZE:
+        raise ValueError("chunk_size must be between 1 and {}".format(EVENT_IDS_CHUNK_SIZE))
+
+    params = {
+        'add_record_ids': add_record_ids
+    }
+
+    url = api_server_url + EVENTS_API_PATH + '/byids'
+
+    async def fetch_chunk(chunk):
+        payload = { 'ids': chunk }
+        req = await get_default_client().post(url, headers=headers, params=params, data=json.dumps(payload))
+
+        if req.status_code == 404:
+            return []
+
+        if req.status_code != 200:
+            raise ValueError("unable to retrieve events by id: {}".format(req.text))
+
+        return json.loads(req.text)
+
+    try:
+        chunks = [event_ids[idx:idx + chunk_size] for idx in range(0, len(event_ids), chunk_size)]
+        results = await asyncio.gather(*[fetch_chunk(chunk) for chunk in chunks])
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    events = {event['id']: event for result in results for event in result}
+
+    return [events[event_id] for event_id in dict.fromkeys(event_ids) if event_id in events]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+'''
+FILE:           misc.py
+
+DESCRIPTION:    This script contains the asyncio versions of miscellaneous
+                wrapper functions for the sealog-server api routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import logging
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(dirname(realpath(__file__))))))
+
+from misc.python_sealog.aio.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENT_AUX_DATA_API_PATH
+from misc.python_sealog.misc import DATA_SOURCE_FILTER, IMAGE_PATH, get_framegrab_list_by_file # pylint: disable=unused-import
+
+@instrumented
+async def get_framegrab_list_by_lowering(lowering_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Get the list of framegrabs for the given lowering_uid
+    '''
+
+    logging.debug("Exporting event data")
+
+    params = {
+        'datasource': DATA_SOURCE_FILTER
+    }
+
+    framegrab_filenames = []
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bylowering/' + lowering_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code != 404:
+            framegrabs = json.loads(req.text)
+            for data in framegrabs:
+                for framegrab in data['data_array']:
+                    if framegrab['data_name'] == 'filename':
+                        framegrab_filenames.append(framegrab['data_value'])
+
+    except Exception as error:
+        logging.error(str(error))
+
+    return framegrab_filenames
+
+@instrumented
+async def get_framegrab_list_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Get the list of framegrabs for the given cruise_uid
+    '''
+
+    logging.debug("Exporting event data")
+
+    params = {
+        'datasource': DATA_SOURCE_FILTER
+    }
+
+    framegrab_filenames = []
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid
+        req = await get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code != 404:
+            framegrabs = json.loads(req.text)
+            for data in framegrabs:
+                for framegrab in data['data_array']:
+                    if framegrab['data_name'] == 'filename':
+                        framegrab_filenames.append(framegrab['data_value'])
+
+    except Exception as error:
+        logging.error(str(error))
+
+    return framegrab_filenames
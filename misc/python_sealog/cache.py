@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+'''
+FILE:           cache.py
+
+DESCRIPTION:    This script contains the ResponseCache class used by the
+                SealogClient to store sealog-server API responses on local disk
+                and revalidate them using the ETag/Last-Modified headers
+                returned by the server.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Default location of the on-disk cache.
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'python_sealog')
+
+# Seconds a cached response is used without asking the server, 0 always
+# revalidates the response with the server.
+DEFAULT_TTL = 0
+
+# Maximum total size (bytes) of the cached responses.
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+# Response headers stored alongside the cached body.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class ResponseCache():
+    '''
+    Class that stores successful GET responses on local disk.  Responses
+    younger than ttl seconds are returned without contacting the server.
+    Older responses are revalidated with If-None-Match/If-Modified-Since and
+    re-used when the server replies 304 Not Modified.  Responses without an
+    ETag or Last-Modified header are only cached when ttl is greater than 0.
+    The least recently used responses are evicted once the cache grows
+    beyond max_size bytes.
+    '''
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    @staticmethod
+    def build_key(url, params=None, headers=None):
+        '''
+        Return the cache key for a request.  The Authorization header is part
+        of the key so users with different permissions never share entries.
+        '''
+
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        auth = CaseInsensitiveDict(headers or {}).get('Authorization', '')
+
+        return hashlib.sha1('\n'.join([url, query, auth]).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._cache_dir, key + '.json')
+
+    def _write(self, key, entry):
+        '''
+        Atomically write the entry to disk.  Returns False on failure.
+        '''
+
+        try:
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+                json.dump(entry, file)
+
+            os.replace(tmp_path, self._path(key))
+
+        except OSError as error:
+            logging.warning("Unable to cache response for %s: %s", entry['url'], str(error))
+            return False
+
+        return True
+
+    def get(self, key):
+        '''
+        Return the cached entry for the key or None if there isn't one.
+        '''
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+
+            # mark the entry as recently used
+            os.utime(self._path(key))
+            return entry
+
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, response):
+        '''
+        Store a successful response under the key.  Returns the stored entry
+        or None if the response can not be cached.
+        '''
+
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+
+        if self._ttl <= 0 and 'ETag' not in headers and 'Last-Modified' not in headers:
+            return None
+
+        entry = {
+            'url': response.url,
+            'stored': time.time(),
+            'headers': headers,
+            'encoding': response.encoding or 'utf-8',
+            'body': response.text
+        }
+
+        with self._lock:
+            if not self._write(key, entry):
+                return None
+
+            self._evict()
+
+        return entry
+
+    def touch(self, key, entry):
+        '''
+        Reset the age of an entry that the server reported as unchanged.
+        '''
+
+        entry['stored'] = time.time()
+
+        with self._lock:
+            self._write(key, entry)
+
+    def is_fresh(self, entry):
+        '''
+        Return True if the entry can be used without revalidation.
+        '''
+
+        return time.time() - entry['stored'] < self._ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        '''
+        Return the headers used to revalidate the entry with the server.
+        '''
+
+        headers = {}
+
+        if 'ETag' in entry['headers']:
+            headers['If-None-Match'] = entry['headers']['ETag']
+
+        if 'Last-Modified' in entry['headers']:
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+        return headers
+
+    @staticmethod
+    def build_response(entry):
+        '''
+        Return a requests.Response rebuilt from a cached entry.
+        '''
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response.encoding = entry['encoding']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body'].encode(entry['encoding']) # pylint: disable=protected-access
+        response._content_consumed = True # pylint: disable=protected-access
+        response.from_cache = True
+
+        return response
+
+    def _evict(self):
+        '''
+        Delete the least recently used entries until the cache is smaller than
+        max_size.
+        '''
+
+        entries = []
+        total_size = 0
+
+        with os.scandir(self._cache_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if not dir_entry.name.endswith('.json'):
+                    continue
+
+                stat = dir_entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                total_size += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        '''
+        Delete all cached responses.
+        '''
+
+        with self._lock:
+            for filename in os.listdir(self._cache_dir):
+                if filename.endswith('.json'):
+                    os.remove(os.path.join(self._cache_dir, filename))
+
+    @property
+    def cache_dir(self):
+        '''
+        Getter method for the _cache_dir property
+        '''
+        return self._cache_dir
+
+    @property
+    def ttl(self):
+        '''
+        Getter method for the _ttl property
+        '''
+        return self._ttl
+
+    @property
+    def max_size(self):
+        '''
+        Getter method for the _max_size property
+        '''
+        return self._max_size
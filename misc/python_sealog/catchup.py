@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+'''
+FILE:           catchup.py
+
+DESCRIPTION:    This script contains the EventCatchup class used by the
+                SealogWSRuntime to replay the events and aux_data records
+                created or modified while the websocket was disconnected.
+
+BUGS:
+NOTES:          The cursor is the modified_ts of the oldest event message not
+                yet handled, or of the most recent one handled, and is saved
+                to the state file.  After each (re)connection the changes
+                since the cursor are retrieved with get_event_changes_since
+                and dispatched as if they had been published.  The first
+                connection without a state file starts from the current time.
+
+                Replayed events with a ts after the cursor and not dispatched
+                before are sent to /ws/status/newEvents, the others to
+                /ws/status/updateEvents.
+                Replayed aux_data records are dispatched to
+                /ws/status/newEventAuxData and carry the event_id but no id.
+                Deleted events are not replayed.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import os
+import sys
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.python_sealog.dedup import ExpiringIDSet
+from misc.python_sealog.event_exports import get_event_changes_since, CHANGES_OVERLAP
+from misc.python_sealog.settings import API_SERVER_URL, HEADERS
+
+# The paths of the messages tracked and replayed.
+CATCHUP_PATHS = ('/ws/status/newEvents', '/ws/status/updateEvents', '/ws/status/newEventAuxData', '/ws/status/updateEventAuxData')
+
+# Seconds between saves of the cursor.
+DEFAULT_SAVE_INTERVAL = 5
+
+# Seconds the dispatched messages are remembered so the live messages and
+# the replayed changes are not dispatched twice.
+DEFAULT_SEEN_TTL = 600
+
+
+def _parse_ts(timestamp):
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _format_ts(timestamp):
+    return timestamp.astimezone(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _message_key(path, message):
+    '''
+    Return the key identifying a version of an event or aux_data record,
+    the same for the live message and the replayed change.
+    '''
+
+    if 'AuxData' in path:
+        return ('aux_data', message.get('event_id'), message.get('data_source'), message.get('modified_ts'))
+
+    return ('event', message.get('id'), message.get('modified_ts'))
+
+
+class _Tracked():
+    '''
+    Class holding an event message dispatched but not yet handled by all its
+    handlers.
+    '''
+
+    __slots__ = ('modified', 'key', 'remaining')
+
+    def __init__(self, modified, key):
+
+        self.modified = modified
+        self.key = key
+        self.remaining = 1
+
+
+class EventCatchup():
+    '''
+    Class that keeps the cursor of the event messages handled by a
+    SealogWSRuntime and returns the changes missed since, see
+    SealogWSRuntime.enable_catchup.  Only used from the runtime's event loop
+    except for changes(), which does not touch the tracking state.
+    '''
+
+    def __init__(self, state_file, event_filter=[], overlap=CHANGES_OVERLAP, api_server_url=API_SERVER_URL, headers=HEADERS, # pylint: disable=too-many-arguments,dangerous-default-value
+                 save_interval=DEFAULT_SAVE_INTERVAL, seen_ttl=DEFAULT_SEEN_TTL):
+
+        self._state_file = state_file
+        self._event_filter = event_filter
+        self._overlap = overlap
+        self._api_server_url = api_server_url
+        self._headers = headers
+        self._save_interval = save_interval
+        self._seen = ExpiringIDSet(ttl=seen_ttl)
+        self._inflight = set()
+        self._recent = []
+        self._handled = None
+        self._last_id = None
+        self._saved = None
+        self._cursor = None
+        self.replayed = 0
+        self.duplicates = 0
+
+        self._load()
+
+    def _load(self):
+
+        if not os.path.isfile(self._state_file):
+            return
+
+        try:
+            with open(self._state_file, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+
+            self._cursor = state.get('cursor')
+            self._last_id = state.get('last_id')
+            self._saved = self._cursor
+
+            # the messages handled within the overlap are not replayed again
+            for key in state.get('recent', []):
+                self._remember(tuple(key))
+
+        except (OSError, ValueError) as err:
+            logging.warning("Could not read the catch-up state from %s: %s", self._state_file, str(err))
+
+    def save(self):
+        '''
+        Write the cursor to the state file if it changed.
+        '''
+
+        cursor = self.cursor
+
+        if cursor is None or cursor == self._saved:
+            return
+
+        since = _parse_ts(cursor) - timedelta(seconds=self._overlap)
+        self._recent = [(modified, key) for modified, key in self._recent if modified >= since]
+
+        tmp_file = self._state_file + '.tmp'
+
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump({'cursor': cursor, 'last_id': self._last_id, 'recent': [key for _, key in self._recent]}, file)
+
+        os.replace(tmp_file, self._state_file)
+        self._saved = cursor
+
+    def _remember(self, key):
+
+        self._seen.add(key)
+
+        # the events already dispatched are replayed as updates
+        if key[0] == 'event':
+            self._seen.add(key[:2])
+
+    def seen(self, path, message):
+        '''
+        Return True if the message was already dispatched, otherwise remember
+        it and return False.
+        '''
+
+        if path not in CATCHUP_PATHS or not message.get('modified_ts'):
+            return False
+
+        key = _message_key(path, message)
+
+        if key in self._seen:
+            self.duplicates += 1
+            return True
+
+        self._remember(key)
+        return False
+
+    def track(self, path, message):
+        '''
+        Start tracking a dispatched event message.  Returns the token to
+        release() once the message is handled, or None if the message is
+        not tracked.
+        '''
+
+        if path not in CATCHUP_PATHS or not message.get('modified_ts'):
+            return None
+
+        token = _Tracked(_parse_ts(message['modified_ts']), _message_key(path, message))
+        self._inflight.add(token)
+
+        return token
+
+    def release(self, token):
+        '''
+        Release one reference to the token, the message is handled once the
+        last reference is released.
+        '''
+
+        if token is None:
+            return
+
+        token.remaining -= 1
+
+        if token.remaining > 0:
+            return
+
+        self._inflight.discard(token)
+        self._recent.append((token.modified, token.key))
+
+        if self._handled is None or token.modified > self._handled:
+            self._handled = token.modified
+            self._last_id = token.key[1]
+
+    def start(self):
+        '''
+        Start from the current time if there is no cursor yet.  Returns True
+        if there is a cursor to catch up from.
+        '''
+
+        if self.cursor is not None:
+            return True
+
+        self._cursor = _format_ts(datetime.now(timezone.utc))
+        self.save()
+
+        logging.info("No catch-up cursor, starting from %s", self._cursor)
+
+        return False
+
+    def changes(self, cursor):
+        '''
+        Return the (path, message) tuples of the event and aux_data records
+        created or modified since the cursor, oldest first.
+        '''
+
+        changes, _ = get_event_changes_since(cursor, self._event_filter, self._overlap, api_server_url=self._api_server_url, headers=self._headers)
+
+        since = _parse_ts(cursor) - timedelta(seconds=self._overlap)
+        replay = []
+
+        for event in changes:
+            aux_data = event.pop('aux_data', None) or []
+
+            if event.get('modified_ts') and _parse_ts(event['modified_ts']) >= since:
+                is_new = _parse_ts(event['ts']) >= since and ('event', event['id']) not in self._seen
+                path = '/ws/status/newEvents' if is_new else '/ws/status/updateEvents'
+                replay.append((_parse_ts(event['modified_ts']), path, event))
+
+            for record in aux_data:
+                if record.get('modified_ts') and _parse_ts(record['modified_ts']) >= since:
+                    replay.append((_parse_ts(record['modified_ts']), '/ws/status/newEventAuxData', dict(record, event_id=event['id'])))
+
+        replay.sort(key=lambda change: change[0])
+
+        return [(path, message) for _, path, message in replay]
+
+    def stats(self):
+        '''
+        Return the cursor, the messages replayed and the duplicate messages
+        skipped.
+        '''
+
+        return {
+            'cursor': self.cursor,
+            'last_id': self._last_id,
+            'replayed': self.replayed,
+            'duplicates': self.duplicates,
+            'inflight': len(self._inflight)
+        }
+
+    @property
+    def cursor(self):
+        '''
+        The modified_ts of the oldest tracked message not yet handled, or of
+        the most recent one handled.
+        '''
+
+        if self._inflight:
+            return _format_ts(min(token.modified for token in self._inflight))
+
+        if self._handled is not None:
+            return _format_ts(self._handled)
+
+        return self._cursor
+
+    @property
+    def save_interval(self):
+        '''
+        Getter method for the _save_interval property
+        '''
+        return self._save_interval
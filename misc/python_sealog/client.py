@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+'''
+FILE:           client.py
+
+DESCRIPTION:    This script contains the SealogClient class that owns the
+                pooled, keep-alive HTTP session used by the python_sealog
+                wrapper functions to communicate with the sealog-server API.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.python_sealog import metrics
+
+# Maximum number of keep-alive connections held open per host.
+DEFAULT_POOL_SIZE = 10
+
+# Number of times an idempotent request is retried on connection errors or on
+# the RETRY_STATUS_CODES responses.
+DEFAULT_RETRIES = 3
+
+# Backoff factor (seconds) between retries: 0.5, 1.0, 2.0, ...
+DEFAULT_BACKOFF_FACTOR = 0.5
+
+# Seconds to wait for the server to connect/respond, None waits forever.
+DEFAULT_TIMEOUT = None
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class SealogClient():
+    '''
+    Class that owns a pooled requests.Session used to talk to the
+    sealog-server API.  Connections are kept alive and re-used between calls
+    and idempotent requests (GET, DELETE, ...) are retried with exponential
+    backoff.  POST and PATCH requests are never retried.  Optionally pass a
+    ResponseCache to store GET responses on local disk.
+    '''
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, timeout=DEFAULT_TIMEOUT, cache=None):
+
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._cache = cache
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False
+        )
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self._session = requests.Session()
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        '''
+        Submit a request to the sealog-server using the pooled session.
+        '''
+
+        kwargs.setdefault('timeout', self._timeout)
+
+        if not metrics.is_enabled():
+            return self._session.request(method, url, **kwargs)
+
+        start = time.perf_counter()
+
+        try:
+            response = self._session.request(method, url, **kwargs)
+        except Exception:
+            metrics.record_request(method, url, time.perf_counter() - start)
+            raise
+
+        response_bytes = int(response.headers.get('Content-Length', 0)) if kwargs.get('stream') else len(response.content)
+        metrics.record_request(method, url, time.perf_counter() - start, response.status_code, response_bytes)
+
+        return response
+
+    def get(self, url, **kwargs):
+        '''
+        Submit a GET request to the sealog-server.  If the client has a cache
+        the response is returned from, revalidated against, or stored in the
+        cache.  Streamed requests always bypass the cache.
+        '''
+
+        if self._cache is None or kwargs.get('stream'):
+            return self.request('GET', url, **kwargs)
+
+        key = self._cache.build_key(url, kwargs.get('params'), kwargs.get('headers'))
+        entry = self._cache.get(key)
+
+        if entry is not None:
+            if self._cache.is_fresh(entry):
+                response = self._cache.build_response(entry)
+                metrics.record_request('GET', url, 0.0, response.status_code, len(response.content), from_cache=True)
+                return response
+
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **self._cache.conditional_headers(entry)}
+
+        response = self.request('GET', url, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self._cache.touch(key, entry)
+            return self._cache.build_response(entry)
+
+        if response.status_code == 200:
+            self._cache.put(key, response)
+
+        return response
+
+    def post(self, url, **kwargs):
+        '''
+        Submit a POST request to the sealog-server.
+        '''
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        '''
+        Submit a PATCH request to the sealog-server.
+        '''
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        '''
+        Submit a DELETE request to the sealog-server.
+        '''
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        '''
+        Close all pooled connections.
+        '''
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def pool_size(self):
+        '''
+        Getter method for the _pool_size property
+        '''
+        return self._pool_size
+
+    @property
+    def cache(self):
+        '''
+        Getter method for the _cache property
+        '''
+        return self._cache
+
+    @property
+    def session(self):
+        '''
+        Getter method for the _session property
+        '''
+        return self._session
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    '''
+    Return the SealogClient shared by the python_sealog wrapper functions,
+    creating it on first use.
+    '''
+
+    global _default_client # pylint: disable=global-statement
+
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = SealogClient()
+
+    return _default_client
+
+
+def set_default_client(client):
+    '''
+    Replace the SealogClient shared by the python_sealog wrapper functions,
+    i.e. to change the pool size, retry or timeout settings.  Returns the
+    previous client.
+    '''
+
+    global _default_client # pylint: disable=global-statement
+
+    with _default_client_lock:
+        previous_client = _default_client
+        _default_client = client
+
+    return previous_client
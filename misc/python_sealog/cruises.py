@@ -20,13 +20,16 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.resolver import CRUISE, get_default_resolver
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, CRUISES_API_PATH
 
+@instrumented
 def get_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return a cruise record based on the cruise_id.  Returns the record as a json
@@ -40,7 +43,7 @@ def get_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL,
 
     try:
         url = api_server_url + CRUISES_API_PATH + '/' + cruise_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -58,6 +61,7 @@ def get_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL,
     return None
 
 
+@instrumented
 def get_cruises(export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return all cruise records.  Returns the records as json objects by default
@@ -70,7 +74,7 @@ def get_cruises(export_format='json', api_server_url=API_SERVER_URL, headers=HEA
 
     try:
         url = api_server_url + CRUISES_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -93,23 +97,30 @@ def get_cruises(export_format='json', api_server_url=API_SERVER_URL, headers=HEA
     return None
 
 
+@instrumented
 def get_cruise_uid_by_id(cruise_id, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
-    Return the UID for a cruise record based on the cruise_id.
+    Return the UID for a cruise record based on the cruise_id.  The UID
+    is cached by the shared UIDResolver.
     '''
 
+    uid = get_default_resolver().get(CRUISE, api_server_url, cruise_id)
+
+    if uid is not None:
+        return uid
+
     params = {
         'cruise_id': cruise_id
     }
 
     try:
         url = api_server_url + CRUISES_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             cruise = json.loads(req.text)[0]
 
-            return cruise['id']
+            return get_default_resolver().put(CRUISE, api_server_url, cruise_id, cruise['id'])
 
     except Exception as error:
         logging.error(str(error))
@@ -118,6 +129,7 @@ def get_cruise_uid_by_id(cruise_id, api_server_url=API_SERVER_URL, headers=HEADE
     return None
 
 
+@instrumented
 def get_cruise_by_id(cruise_id, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the cruise record based on the cruise_id.  Returns the records as json
@@ -132,7 +144,7 @@ def get_cruise_by_id(cruise_id, export_format='json', api_server_url=API_SERVER_
 
     try:
         url = api_server_url + CRUISES_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -150,6 +162,7 @@ def get_cruise_by_id(cruise_id, export_format='json', api_server_url=API_SERVER_
     return None
 
 
+@instrumented
 def get_cruise_by_lowering(lowering_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the cruise record that contains the lowering whose uid is
@@ -163,7 +176,7 @@ def get_cruise_by_lowering(lowering_uid, export_format='json', api_server_url=AP
 
     try:
         url = api_server_url + CRUISES_API_PATH + '/bylowering/' + lowering_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -181,6 +194,7 @@ def get_cruise_by_lowering(lowering_uid, export_format='json', api_server_url=AP
     return None
 
 
+@instrumented
 def get_cruise_by_event(event_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the cruise record that contains the event whose uid is
@@ -194,7 +208,7 @@ def get_cruise_by_event(event_uid, export_format='json', api_server_url=API_SERV
 
     try:
         url = api_server_url + CRUISES_API_PATH + '/byevent/' + event_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
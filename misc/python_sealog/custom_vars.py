@@ -20,13 +20,16 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.resolver import CUSTOM_VAR, get_default_resolver
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, CUSTOM_VAR_API_PATH
 
+@instrumented
 def get_custom_var(var_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return a custom_var record based on the var_uid.
@@ -34,7 +37,7 @@ def get_custom_var(var_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
 
     try:
         url = api_server_url + CUSTOM_VAR_API_PATH + '/' + var_uid
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
         logging.debug(req.text)
 
         if req.status_code != 404:
@@ -50,23 +53,30 @@ def get_custom_var(var_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     return None
 
 
+@instrumented
 def get_custom_var_uid_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
-    Return a custom_var uid based on the var_name.
+    Return a custom_var uid based on the var_name.  The UID is cached by the
+    shared UIDResolver.
     '''
 
+    uid = get_default_resolver().get(CUSTOM_VAR, api_server_url, var_name)
+
+    if uid is not None:
+        return uid
+
     params = {
         'name': var_name
     }
 
     try:
         url = api_server_url + CUSTOM_VAR_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
         logging.debug(req.text)
 
         if req.status_code != 404:
             custom_var = json.loads(req.text)[0]
-            return custom_var['id']
+            return get_default_resolver().put(CUSTOM_VAR, api_server_url, var_name, custom_var['id'])
 
     except Exception as error:
         logging.error('Error retrieving custom variable UID')
@@ -76,6 +86,7 @@ def get_custom_var_uid_by_name(var_name, api_server_url=API_SERVER_URL, headers=
     return None
 
 
+@instrumented
 def get_custom_var_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return a custom_var based on the var_name.
@@ -87,7 +98,7 @@ def get_custom_var_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEAD
 
     try:
         url = api_server_url + CUSTOM_VAR_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
         logging.debug(req.text)
 
         if req.status_code != 404:
@@ -101,6 +112,7 @@ def get_custom_var_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEAD
     return None
 
 
+@instrumented
 def set_custom_var(var_uid, value, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Set the value of the custom_var with the uid of var_uid.
@@ -109,7 +121,7 @@ def set_custom_var(var_uid, value, api_server_url=API_SERVER_URL, headers=HEADER
     try:
         payload = { "custom_var_value": value}
         url = api_server_url + CUSTOM_VAR_API_PATH + '/' + var_uid
-        req = requests.patch(url, headers=headers, data = json.dumps(payload))
+        req = get_default_client().patch(url, headers=headers, data = json.dumps(payload))
         logging.debug(req.text)
 
     except Exception as error:
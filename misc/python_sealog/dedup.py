@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+'''
+FILE:           dedup.py
+
+DESCRIPTION:    This script contains the ExpiringIDSet class, a bounded set of
+                IDs that expire after a time to live, used to recognize the
+                echoes of the messages the repeater sent.
+
+BUGS:
+NOTES:          Adding, checking and removing an ID are O(1).  IDs are kept
+                in insertion order so the expired IDs, and the oldest IDs once
+                max_size is reached, are dropped from the front.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import time
+import threading
+from collections import OrderedDict
+
+# Seconds an ID is kept.
+DEFAULT_TTL = 600
+
+# Most IDs kept, the oldest IDs are dropped first.
+DEFAULT_MAX_SIZE = 10000
+
+
+class ExpiringIDSet():
+    '''
+    Class holding a set of hashable IDs, each forgotten ttl seconds after it
+    was added or once max_size newer IDs were added.  Safe to use from
+    several threads.  hits and misses count the pop() calls that found or
+    did not find the ID, expired and evicted count the IDs dropped because
+    of the ttl and of max_size.
+    '''
+
+    def __init__(self, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE, clock=time.monotonic):
+
+        self._ttl = ttl
+        self._max_size = max_size
+        self._clock = clock
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _expire(self, now):
+
+        while self._ids:
+            _id, expires = next(iter(self._ids.items()))
+
+            if expires > now:
+                break
+
+            del self._ids[_id]
+            self.expired += 1
+
+    def add(self, _id):
+        '''
+        Add the ID, or restart its time to live if already present.
+        '''
+
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+
+            self._ids.pop(_id, None)
+            self._ids[_id] = now + self._ttl
+
+            while len(self._ids) > self._max_size:
+                self._ids.popitem(last=False)
+                self.evicted += 1
+
+    def pop(self, _id):
+        '''
+        Remove the ID, returns True if it was present and not expired.
+        '''
+
+        with self._lock:
+            self._expire(self._clock())
+
+            if self._ids.pop(_id, None) is None:
+                self.misses += 1
+                return False
+
+            self.hits += 1
+            return True
+
+    def __contains__(self, _id):
+
+        with self._lock:
+            self._expire(self._clock())
+            return _id in self._ids
+
+    def __len__(self):
+
+        with self._lock:
+            self._expire(self._clock())
+            return len(self._ids)
+
+    def stats(self):
+        '''
+        Return the hits, misses, expired and evicted counts and the current
+        size.
+        '''
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'size': len(self)
+        }
+
+    def to_prometheus(self, name):
+        '''
+        Return the counters as lines in the Prometheus text exposition
+        format, labelled with the set name, see metrics.register_collector.
+        '''
+
+        stats = self.stats()
+        labels = 'set="{}"'.format(name)
+
+        return [
+            'python_sealog_dedup_hits_total{{{}}} {}'.format(labels, stats['hits']),
+            'python_sealog_dedup_misses_total{{{}}} {}'.format(labels, stats['misses']),
+            'python_sealog_dedup_expired_total{{{}}} {}'.format(labels, stats['expired']),
+            'python_sealog_dedup_evicted_total{{{}}} {}'.format(labels, stats['evicted']),
+            'python_sealog_dedup_size{{{}}} {}'.format(labels, stats['size'])
+        ]
@@ -20,17 +20,28 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
+from itertools import islice
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.json_stream import iter_response_records
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENT_AUX_DATA_API_PATH
 
-def get_event_aux_data_by_cruise(cruise_uid, datasource=[], limit=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+# Maximum number of records accepted by the /event_aux_data/bulk route.
+MAX_BULK_BATCH_SIZE = 1000
+
+# Number of records submitted per bulk request.
+DEFAULT_BULK_BATCH_SIZE = 500
+
+@instrumented
+def get_event_aux_data_by_cruise(cruise_uid, datasource=[], limit=0, stream=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the aux_data records for the given cruise_uid and optional
-    datasource.
+    datasource.  Set stream to True to return a generator that decodes the
+    records incrementally as they are received.
     '''
 
     if not isinstance(datasource, list):
@@ -47,9 +58,12 @@ def get_event_aux_data_by_cruise(cruise_uid, datasource=[], limit=0, api_server_
 
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params, stream=stream)
 
         if req.status_code != 404:
+            if stream:
+                return iter_response_records(req)
+
             event_aux_data = json.loads(req.text)
             logging.debug(json.dumps(event_aux_data))
             return event_aux_data
@@ -61,10 +75,12 @@ def get_event_aux_data_by_cruise(cruise_uid, datasource=[], limit=0, api_server_
     return None
 
 
-def get_event_aux_data_by_lowering(lowering_uid, datasource=[], limit=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+@instrumented
+def get_event_aux_data_by_lowering(lowering_uid, datasource=[], limit=0, stream=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the aux_data records for the given lowering_uid and optional
-    datasource.
+    datasource.  Set stream to True to return a generator that decodes the
+    records incrementally as they are received.
     '''
 
     if not isinstance(datasource, list):
@@ -81,7 +97,10 @@ def get_event_aux_data_by_lowering(lowering_uid, datasource=[], limit=0, api_ser
 
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bylowering/' + lowering_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params, stream=stream)
+
+        if stream:
+            return iter_response_records(req) if req.status_code != 404 else None
 
         event_aux_data = json.loads(req.text)
         logging.debug(json.dumps(event_aux_data))
@@ -90,3 +109,51 @@ def get_event_aux_data_by_lowering(lowering_uid, datasource=[], limit=0, api_ser
     except Exception as error:
         logging.debug(str(error))
         raise error
+
+
+@instrumented
+def post_event_aux_data_bulk(records, batch_size=DEFAULT_BULK_BATCH_SIZE, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Create or update many aux_data records, batch_size records per request.
+    records can be any iterable, i.e. a generator, and is consumed one batch
+    at a time.  Records are matched by id, or by event_id and data_source.
+    Returns the total insertedCount, updatedCount and skippedCount reported
+    by the server.  Records for unknown events are skipped.
+    '''
+
+    if batch_size < 1 or batch_size > MAX_BULK_BATCH_SIZE:
+        raise ValueError("batch_size must be between 1 and {}".format(MAX_BULK_BATCH_SIZE))
+
+    totals = {
+        'insertedCount': 0,
+        'updatedCount': 0,
+        'skippedCount': 0
+    }
+
+    records = iter(records)
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bulk'
+
+        while True:
+            batch = list(islice(records, batch_size))
+
+            if not batch:
+                break
+
+            req = get_default_client().post(url, headers=headers, data=json.dumps(batch))
+
+            if req.status_code != 200:
+                raise ValueError("unable to submit aux_data records: {}".format(req.text))
+
+            result = json.loads(req.text)
+            logging.debug("Bulk aux_data result: %s", result)
+
+            for key, value in result.items():
+                totals[key] = totals.get(key, 0) + value
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return totals
@@ -20,13 +20,23 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.json_stream import iter_response_records
+from misc.python_sealog.pagination import DEFAULT_PAGE_SIZE, iter_pages
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENT_EXPORTS_API_PATH
 
+# Seconds subtracted from the cursor when requesting changes so records
+# written while the previous sync was running are not missed.
+CHANGES_OVERLAP = 5
+
+@instrumented
 def get_event_export(event_uid, export_format='json', event_filter=[], add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the event_export for the event with the given event_uid.
@@ -43,7 +53,7 @@ def get_event_export(event_uid, export_format='json', event_filter=[], add_recor
 
     try:
         url = api_server_url + EVENT_EXPORTS_API_PATH + '/' + event_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code != 404:
             event = json.loads(req.text)
@@ -57,6 +67,7 @@ def get_event_export(event_uid, export_format='json', event_filter=[], add_recor
     return None
 
 
+@instrumented
 def get_event_exports(export_format='json', event_filter=[], startTS=None, stopTS=None, add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the event_exports for the lowering with the given lowering_uid.
@@ -86,7 +97,7 @@ def get_event_exports(export_format='json', event_filter=[], startTS=None, stopT
 
     try:
         url = api_server_url + EVENT_EXPORTS_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code != 404:
 
@@ -103,12 +114,16 @@ def get_event_exports(export_format='json', event_filter=[], startTS=None, stopT
     return None
 
 
-def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter=[], add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
+@instrumented
+def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter=[], add_record_ids=False, limit=0, offset=0, stream=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the event_exports for the cruise with the given cruise_uid.  Returns
     the records as an array of json objects by default.  Set export_format to
     'csv' to return the records in csv format.  Optionally set a event_filter
     that will limit the returns to on the events that match the event_filter.
+    Optionally set limit and offset to retrieve a single page of records.  Set
+    stream to True to return a generator that decodes the json records
+    incrementally as they are received.
     '''
 
     if not isinstance(event_filter, list):
@@ -123,13 +138,22 @@ def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter=[
     if event_filter:
         params['value'] = event_filter
 
+    if limit > 0:
+        params['limit'] = limit
+
+    if offset > 0:
+        params['offset'] = offset
+
     try:
         url = api_server_url + EVENT_EXPORTS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params, stream=stream)
 
         if req.status_code != 404:
 
             if export_format == 'json':
+                if stream:
+                    return iter_response_records(req)
+
                 events = json.loads(req.text)
                 return events
 
@@ -142,13 +166,16 @@ def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter=[
     return None
 
 
-def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filter=[], add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
+@instrumented
+def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filter=[], add_record_ids=False, limit=0, offset=0, stream=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the event_exports for the lowering with the given lowering_uid.
     Returns the records as an array of json objects by default.  Set
     export_format to 'csv' to return the records in csv format.  Optionally set
     a event_filter that will limit the returns to on the events that match the
-    event_filter.
+    event_filter.  Optionally set limit and offset to retrieve a single page of
+    records.  Set stream to True to return a generator that decodes the json
+    records incrementally as they are received.
     '''
 
     if not isinstance(event_filter, list):
@@ -163,13 +190,22 @@ def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filt
     if event_filter:
         params['value'] = event_filter
 
+    if limit > 0:
+        params['limit'] = limit
+
+    if offset > 0:
+        params['offset'] = offset
+
     try:
         url = api_server_url + EVENT_EXPORTS_API_PATH + '/bylowering/' + lowering_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params, stream=stream)
 
         if req.status_code != 404:
 
             if export_format == 'json':
+                if stream:
+                    return iter_response_records(req)
+
                 events = json.loads(req.text)
                 return events
 
@@ -180,3 +216,124 @@ def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filt
         raise error
 
     return None
+
+
+def iter_event_exports_by_cruise(cruise_uid, page_size=DEFAULT_PAGE_SIZE, prefetch=True, event_filter=[], add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a generator that yields the event_exports for the cruise with the
+    given cruise_uid one at a time.  The records are retrieved lazily,
+    page_size records per request, so memory use stays flat regardless of the
+    size of the cruise.  Set prefetch to False to disable requesting the next
+    page in the background.
+    '''
+
+    def fetch_page(limit, offset):
+        return get_event_exports_by_cruise(cruise_uid, event_filter=event_filter, add_record_ids=add_record_ids, limit=limit, offset=offset, api_server_url=api_server_url, headers=headers)
+
+    return iter_pages(fetch_page, page_size, prefetch)
+
+
+def iter_event_exports_by_lowering(lowering_uid, page_size=DEFAULT_PAGE_SIZE, prefetch=True, event_filter=[], add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a generator that yields the event_exports for the lowering with
+    the given lowering_uid one at a time.  The records are retrieved lazily,
+    page_size records per request, so memory use stays flat regardless of the
+    size of the lowering.  Set prefetch to False to disable requesting the
+    next page in the background.
+    '''
+
+    def fetch_page(limit, offset):
+        return get_event_exports_by_lowering(lowering_uid, event_filter=event_filter, add_record_ids=add_record_ids, limit=limit, offset=offset, api_server_url=api_server_url, headers=headers)
+
+    return iter_pages(fetch_page, page_size, prefetch)
+
+
+def _parse_ts(timestamp):
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _format_ts(timestamp):
+    return timestamp.astimezone(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def build_changes_params(cursor, event_filter=[], overlap=CHANGES_OVERLAP):
+    '''
+    Return the query parameters used to request the event_exports that
+    changed since the cursor.
+    '''
+
+    params = {
+        'format': 'json',
+        'add_record_ids': True
+    }
+
+    if event_filter:
+        params['value'] = event_filter
+
+    if cursor is not None:
+        params['modified_since'] = _format_ts(_parse_ts(cursor) - timedelta(seconds=overlap))
+
+    return params
+
+
+def build_changes_cursor(changes, cursor, response_headers):
+    '''
+    Return the cursor to use for the next changes request.  This is the most
+    recent modified_ts of the returned events and aux_data records, the
+    previous cursor if nothing changed or the server time for the first sync.
+    '''
+
+    modified = [
+        _parse_ts(record['modified_ts'])
+        for event in changes
+        for record in [event] + event.get('aux_data', [])
+        if record.get('modified_ts')
+    ]
+
+    if modified:
+        return _format_ts(max(modified))
+
+    if cursor is not None:
+        return cursor
+
+    if response_headers.get('Date'):
+        return _format_ts(parsedate_to_datetime(response_headers['Date']))
+
+    return _format_ts(datetime.now(timezone.utc))
+
+
+@instrumented
+def get_event_changes_since(cursor=None, event_filter=[], overlap=CHANGES_OVERLAP, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the event_exports for the events where the event or its aux_data
+    has been created or modified since the cursor, and the cursor to pass to
+    the next call, as a tuple.  Set cursor to None to retrieve all events.
+    The request overlaps the previous one by overlap seconds so changes may
+    be returned more than once.  Deleted events are not reported.  Raises
+    ValueError if the server does not return the changes.
+    '''
+
+    if not isinstance(event_filter, list):
+        logging.warning("DEPRECIATED: event_filter should be an array of strings")
+        event_filter = [event_filter]
+
+    params = build_changes_params(cursor, event_filter, overlap)
+
+    try:
+        url = api_server_url + EVENT_EXPORTS_API_PATH
+        req = get_default_client().get(url, headers=headers, params=params)
+
+        if req.status_code == 404:
+            changes = []
+
+        elif req.status_code != 200:
+            raise ValueError("unable to retrieve the event changes: {}".format(req.text))
+
+        else:
+            changes = json.loads(req.text)
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return changes, build_changes_cursor(changes, cursor, req.headers)
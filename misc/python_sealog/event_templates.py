@@ -20,13 +20,15 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENT_TEMPLATES_API_PATH
 
+@instrumented
 def get_event_templates(system=True, non_system=True, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the event_export for the event with the given event_uid.
@@ -38,7 +40,7 @@ def get_event_templates(system=True, non_system=True, api_server_url=API_SERVER_
 
     try:
         url = api_server_url + EVENT_TEMPLATES_API_PATH
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code != 404:
             event_templates = json.loads(req.text)
@@ -20,13 +20,20 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.json_stream import iter_response_records
+from misc.python_sealog.pagination import DEFAULT_PAGE_SIZE, iter_pages
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, EVENTS_API_PATH
 
+# Maximum number of event ids accepted by the /events/byids route.
+EVENT_IDS_CHUNK_SIZE = 1000
+
+@instrumented
 def get_event(event_uid, export_format='json', add_record_ids=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return an event record based on the event_uid.  Returns the record as a json
@@ -40,9 +47,8 @@ def get_event(event_uid, export_format='json', add_record_ids=False, api_server_
     }
     
     try:
-        # url = api_server_url + EVENTS_API_PATH + '/' + event_uid + '?format=' + export_format + '&add_record_ids=' + _add_record_ids
-        url = api_server_url + EVENTS_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        url = api_server_url + EVENTS_API_PATH + '/' + event_uid
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -60,6 +66,7 @@ def get_event(event_uid, export_format='json', add_record_ids=False, api_server_
     return None
 
 
+@instrumented
 def get_events(export_format='json', add_record_ids=False, event_filter=[], startTS=None, stopTS=None, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return event records based on the cruise_uid.  Returns the records as json
@@ -88,7 +95,7 @@ def get_events(export_format='json', add_record_ids=False, event_filter=[], star
 
     try:
         url = api_server_url + EVENTS_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -111,12 +118,15 @@ def get_events(export_format='json', add_record_ids=False, event_filter=[], star
     return None
 
 
-def get_events_by_cruise(cruise_uid, export_format='json', add_record_ids=False, event_filter=[], api_server_url=API_SERVER_URL, headers=HEADERS):
+@instrumented
+def get_events_by_cruise(cruise_uid, export_format='json', add_record_ids=False, event_filter=[], limit=0, offset=0, stream=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return event records based on the cruise_uid.  Returns the records as json
     objects by default.  Set export_format to 'csv' to return the records in
     csv format.  Optionally define an event_filter to filter the returned
-    events.
+    events.  Optionally set limit and offset to retrieve a single page of
+    records.  Set stream to True to return a generator that decodes the json
+    records incrementally as they are received.
     '''
 
     if not isinstance(event_filter, list):
@@ -131,12 +141,21 @@ def get_events_by_cruise(cruise_uid, export_format='json', add_record_ids=False,
     if event_filter:
         params['value'] = event_filter
 
+    if limit > 0:
+        params['limit'] = limit
+
+    if offset > 0:
+        params['offset'] = offset
+
     try:
         url = api_server_url + EVENTS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params, stream=stream)
 
         if req.status_code == 200:
             if export_format == 'json':
+                if stream:
+                    return iter_response_records(req)
+
                 return json.loads(req.text)
 
             if export_format == 'csv':
@@ -156,12 +175,15 @@ def get_events_by_cruise(cruise_uid, export_format='json', add_record_ids=False,
     return None
 
 
-def get_events_by_lowering(lowering_uid, export_format='json', add_record_ids=False, event_filter=[], api_server_url=API_SERVER_URL, headers=HEADERS):
+@instrumented
+def get_events_by_lowering(lowering_uid, export_format='json', add_record_ids=False, event_filter=[], limit=0, offset=0, stream=False, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return event records based on the lowering_uid.  Returns the records as
     json objects by default.  Set export_format to 'csv' to return the records
     in csv format.  Optionally define an event_filter to filter the returned
-    events.
+    events.  Optionally set limit and offset to retrieve a single page of
+    records.  Set stream to True to return a generator that decodes the json
+    records incrementally as they are received.
     '''
 
     if not isinstance(event_filter, list):
@@ -176,13 +198,22 @@ def get_events_by_lowering(lowering_uid, export_format='json', add_record_ids=Fa
     if event_filter:
         params['value'] = event_filter
 
+    if limit > 0:
+        params['limit'] = limit
+
+    if offset > 0:
+        params['offset'] = offset
+
     try:
         url = api_server_url + EVENTS_API_PATH + '/bylowering/' + lowering_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params, stream=stream)
 
         if req.status_code == 200:
 
             if export_format == 'json':
+                if stream:
+                    return iter_response_records(req)
+
                 return json.loads(req.text)
 
             if export_format == 'csv':
@@ -200,3 +231,75 @@ def get_events_by_lowering(lowering_uid, export_format='json', add_record_ids=Fa
         raise error
 
     return None
+
+
+@instrumented
+def get_events_by_ids(event_ids, add_record_ids=False, chunk_size=EVENT_IDS_CHUNK_SIZE, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the event records for a list of event_ids.  The ids are submitted
+    chunk_size ids per request.  The records are returned in the order of
+    event_ids.  Unknown ids are skipped.
+    '''
+
+    if chunk_size < 1 or chunk_size > EVENT_IDS_CHUNK_SIZE:
+        raise ValueError("chunk_size must be between 1 and {}".format(EVENT_IDS_CHUNK_SIZE))
+
+    params = {
+        'add_record_ids': add_record_ids
+    }
+
+    events = {}
+
+    try:
+        url = api_server_url + EVENTS_API_PATH + '/byids'
+
+        for idx in range(0, len(event_ids), chunk_size):
+            payload = { 'ids': event_ids[idx:idx + chunk_size] }
+            req = get_default_client().post(url, headers=headers, params=params, data=json.dumps(payload))
+
+            if req.status_code == 404:
+                continue
+
+            if req.status_code != 200:
+                raise ValueError("unable to retrieve events by id: {}".format(req.text))
+
+            for event in json.loads(req.text):
+                events[event['id']] = event
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return [events[event_id] for event_id in dict.fromkeys(event_ids) if event_id in events]
+
+
+def iter_events_by_cruise(cruise_uid, page_size=DEFAULT_PAGE_SIZE, prefetch=True, add_record_ids=False, event_filter=[], api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a generator that yields the event records for the cruise_uid one
+    at a time.  The records are retrieved lazily, page_size records per
+    request, so memory use stays flat regardless of the size of the cruise.
+    Set prefetch to False to disable requesting the next page in the
+    background.  Optionally define an event_filter to filter the returned
+    events.
+    '''
+
+    def fetch_page(limit, offset):
+        return get_events_by_cruise(cruise_uid, add_record_ids=add_record_ids, event_filter=event_filter, limit=limit, offset=offset, api_server_url=api_server_url, headers=headers)
+
+    return iter_pages(fetch_page, page_size, prefetch)
+
+
+def iter_events_by_lowering(lowering_uid, page_size=DEFAULT_PAGE_SIZE, prefetch=True, add_record_ids=False, event_filter=[], api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a generator that yields the event records for the lowering_uid
+    one at a time.  The records are retrieved lazily, page_size records per
+    request, so memory use stays flat regardless of the size of the lowering.
+    Set prefetch to False to disable requesting the next page in the
+    background.  Optionally define an event_filter to filter the returned
+    events.
+    '''
+
+    def fetch_page(limit, offset):
+        return get_events_by_lowering(lowering_uid, add_record_ids=add_record_ids, event_filter=event_filter, limit=limit, offset=offset, api_server_url=api_server_url, headers=headers)
+
+    return iter_pages(fetch_page, page_size, prefetch)
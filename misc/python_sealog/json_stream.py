@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+'''
+FILE:           json_stream.py
+
+DESCRIPTION:    This script contains the incremental JSON array decoder used
+                by the python_sealog wrapper functions to yield the records of
+                large API responses one at a time without buffering the whole
+                response body.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import json
+import codecs
+
+# Number of bytes read from the response per iteration.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(chunks):
+    '''
+    Incrementally decode a JSON array from an iterable of bytes (or str)
+    chunks, yielding each element as soon as it has been fully received.
+    Only the current, partially received element is kept in memory.  Raises
+    ValueError if the document is not a JSON array, is truncated or has a
+    missing or extra ',' between the elements.
+    '''
+
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+
+    buffer = ''
+    pos = 0
+    started = False
+    expect_value = True
+    separated = False
+    finished = False
+    exhausted = False
+    chunks = iter(chunks)
+
+    while not finished:
+
+        # skip whitespace and separators
+        while pos < len(buffer) and not finished:
+            char = buffer[pos]
+
+            if char in _WHITESPACE:
+                pos += 1
+
+            elif not started:
+                if char != '[':
+                    raise ValueError("expected a JSON array, found: {}".format(buffer[pos:pos + 20]))
+
+                started = True
+                pos += 1
+
+            elif char == ']':
+                if separated:
+                    raise ValueError("expected a value after ',', found: ]")
+
+                finished = True
+                pos += 1
+
+            elif char == ',':
+                if expect_value:
+                    raise ValueError("expected a value, found: ,")
+
+                expect_value = True
+                separated = True
+                pos += 1
+
+            elif not expect_value:
+                raise ValueError("expected ',' or ']', found: {}".format(buffer[pos:pos + 20]))
+
+            else:
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # element is not complete yet, read more data
+                    break
+
+                # a number that is not followed by a separator may still be
+                # incomplete, i.e. '2.' or '-3e'
+                if isinstance(element, (int, float)) and not exhausted and (end == len(buffer) or buffer[end] not in _WHITESPACE + ',]'):
+                    break
+
+                yield element
+
+                pos = end
+                expect_value = False
+                separated = False
+
+        if finished:
+            break
+
+        # drop the consumed part of the buffer
+        buffer = buffer[pos:]
+        pos = 0
+
+        if exhausted:
+            raise ValueError("truncated JSON array")
+
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            exhausted = True
+            buffer += utf8_decoder.decode(b'', final=True)
+            continue
+
+        buffer += utf8_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+
+def iter_response_records(response, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Yield the records contained in the JSON array body of a streamed
+    requests.Response one at a time.  The response is closed once the array
+    has been consumed or the generator is closed.
+    '''
+
+    try:
+        yield from iter_json_array(response.iter_content(chunk_size=chunk_size))
+    finally:
+        response.close()
+
+
+def write_json_array(records, file):
+    '''
+    Write the records from an iterable to file as a JSON array, one record at
+    a time.  The output is identical to file.write(json.dumps(list(records))).
+    '''
+
+    file.write('[')
+
+    for idx, record in enumerate(records):
+        if idx > 0:
+            file.write(', ')
+
+        file.write(json.dumps(record))
+
+    file.write(']')
@@ -20,29 +20,38 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
+from misc.python_sealog.resolver import LOWERING, get_default_resolver
 from misc.python_sealog.settings import API_SERVER_URL, HEADERS, LOWERINGS_API_PATH
 
+@instrumented
 def get_lowering_uid_by_id(lowering_id, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
-    Return the UID for a lowering record based on the lowering_id.
+    Return the UID for a lowering record based on the lowering_id.  The UID
+    is cached by the shared UIDResolver.
     '''
 
+    uid = get_default_resolver().get(LOWERING, api_server_url, lowering_id)
+
+    if uid is not None:
+        return uid
+
     params = {
         'lowering_id': lowering_id
     }
 
     try:
         url = api_server_url + LOWERINGS_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             lowering = json.loads(req.text)[0]
-            return lowering['id']
+            return get_default_resolver().put(LOWERING, api_server_url, lowering_id, lowering['id'])
 
     except Exception as error:
         logging.error(str(error))
@@ -51,6 +60,7 @@ def get_lowering_uid_by_id(lowering_id, api_server_url=API_SERVER_URL, headers=H
     return None
 
 
+@instrumented
 def get_lowerings(export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return all lowering records.  Returns the records as json objects by
@@ -63,7 +73,7 @@ def get_lowerings(export_format='json', api_server_url=API_SERVER_URL, headers=H
 
     try:
         url = api_server_url + LOWERINGS_API_PATH
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -86,6 +96,7 @@ def get_lowerings(export_format='json', api_server_url=API_SERVER_URL, headers=H
     return None
 
 
+@instrumented
 def get_lowering_uids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the lowering UIDs for the given cruise_uid
@@ -93,7 +104,7 @@ def get_lowering_uids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, heade
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             lowerings = json.loads(req.text)
@@ -109,6 +120,7 @@ def get_lowering_uids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, heade
     return None
 
 
+@instrumented
 def get_lowering_ids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the lowering_ids for the given cruise_uid
@@ -116,7 +128,7 @@ def get_lowering_ids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, header
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             lowerings = json.loads(req.text)
@@ -132,6 +144,7 @@ def get_lowering_ids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, header
     return None
 
 
+@instrumented
 def get_lowering(lowering_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return a lowering record based on the lowering_id.  Returns the record as a
@@ -141,7 +154,7 @@ def get_lowering(lowering_uid, export_format='json', api_server_url=API_SERVER_U
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/' + lowering_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -157,6 +170,7 @@ def get_lowering(lowering_uid, export_format='json', api_server_url=API_SERVER_U
     return None
 
 
+@instrumented
 def get_lowering_by_id(lowering_id, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the lowering record based on the lowering_id.  Returns the records
@@ -170,7 +184,7 @@ def get_lowering_by_id(lowering_id, export_format='json', api_server_url=API_SER
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '?lowering_id=' + lowering_id
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -186,6 +200,7 @@ def get_lowering_by_id(lowering_id, export_format='json', api_server_url=API_SER
     return None
 
 
+@instrumented
 def get_lowerings_by_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the lowering records contained within the cruise whose uid is
@@ -200,7 +215,7 @@ def get_lowerings_by_cruise(cruise_uid, export_format='json', api_server_url=API
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -223,6 +238,7 @@ def get_lowerings_by_cruise(cruise_uid, export_format='json', api_server_url=API
     return None
 
 
+@instrumented
 def get_lowering_by_event(event_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Return the lowering record containing the event whose uid is event_uid.
@@ -236,7 +252,7 @@ def get_lowering_by_event(event_uid, export_format='json', api_server_url=API_SE
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/byevent/' + event_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code == 200:
             if export_format == 'json':
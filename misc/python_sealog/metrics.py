@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+'''
+FILE:           metrics.py
+
+DESCRIPTION:    This script contains the opt-in instrumentation used by the
+                python_sealog wrapper functions and clients to record the
+                request count, latency, response size and decode time of each
+                call to the sealog-server API.
+
+BUGS:
+NOTES:          Nothing is recorded until enable() is called.  The decode time
+                is the time spent in the wrapper function outside of the HTTP
+                request(s), i.e. decoding the JSON response.  Records consumed
+                from streamed responses are decoded after the wrapper function
+                returns and are not included.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import re
+import json
+import time
+import bisect
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between log messages when logging the metrics periodically.
+DEFAULT_LOG_INTERVAL = 60
+
+# Path segments that look like record UIDs are collapsed so each route is
+# reported once regardless of the record requested.
+_UID_SEGMENT = re.compile(r'^[0-9a-fA-F]{24}$')
+
+_enabled = False
+_lock = threading.Lock()
+_stats = {}
+
+# Functions returning extra lines for the Prometheus output.
+_collectors = []
+
+# The wrapper function call currently being instrumented, if any.
+_current_call = contextvars.ContextVar('python_sealog_metrics_call', default=None)
+
+
+class _CallRecord():
+    '''
+    Class used to pass the HTTP request time from the clients back to the
+    instrumented wrapper function.
+    '''
+
+    def __init__(self, function):
+
+        self.function = function
+        self.request_time = 0.0
+        self.last_key = None
+
+
+def _new_stats():
+    return {
+        'count': 0,
+        'errors': 0,
+        'cache_hits': 0,
+        'latency_sum': 0.0,
+        'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+        'response_bytes': 0,
+        'decode_count': 0,
+        'decode_sum': 0.0
+    }
+
+
+def enable():
+    '''
+    Start recording metrics.
+    '''
+
+    global _enabled # pylint: disable=global-statement
+    _enabled = True
+
+
+def disable():
+    '''
+    Stop recording metrics.  The metrics recorded so far are kept.
+    '''
+
+    global _enabled # pylint: disable=global-statement
+    _enabled = False
+
+
+def is_enabled():
+    '''
+    Return True if metrics are being recorded.
+    '''
+
+    return _enabled
+
+
+def reset():
+    '''
+    Discard all recorded metrics.
+    '''
+
+    with _lock:
+        _stats.clear()
+
+
+def register_collector(func):
+    '''
+    Register func() returning a list of lines in the Prometheus text
+    exposition format to append to to_prometheus(), i.e. the websocket
+    runtime queue metrics.
+    '''
+
+    _collectors.append(func)
+
+
+def route_from_url(url):
+    '''
+    Return the route for the url, the url path with record UIDs replaced by
+    ':id'.
+    '''
+
+    path = urlparse(url).path
+
+    return '/'.join(':id' if _UID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def record_request(method, url, latency, status_code=None, response_bytes=0, from_cache=False):
+    '''
+    Record a request made by one of the clients.  status_code is None if the
+    request failed without a response.
+    '''
+
+    if not _enabled:
+        return
+
+    call = _current_call.get()
+    function = call.function if call else ''
+
+    key = (function, method, route_from_url(url))
+
+    if call:
+        call.request_time += latency
+        call.last_key = key
+
+    with _lock:
+        stats = _stats.setdefault(key, _new_stats())
+        stats['count'] += 1
+        stats['latency_sum'] += latency
+        stats['latency_buckets'][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        stats['response_bytes'] += response_bytes
+
+        if from_cache:
+            stats['cache_hits'] += 1
+
+        if status_code is None or status_code >= 400 and status_code != 404:
+            stats['errors'] += 1
+
+
+def _finish_call(call, parent, elapsed):
+
+    # nested wrapper calls are not part of the decode time of the caller
+    if parent is not None:
+        parent.request_time += elapsed
+
+    # the decode time is attributed to the last route requested by the call
+    if call.last_key is None:
+        return
+
+    with _lock:
+        stats = _stats.get(call.last_key)
+
+        if stats is not None:
+            stats['decode_count'] += 1
+            stats['decode_sum'] += max(elapsed - call.request_time, 0.0)
+
+
+def instrumented(func):
+    '''
+    Decorator for the python_sealog wrapper functions.  Requests made while
+    the function runs are recorded under the function name and the time spent
+    outside of the requests is recorded as the decode time.
+    '''
+
+    name = func.__module__.split('python_sealog.')[-1] + '.' + func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not _enabled:
+                return await func(*args, **kwargs)
+
+            parent = _current_call.get()
+            call = _CallRecord(name)
+            token = _current_call.set(call)
+            start = time.perf_counter()
+
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _current_call.reset(token)
+                _finish_call(call, parent, time.perf_counter() - start)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+
+        parent = _current_call.get()
+        call = _CallRecord(name)
+        token = _current_call.set(call)
+        start = time.perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_call.reset(token)
+            _finish_call(call, parent, time.perf_counter() - start)
+
+    return wrapper
+
+
+def snapshot():
+    '''
+    Return a copy of the recorded metrics as a list of dicts, one per wrapper
+    function, method and route.
+    '''
+
+    with _lock:
+        items = sorted(_stats.items())
+
+        return [
+            {
+                'function': function,
+                'method': method,
+                'route': route,
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'cache_hits': stats['cache_hits'],
+                'latency_sum': stats['latency_sum'],
+                'latency_buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], stats['latency_buckets'])),
+                'response_bytes': stats['response_bytes'],
+                'decode_count': stats['decode_count'],
+                'decode_sum': stats['decode_sum']
+            }
+            for (function, method, route), stats in items
+        ]
+
+
+def to_json(indent=None):
+    '''
+    Return the recorded metrics as a JSON string.
+    '''
+
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _family(name, families):
+    '''
+    Return the name of the metric family the sample name belongs to, i.e.
+    python_sealog_request_seconds for python_sealog_request_seconds_bucket.
+    '''
+
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in families:
+            return name[:-len(suffix)]
+
+    return name
+
+
+def to_prometheus():
+    '''
+    Return the recorded metrics, and the lines of the registered collectors,
+    in the Prometheus text exposition format.  The lines are grouped by
+    metric family so the samples of each family follow its HELP/TYPE lines.
+    '''
+
+    lines = [
+        '# HELP python_sealog_requests_total Requests sent to the sealog-server.',
+        '# TYPE python_sealog_requests_total counter',
+        '# HELP python_sealog_request_errors_total Requests that failed or returned an error status.',
+        '# TYPE python_sealog_request_errors_total counter',
+        '# HELP python_sealog_cache_hits_total Responses returned from the local cache.',
+        '# TYPE python_sealog_cache_hits_total counter',
+        '# HELP python_sealog_response_bytes_total Bytes received from the sealog-server.',
+        '# TYPE python_sealog_response_bytes_total counter',
+        '# HELP python_sealog_request_seconds Request latency.',
+        '# TYPE python_sealog_request_seconds histogram',
+        '# HELP python_sealog_decode_seconds Time spent decoding responses.',
+        '# TYPE python_sealog_decode_seconds summary'
+    ]
+
+    for metric in snapshot():
+        labels = 'function="{}",method="{}",route="{}"'.format(_escape(metric['function']), metric['method'], _escape(metric['route']))
+
+        lines.append('python_sealog_requests_total{{{}}} {}'.format(labels, metric['count']))
+        lines.append('python_sealog_request_errors_total{{{}}} {}'.format(labels, metric['errors']))
+        lines.append('python_sealog_cache_hits_total{{{}}} {}'.format(labels, metric['cache_hits']))
+        lines.append('python_sealog_response_bytes_total{{{}}} {}'.format(labels, metric['response_bytes']))
+
+        cumulative = 0
+        for bound, count in metric['latency_buckets'].items():
+            cumulative += count
+            lines.append('python_sealog_request_seconds_bucket{{{},le="{}"}} {}'.format(labels, bound, cumulative))
+
+        lines.append('python_sealog_request_seconds_sum{{{}}} {}'.format(labels, metric['latency_sum']))
+        lines.append('python_sealog_request_seconds_count{{{}}} {}'.format(labels, metric['count']))
+        lines.append('python_sealog_decode_seconds_sum{{{}}} {}'.format(labels, metric['decode_sum']))
+        lines.append('python_sealog_decode_seconds_count{{{}}} {}'.format(labels, metric['decode_count']))
+
+    for collector in _collectors:
+        lines.extend(collector())
+
+    # family name -> (HELP/TYPE lines, samples), in order of first appearance
+    families = {}
+
+    for line in lines:
+        if line.startswith('#'):
+            parts = line.split(' ', 3)
+
+            if len(parts) < 3 or parts[1] not in ('HELP', 'TYPE'):
+                continue
+
+            comments = families.setdefault(parts[2], ([], []))[0]
+
+            # several collectors may describe the same family
+            if not any(comment.split(' ', 2)[1] == parts[1] for comment in comments):
+                comments.append(line)
+
+        elif line:
+            name = re.split(r'[{ ]', line, 1)[0]
+            families.setdefault(_family(name, families), ([], []))[1].append(line)
+
+    return ''.join(
+        line + '\n'
+        for comments, samples in families.values()
+        for line in comments + samples
+    )
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    '''
+    Class that serves the recorded metrics, /metrics in the Prometheus text
+    format and /metrics.json as JSON.
+    '''
+
+    def do_GET(self): # pylint: disable=invalid-name
+        '''
+        Handle a GET request.
+        '''
+
+        if self.path.split('?')[0] == '/metrics':
+            body = to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4'
+        elif self.path.split('?')[0] == '/metrics.json':
+            body = to_json().encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        logging.debug("metrics: " + format, *args)
+
+
+def serve(port, host=''):
+    '''
+    Enable metrics and serve them over HTTP from a background thread.
+    Returns the HTTPServer, call shutdown() on it to stop serving.
+    '''
+
+    enable()
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='python_sealog_metrics', daemon=True)
+    thread.start()
+
+    logging.info("Serving python_sealog metrics on port %s", server.server_address[1])
+
+    return server
+
+
+def log_periodically(interval=DEFAULT_LOG_INTERVAL, level=logging.INFO):
+    '''
+    Enable metrics and log them as JSON every interval seconds from a
+    background thread.  Returns a threading.Event, set it to stop logging.
+    '''
+
+    enable()
+
+    stop = threading.Event()
+
+    def log_metrics():
+        while not stop.wait(interval):
+            logging.log(level, "python_sealog metrics: %s", to_json())
+
+    threading.Thread(target=log_metrics, name='python_sealog_metrics_log', daemon=True).start()
+
+    return stop
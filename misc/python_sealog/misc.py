@@ -20,16 +20,18 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
 
+from misc.python_sealog.client import get_default_client
+from misc.python_sealog.metrics import instrumented
 from misc.python_sealog.settings import API_SERVER_URL, API_SERVER_FILE_PATH, HEADERS, EVENT_AUX_DATA_API_PATH
 
 DATA_SOURCE_FILTER = ['vehicleRealtimeFramegrabberData']
 IMAGE_PATH = API_SERVER_FILE_PATH + "/images"
 
+@instrumented
 def get_framegrab_list_by_lowering(lowering_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Get the list of framegrabs for the given lowering_uid
@@ -45,7 +47,7 @@ def get_framegrab_list_by_lowering(lowering_uid, api_server_url=API_SERVER_URL,
 
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bylowering/' + lowering_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code != 404:
             framegrabs = json.loads(req.text)
@@ -59,6 +61,7 @@ def get_framegrab_list_by_lowering(lowering_uid, api_server_url=API_SERVER_URL,
 
     return framegrab_filenames
 
+@instrumented
 def get_framegrab_list_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
     Get the list of framegrabs for the given cruise_uid
@@ -74,7 +77,7 @@ def get_framegrab_list_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, head
 
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers, params=params)
+        req = get_default_client().get(url, headers=headers, params=params)
 
         if req.status_code != 404:
             framegrabs = json.loads(req.text)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+'''
+FILE:           outbox.py
+
+DESCRIPTION:    This script contains the SealogOutbox class, a durable SQLite
+                backed queue of the websocket messages to deliver to one or
+                more destinations, and the OutboxSender class that drains it
+                for one destination.
+
+BUGS:
+NOTES:          The messages are appended to a single log, each destination
+                records the offset of the last message it acknowledged.  A
+                restarted sender resumes after that offset and messages are
+                removed once every destination acknowledged them.  A new
+                destination starts at the end of the log.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+
+# Messages read and sent per batch.
+DEFAULT_BATCH_SIZE = 100
+
+# Seconds between checks for new messages when the outbox is empty.
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Seconds to wait before the first retry, doubled after each failure.
+DEFAULT_MIN_BACKOFF = 1
+
+# Longest wait between retries in seconds.
+DEFAULT_MAX_BACKOFF = 60
+
+
+class SealogOutbox():
+    '''
+    Class that stores the messages to deliver to the destinations in an
+    SQLite database until every destination acknowledged them.  Safe to use
+    from several threads.
+    '''
+
+    def __init__(self, filename, destinations):
+
+        self._filename = filename
+        self._destinations = list(destinations)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(filename, check_same_thread=False, isolation_level=None)
+
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS log (offset INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL, message TEXT NOT NULL, created REAL NOT NULL)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS acks (destination TEXT PRIMARY KEY, offset INTEGER NOT NULL)')
+
+            # new destinations only receive the messages appended from now on
+            tail = self._conn.execute('SELECT COALESCE(MAX(offset), 0) FROM log').fetchone()[0]
+            self._conn.executemany('INSERT OR IGNORE INTO acks (destination, offset) VALUES (?, ?)', [(destination, tail) for destination in self._destinations])
+
+    def append(self, path, message):
+        '''
+        Durably append the message published to path for every destination.
+        Returns the message offset.
+        '''
+
+        with self._lock:
+            cursor = self._conn.execute('INSERT INTO log (path, message, created) VALUES (?, ?, ?)', (path, json.dumps(message), time.time()))
+
+        return cursor.lastrowid
+
+    def read(self, destination, limit=DEFAULT_BATCH_SIZE):
+        '''
+        Return up to limit (offset, path, message) tuples not yet acknowledged
+        by the destination, oldest first.
+        '''
+
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT offset, path, message FROM log WHERE offset > (SELECT offset FROM acks WHERE destination = ?) ORDER BY offset LIMIT ?',
+                (destination, limit)
+            ).fetchall()
+
+        return [(offset, path, json.loads(message)) for offset, path, message in rows]
+
+    def ack(self, destination, offset):
+        '''
+        Record that the destination received every message up to offset and
+        remove the messages received by every destination.
+        '''
+
+        with self._lock:
+            self._conn.execute('BEGIN')
+
+            try:
+                self._conn.execute('UPDATE acks SET offset = MAX(offset, ?) WHERE destination = ?', (offset, destination))
+
+                placeholders = ','.join('?' * len(self._destinations))
+                self._conn.execute(
+                    'DELETE FROM log WHERE offset <= (SELECT MIN(offset) FROM acks WHERE destination IN ({}))'.format(placeholders),
+                    self._destinations
+                )
+                self._conn.execute('COMMIT')
+
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def pending(self, destination):
+        '''
+        Return the number of messages not yet acknowledged by the destination.
+        '''
+
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM log WHERE offset > (SELECT offset FROM acks WHERE destination = ?)',
+                (destination,)
+            ).fetchone()[0]
+
+    def close(self):
+        '''
+        Close the database.
+        '''
+
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def destinations(self):
+        '''
+        Getter method for the _destinations property
+        '''
+        return self._destinations
+
+
+class OutboxSender():
+    '''
+    Class that drains the outbox messages of one destination in batches.
+    send_batch(batch) is called from a worker thread with a list of
+    (offset, path, message) tuples and returns how many messages, from the
+    start of the batch, were delivered.  Batches not fully delivered are
+    retried with an exponential backoff.
+    '''
+
+    def __init__(self, outbox, destination, send_batch, batch_size=DEFAULT_BATCH_SIZE, # pylint: disable=too-many-arguments
+                 poll_interval=DEFAULT_POLL_INTERVAL, min_backoff=DEFAULT_MIN_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF):
+
+        self._outbox = outbox
+        self._destination = destination
+        self._send_batch = send_batch
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self.delivered = 0
+        self.retries = 0
+
+    async def run(self):
+        '''
+        Deliver the outbox messages to the destination until cancelled.
+        '''
+
+        loop = asyncio.get_running_loop()
+        backoff = self._min_backoff
+
+        while True:
+            batch = await loop.run_in_executor(None, self._outbox.read, self._destination, self._batch_size)
+
+            if not batch:
+                await asyncio.sleep(self._poll_interval)
+                continue
+
+            try:
+                sent = await loop.run_in_executor(None, self._send_batch, batch)
+            except Exception as err: # pylint: disable=broad-except
+                logging.debug(str(err))
+                sent = 0
+
+            if sent:
+                await loop.run_in_executor(None, self._outbox.ack, self._destination, batch[sent - 1][0])
+                self.delivered += sent
+
+            if sent < len(batch):
+                self.retries += 1
+                logging.warning("Could not deliver message %s to %s, retrying in %s seconds", batch[sent][0], self._destination, backoff)
+
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self._max_backoff)
+                continue
+
+            backoff = self._min_backoff
+
+    def stats(self):
+        '''
+        Return the messages delivered and pending and the retries.
+        '''
+
+        return {
+            'delivered': self.delivered,
+            'pending': self._outbox.pending(self._destination),
+            'retries': self.retries
+        }
+
+    def to_prometheus(self):
+        '''
+        Return the sender counters as lines in the Prometheus text exposition
+        format, see metrics.register_collector.
+        '''
+
+        stats = self.stats()
+        labels = 'destination="{}"'.format(self._destination)
+
+        return [
+            'python_sealog_outbox_delivered_total{{{}}} {}'.format(labels, stats['delivered']),
+            'python_sealog_outbox_pending{{{}}} {}'.format(labels, stats['pending']),
+            'python_sealog_outbox_retries_total{{{}}} {}'.format(labels, stats['retries'])
+        ]
+
+    @property
+    def destination(self):
+        '''
+        Getter method for the _destination property
+        '''
+        return self._destination
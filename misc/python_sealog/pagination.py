@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+'''
+FILE:           pagination.py
+
+DESCRIPTION:    This script contains the helper used by the python_sealog
+                iter_* wrapper functions to walk large result sets page by
+                page using the sealog-server limit/offset query parameters.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of records requested per page.
+DEFAULT_PAGE_SIZE = 500
+
+
+def iter_pages(fetch_page, page_size=DEFAULT_PAGE_SIZE, prefetch=True):
+    '''
+    Yield the records returned by fetch_page(limit, offset) one at a time,
+    requesting the next page only once the current one is being consumed.
+    If prefetch is True the next page is requested in a background thread
+    while the current page is being yielded.  At most two pages are held in
+    memory at any time.  Iteration stops at the first short or empty page.
+    fetch_page should return a list of records, or None if there are no more
+    records.
+    '''
+
+    if page_size < 1:
+        raise ValueError("page_size must be greater than 0")
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+    try:
+        offset = 0
+        pending = executor.submit(fetch_page, page_size, offset) if executor else None
+
+        while True:
+            page = pending.result() if executor else fetch_page(page_size, offset)
+
+            # the wrapper functions return None when no records were found
+            page = [] if page is None else page
+
+            if not isinstance(page, list):
+                raise ValueError("unexpected response while retrieving records at offset {}".format(offset))
+
+            more = len(page) == page_size
+            offset += page_size
+
+            if executor and more:
+                pending = executor.submit(fetch_page, page_size, offset)
+
+            yield from page
+
+            if not more:
+                return
+
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
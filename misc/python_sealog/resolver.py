@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+'''
+FILE:           resolver.py
+
+DESCRIPTION:    This script contains the UIDResolver class used by the
+                python_sealog wrapper functions to remember the UIDs of
+                cruises, lowerings and custom variables looked up by their
+                human-readable ids/names.
+
+BUGS:
+NOTES:          Entries expire after the TTL unless a websocket client attaches
+                to the resolver and forwards the new/update messages listed
+                in SUBSCRIPTIONS to handle_message().
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import time
+import logging
+import threading
+
+# Seconds a resolved UID is trusted when no websocket is attached.
+DEFAULT_TTL = 300
+
+CRUISE = 'cruise'
+LOWERING = 'lowering'
+CUSTOM_VAR = 'custom_var'
+
+# websocket path -> (record kind, field holding the id/name used for lookups)
+TOPIC_KINDS = {
+    '/ws/status/newCruises': (CRUISE, 'cruise_id'),
+    '/ws/status/updateCruises': (CRUISE, 'cruise_id'),
+    '/ws/status/newLowerings': (LOWERING, 'lowering_id'),
+    '/ws/status/updateLowerings': (LOWERING, 'lowering_id'),
+    '/ws/status/updateCustomVars': (CUSTOM_VAR, 'custom_var_name')
+}
+
+# Websocket subscriptions needed to keep the resolver up to date.
+SUBSCRIPTIONS = list(TOPIC_KINDS)
+
+
+class UIDResolver():
+    '''
+    Class that caches the UIDs resolved from cruise_ids, lowering_ids and
+    custom_var names.  While a websocket client is attached entries are kept
+    until an update message shows the id/name now belongs to a different
+    record.  Otherwise entries expire after ttl seconds.
+    '''
+
+    def __init__(self, ttl=DEFAULT_TTL):
+
+        self._ttl = ttl
+        self._entries = {}
+        self._attached = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind, api_server_url, key):
+        '''
+        Return the cached UID or None if the UID is unknown or has expired.
+        '''
+
+        with self._lock:
+            entry = self._entries.get((kind, api_server_url, key))
+
+            if entry is None:
+                return None
+
+            uid, resolved_ts = entry
+
+            if not self._attached and time.time() - resolved_ts >= self._ttl:
+                del self._entries[(kind, api_server_url, key)]
+                return None
+
+            return uid
+
+    def put(self, kind, api_server_url, key, uid):
+        '''
+        Remember the UID for the key.  Returns the UID.
+        '''
+
+        if uid is not None:
+            with self._lock:
+                self._entries[(kind, api_server_url, key)] = (uid, time.time())
+
+        return uid
+
+    def invalidate(self, kind=None):
+        '''
+        Forget all entries, or only the entries of the given kind.
+        '''
+
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+                return
+
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == kind]:
+                del self._entries[entry_key]
+
+    def handle_message(self, msg_obj):
+        '''
+        Apply a websocket 'pub' message.  Entries are dropped when the new or
+        updated record shows that a cached id/name now resolves to a
+        different UID, i.e. a cruise deleted and recreated with the same
+        cruise_id.
+        Returns True if the message was one of the resolver SUBSCRIPTIONS.
+        '''
+
+        if msg_obj.get('path') not in TOPIC_KINDS:
+            return False
+
+        kind, field = TOPIC_KINDS[msg_obj['path']]
+        record = msg_obj.get('message') or {}
+
+        if 'id' not in record or field not in record:
+            logging.debug("Incomplete %s update, clearing all %s UIDs", kind, kind)
+            self.invalidate(kind)
+            return True
+
+        with self._lock:
+            stale = [
+                entry_key for entry_key, (uid, _) in self._entries.items()
+                if entry_key[0] == kind and (uid == record['id']) != (entry_key[2] == record[field])
+            ]
+
+            for entry_key in stale:
+                logging.debug("Dropping resolved %s UID for %s", kind, entry_key[2])
+                del self._entries[entry_key]
+
+        return True
+
+    def attach(self):
+        '''
+        Called by a websocket client that forwards the SUBSCRIPTIONS messages
+        to handle_message().  Entries no longer expire while attached.
+        '''
+
+        with self._lock:
+            self._attached += 1
+
+    def detach(self):
+        '''
+        Called when the websocket client disconnects.  Updates may have been
+        missed so all entries are dropped.
+        '''
+
+        with self._lock:
+            self._attached = max(self._attached - 1, 0)
+            self._entries.clear()
+
+    @property
+    def ttl(self):
+        '''
+        Getter method for the _ttl property
+        '''
+        return self._ttl
+
+    @property
+    def attached(self):
+        '''
+        Return True if a websocket client is attached
+        '''
+        return self._attached > 0
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_default_resolver():
+    '''
+    Return the UIDResolver shared by the python_sealog wrapper functions,
+    creating it on first use.
+    '''
+
+    global _default_resolver # pylint: disable=global-statement
+
+    if _default_resolver is None:
+        with _default_resolver_lock:
+            if _default_resolver is None:
+                _default_resolver = UIDResolver()
+
+    return _default_resolver
+
+
+def set_default_resolver(resolver):
+    '''
+    Replace the UIDResolver shared by the python_sealog wrapper functions.
+    Returns the previous resolver.
+    '''
+
+    global _default_resolver # pylint: disable=global-statement
+
+    with _default_resolver_lock:
+        previous_resolver = _default_resolver
+        _default_resolver = resolver
+
+    return previous_resolver
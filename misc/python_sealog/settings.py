@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+'''
+FILE:           settings.py
+
+DESCRIPTION:    This file contains the settings used by the wrapper functions
+				to communicate with the sealog-server API
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2021-01-01
+REVISION:   2022-02-13
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+API_SERVER_URL = 'http://localhost:8000/sealog-server'
+WS_SERVER_URL = 'ws://localhost:8000/ws'
+
+CRUISES_API_PATH = '/api/v1/cruises'
+
+CUSTOM_VAR_API_PATH = '/api/v1/custom_vars'
+
+EVENTS_API_PATH = '/api/v1/events'
+
+EVENT_AUX_DATA_API_PATH = '/api/v1/event_aux_data'
+
+EVENT_EXPORTS_API_PATH = '/api/v1/event_exports'
+
+EVENT_TEMPLATES_API_PATH = '/api/v1/event_templates'
+
+LOWERINGS_API_PATH = '/api/v1/lowerings'
+
+API_SERVER_FILE_PATH = '/home/sealog/sealog-files'
+
+TOKEN = ''
+
+HEADERS = {
+  "authorization": TOKEN
+}
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+'''
+FILE:           ws_runtime.py
+
+DESCRIPTION:    This script contains the SealogWSRuntime class, a websocket
+                event bus that holds a single connection to the sealog-server
+                websocket, subscribed to the paths of every registered
+                handler, and dispatches each published message to the
+                handlers registered for its path.
+
+BUGS:
+NOTES:          The receiver only answers the server pings and moves the
+                publications to a bounded intake queue, it never waits on the
+                handlers so the pings are always answered promptly.  A
+                dispatcher task moves the messages from the intake queue to
+                the handler queues.
+
+                Each handler has its own bounded queue and pool of worker
+                tasks so a slow handler does not delay the others.  With a
+                single worker the messages are delivered to a handler in the
+                order they were received.  Blocking (non async) handlers are
+                run in the runtime's thread pool.
+
+                When a handler's queue is full its overflow policy applies:
+                'block' holds the dispatcher until there is room
+                (backpressure, the intake queue absorbs the messages received
+                meanwhile) for at most block_timeout seconds before dropping
+                the message, 'drop_oldest' discards the oldest queued message
+                and 'drop_newest' discards the new message.  Messages
+                received while the intake queue is full are dropped.  The
+                dropped messages are counted in stats() and intake_stats().
+
+                With enable_catchup() the events and aux_data records
+                created or modified while disconnected are replayed after
+                each (re)connection, see catchup.py.
+
+                Handler plugins are python modules with a register(runtime)
+                function, see load_plugin.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    1.0
+CREATED:    2024-03-01
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2024
+'''
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import inspect
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+import websockets
+
+from os.path import dirname, realpath
+sys.path.append(dirname(dirname(dirname(realpath(__file__)))))
+
+from misc.python_sealog.settings import WS_SERVER_URL, HEADERS
+
+# Seconds to wait before reconnecting after the connection is lost.
+DEFAULT_RECONNECT_DELAY = 5
+
+# Messages queued per handler, 0 for no limit.
+DEFAULT_QUEUE_SIZE = 1000
+
+# Worker tasks per handler.
+DEFAULT_WORKERS = 1
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+DEFAULT_OVERFLOW = 'block'
+
+# Seconds the dispatcher waits for room in the full queues of a message
+# under the 'block' policy before dropping it.
+DEFAULT_BLOCK_TIMEOUT = 10
+
+# Messages received but not yet dispatched to the handler queues.
+DEFAULT_INTAKE_SIZE = 10000
+
+# Minimum seconds between the warnings logged about dropped messages.
+DROP_WARNING_INTERVAL = 10
+
+
+class _Handler():
+    '''
+    Class holding a registered handler, its queue, its worker tasks and its
+    counters.
+    '''
+
+    def __init__(self, name, paths, func, queue_size, workers, overflow):
+
+        self.name = name
+        self.paths = paths
+        self.func = func
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.queue_size = queue_size
+        self.workers = workers
+        self.overflow = overflow
+        self.queue = None
+        self.tasks = []
+        self.received = 0
+        self.handled = 0
+        self.errors = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+        self.max_queued = 0
+        self.dropped_warned = 0
+        self.last_drop_warning = 0.0
+
+
+class SealogWSRuntime():
+    '''
+    Class that shares one sealog-server websocket connection between many
+    handlers.  Register the handlers with register() then run().
+    '''
+
+    def __init__(self, client_id, ws_server_url=WS_SERVER_URL, headers=HEADERS, reconnect_delay=DEFAULT_RECONNECT_DELAY, # pylint: disable=too-many-arguments
+                 block_timeout=DEFAULT_BLOCK_TIMEOUT, intake_size=DEFAULT_INTAKE_SIZE):
+
+        self._client_id = client_id
+        self._ws_server_url = ws_server_url
+        self._headers = headers
+        self._reconnect_delay = reconnect_delay
+        self._block_timeout = block_timeout
+        self._intake_size = intake_size
+        self._handlers = []
+        self._routes = {}
+        self._on_connect = []
+        self._on_disconnect = []
+        self._executor = None
+        self._intake = None
+        self._dispatcher = None
+        self._intake_received = 0
+        self._intake_dropped = 0
+        self._intake_max_queued = 0
+        self._last_intake_warning = 0.0
+        self._catchup = None
+        self._catchup_held = None
+        self._catchup_task = None
+        self._save_task = None
+        self._running = False
+
+    def register(self, paths, func, name=None, queue_size=DEFAULT_QUEUE_SIZE, workers=DEFAULT_WORKERS, overflow=DEFAULT_OVERFLOW): # pylint: disable=too-many-arguments
+        '''
+        Register func(path, message) to be called with the message of every
+        publication to one of the paths.  func can be a coroutine function.
+        workers messages are handled concurrently, at most queue_size
+        messages wait in the queue before the overflow policy applies.  Must
+        be called before run().
+        '''
+
+        if self._running:
+            raise RuntimeError("handlers must be registered before the runtime is started")
+
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("overflow must be one of: {}".format(', '.join(OVERFLOW_POLICIES)))
+
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        if isinstance(paths, str):
+            paths = [paths]
+
+        handler = _Handler(name or getattr(func, '__name__', repr(func)), list(paths), func, queue_size, workers, overflow)
+        self._handlers.append(handler)
+
+        for path in handler.paths:
+            self._routes.setdefault(path, []).append(handler)
+
+        return handler
+
+    def on_connect(self, func):
+        '''
+        Register the coroutine function func(runtime) to be awaited after each
+        (re)connection, i.e. to catch up on the messages missed while
+        disconnected.
+        '''
+
+        self._on_connect.append(func)
+
+    def on_disconnect(self, func):
+        '''
+        Register the coroutine function func(runtime) to be awaited each time
+        the connection is lost, i.e. to drop the state kept current by the
+        websocket messages that may now be missed.
+        '''
+
+        self._on_disconnect.append(func)
+
+    def enable_catchup(self, catchup):
+        '''
+        Replay the event changes missed while disconnected, from the cursor
+        kept by catchup, an EventCatchup, after each (re)connection.  Must be
+        called before run().
+        '''
+
+        if self._running:
+            raise RuntimeError("catch-up must be enabled before the runtime is started")
+
+        self._catchup = catchup
+
+    def _release(self, token):
+
+        if self._catchup is not None:
+            self._catchup.release(token)
+
+    def _hello(self):
+        return {
+            'type': 'hello',
+            'id': self._client_id,
+            'auth': {
+                'headers': self._headers
+            },
+            'version': '2',
+            'subs': self.subscriptions
+        }
+
+    def _ping(self):
+        return {
+            'type': 'ping',
+            'id': self._client_id
+        }
+
+    async def _run_handler(self, handler):
+        '''
+        Deliver the queued messages to the handler, one at a time per worker.
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            path, message, token = await handler.queue.get()
+
+            try:
+                if handler.is_async:
+                    await handler.func(path, message)
+                else:
+                    await loop.run_in_executor(self._executor, handler.func, path, message)
+
+                handler.handled += 1
+
+            except Exception as err: # pylint: disable=broad-except
+                handler.errors += 1
+                logging.error("Handler %s failed on %s message", handler.name, path)
+                logging.debug(str(err))
+
+            finally:
+                self._release(token)
+                handler.queue.task_done()
+
+    def _drop(self, handler, path, token):
+
+        self._release(token)
+
+        handler.dropped += 1
+
+        now = time.monotonic()
+
+        if now - handler.last_drop_warning >= DROP_WARNING_INTERVAL:
+            logging.warning("Handler %s queue is full (%s messages), dropped %s message(s), last on %s",
+                            handler.name, handler.queue_size, handler.dropped - handler.dropped_warned, path)
+            handler.last_drop_warning = now
+            handler.dropped_warned = handler.dropped
+
+    async def _enqueue(self, handler, item, deadline):
+        '''
+        Queue the item for the handler, applying its overflow policy when
+        the queue is full.
+        '''
+
+        handler.received += 1
+
+        if handler.queue.full():
+
+            if handler.overflow == 'drop_newest':
+                self._drop(handler, item[0], item[2])
+                return
+
+            if handler.overflow == 'drop_oldest':
+                oldest = handler.queue.get_nowait()
+                handler.queue.task_done()
+                self._drop(handler, oldest[0], oldest[2])
+
+            else:
+                handler.blocked += 1
+                started = time.monotonic()
+
+                try:
+                    await asyncio.wait_for(handler.queue.put(item), max(deadline - started, 0))
+                except asyncio.TimeoutError:
+                    self._drop(handler, item[0], item[2])
+                    return
+                finally:
+                    handler.blocked_seconds += time.monotonic() - started
+
+                handler.max_queued = max(handler.max_queued, handler.queue.qsize())
+                return
+
+        handler.queue.put_nowait(item)
+        handler.max_queued = max(handler.max_queued, handler.queue.qsize())
+
+    async def dispatch(self, path, message, token=None):
+        '''
+        Queue the message for every handler registered for the path.  Waits
+        at most block_timeout seconds for room in the queues of 'block'
+        handlers.  token is the catch-up token of the message, released once
+        every handler is done with it.
+        '''
+
+        deadline = time.monotonic() + self._block_timeout
+
+        try:
+            for handler in self._routes.get(path, []):
+                if token is not None:
+                    token.remaining += 1
+
+                await self._enqueue(handler, (path, message, token), deadline)
+        finally:
+            self._release(token)
+
+    async def _run_dispatcher(self):
+        '''
+        Move the received messages from the intake queue to the handler
+        queues.
+        '''
+
+        while True:
+            path, message, token = await self._intake.get()
+
+            try:
+                await self.dispatch(path, message, token)
+            finally:
+                self._intake.task_done()
+
+    def _start_handlers(self):
+
+        if self._intake is None:
+            self._intake = asyncio.Queue(maxsize=self._intake_size)
+            self._dispatcher = asyncio.create_task(self._run_dispatcher(), name='ws_dispatcher')
+
+        if self._executor is None:
+            threads = sum(handler.workers for handler in self._handlers if not handler.is_async)
+            self._executor = ThreadPoolExecutor(max_workers=max(threads, 1), thread_name_prefix='ws_handler')
+
+        for handler in self._handlers:
+            if not handler.tasks:
+                handler.queue = asyncio.Queue(maxsize=handler.queue_size)
+                handler.tasks = [
+                    asyncio.create_task(self._run_handler(handler), name='ws_handler_{}_{}'.format(handler.name, idx))
+                    for idx in range(handler.workers)
+                ]
+
+    def _track(self, path, message):
+        '''
+        Return (False, None) if the message was already dispatched, else True
+        and its catch-up token.
+        '''
+
+        if self._catchup is None:
+            return True, None
+
+        if self._catchup.seen(path, message):
+            return False, None
+
+        return True, self._catchup.track(path, message)
+
+    def _receive_pub(self, path, message):
+
+        # queued after the replayed changes to keep the order
+        if self._catchup_held is not None:
+            self._catchup_held.append((path, message))
+            return
+
+        self._intake_received += 1
+
+        accepted, token = self._track(path, message)
+
+        if not accepted:
+            return
+
+        try:
+            self._intake.put_nowait((path, message, token))
+        except asyncio.QueueFull:
+            self._release(token)
+            self._intake_dropped += 1
+
+            now = time.monotonic()
+
+            if now - self._last_intake_warning >= DROP_WARNING_INTERVAL:
+                logging.warning("Intake queue is full (%s messages), %s message(s) dropped so far, last on %s",
+                                self._intake_size, self._intake_dropped, path)
+                self._last_intake_warning = now
+
+            return
+
+        self._intake_max_queued = max(self._intake_max_queued, self._intake.qsize())
+
+    async def _replay_changes(self):
+        '''
+        Queue the event changes made since the catch-up cursor.
+        '''
+
+        if not self._catchup.start():
+            return
+
+        cursor = self._catchup.cursor
+        loop = asyncio.get_running_loop()
+
+        try:
+            changes = await loop.run_in_executor(None, self._catchup.changes, cursor)
+        except Exception as err: # pylint: disable=broad-except
+            logging.error("Could not retrieve the changes since %s, they will not be replayed", cursor)
+            logging.debug(str(err))
+            return
+
+        replayed = 0
+
+        for path, message in changes:
+            accepted, token = self._track(path, message)
+
+            if accepted:
+                await self._intake.put((path, message, token))
+                replayed += 1
+
+        self._catchup.replayed += replayed
+        logging.info("Replayed %s change(s) since %s", replayed, cursor)
+
+    async def _catch_up(self):
+        '''
+        Queue the event changes made since the catch-up cursor, then the
+        live messages received meanwhile.
+        '''
+
+        try:
+            await self._replay_changes()
+        except asyncio.CancelledError:
+            # the held messages are replayed after the next connection
+            self._catchup_held = None
+            raise
+
+        held, self._catchup_held = self._catchup_held, None
+
+        for path, message in held:
+            self._receive_pub(path, message)
+
+    async def _save_catchup(self):
+        '''
+        Save the catch-up cursor periodically.
+        '''
+
+        while True:
+            await asyncio.sleep(self._catchup.save_interval)
+
+            try:
+                self._catchup.save()
+            except OSError as err:
+                logging.error("Could not save the catch-up cursor: %s", str(err))
+
+    async def _receive(self, websocket):
+        '''
+        Read the messages from the websocket until the connection is closed.
+        '''
+
+        async for raw_message in websocket:
+            msg_obj = json.loads(raw_message)
+
+            if msg_obj.get('type') == 'ping':
+                await websocket.send(json.dumps(self._ping()))
+
+            elif msg_obj.get('type') == 'pub':
+                self._receive_pub(msg_obj.get('path'), msg_obj.get('message'))
+
+    async def connect(self):
+        '''
+        Connect, subscribe and dispatch the received messages until the
+        connection is lost.
+        '''
+
+        self._running = True
+        self._start_handlers()
+
+        async with websockets.connect(self._ws_server_url) as websocket:
+            await websocket.send(json.dumps(self._hello()))
+            logging.info("Connected to %s, subscribed to: %s", self._ws_server_url, ', '.join(self.subscriptions))
+
+            # the live messages are held back while catching up
+            if self._catchup is not None:
+                self._catchup_held = []
+                self._catchup_task = asyncio.create_task(self._catch_up(), name='ws_catchup')
+
+            try:
+                for func in self._on_connect:
+                    await func(self)
+
+                await self._receive(websocket)
+
+            finally:
+                if self._catchup_task is not None:
+                    self._catchup_task.cancel()
+                    self._catchup_task = None
+
+                for func in self._on_disconnect:
+                    try:
+                        await func(self)
+                    except Exception as err: # pylint: disable=broad-except
+                        logging.error("Error in disconnect hook %s", getattr(func, '__name__', func))
+                        logging.debug(str(err))
+
+    async def run(self):
+        '''
+        Run the runtime, reconnecting whenever the connection is lost.
+        '''
+
+        if self._catchup is not None and self._save_task is None:
+            self._save_task = asyncio.create_task(self._save_catchup(), name='ws_catchup_save')
+
+        try:
+            while True:
+                try:
+                    await self.connect()
+                    logging.warning("Connection to %s closed", self._ws_server_url)
+
+                except asyncio.CancelledError:
+                    raise
+
+                except Exception as err: # pylint: disable=broad-except
+                    logging.error("Lost connection to server: %s", str(err))
+
+                logging.info("Reconnecting in %s seconds", self._reconnect_delay)
+                await asyncio.sleep(self._reconnect_delay)
+
+        finally:
+            if self._catchup is not None:
+                self._catchup.save()
+
+    async def join(self):
+        '''
+        Wait until every queued message has been handled.
+        '''
+
+        if self._intake is not None:
+            await self._intake.join()
+
+        for handler in self._handlers:
+            if handler.queue is not None:
+                await handler.queue.join()
+
+    def stats(self):
+        '''
+        Return the counters of each handler: the messages received, handled,
+        failed, dropped and currently queued, the messages that had to wait
+        for room in the queue and for how long, and the longest queue seen.
+        '''
+
+        return {
+            handler.name: {
+                'received': handler.received,
+                'handled': handler.handled,
+                'errors': handler.errors,
+                'dropped': handler.dropped,
+                'blocked': handler.blocked,
+                'blocked_seconds': handler.blocked_seconds,
+                'queued': handler.queue.qsize() if handler.queue is not None else 0,
+                'max_queued': handler.max_queued,
+                'queue_size': handler.queue_size,
+                'workers': handler.workers
+            }
+            for handler in self._handlers
+        }
+
+    def intake_stats(self):
+        '''
+        Return the counters of the intake queue: the messages received,
+        dropped because the queue was full and currently queued, and the
+        longest queue seen.
+        '''
+
+        return {
+            'received': self._intake_received,
+            'dropped': self._intake_dropped,
+            'queued': self._intake.qsize() if self._intake is not None else 0,
+            'max_queued': self._intake_max_queued,
+            'queue_size': self._intake_size
+        }
+
+    def to_prometheus(self):
+        '''
+        Return the intake, handler and catch-up counters as lines in the
+        Prometheus text exposition format, see metrics.register_collector.
+        '''
+
+        intake_types = {
+            'received': 'counter',
+            'dropped': 'counter',
+            'queued': 'gauge',
+            'max_queued': 'gauge',
+            'queue_size': 'gauge'
+        }
+
+        metric_types = {
+            'received': 'counter',
+            'handled': 'counter',
+            'errors': 'counter',
+            'dropped': 'counter',
+            'blocked': 'counter',
+            'blocked_seconds': 'counter',
+            'queued': 'gauge',
+            'max_queued': 'gauge',
+            'queue_size': 'gauge',
+            'workers': 'gauge'
+        }
+
+        intake_stats = self.intake_stats()
+        lines = []
+
+        for key, metric_type in intake_types.items():
+            name = 'python_sealog_ws_intake_' + key + ('_total' if metric_type == 'counter' else '')
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+            lines.append('{}{{client="{}"}} {}'.format(name, self._client_id, intake_stats[key]))
+
+        stats = self.stats()
+
+        for key, metric_type in metric_types.items():
+            name = 'python_sealog_ws_handler_' + key + ('_total' if metric_type == 'counter' else '')
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+
+            for handler_name, handler_stats in stats.items():
+                lines.append('{}{{client="{}",handler="{}"}} {}'.format(name, self._client_id, handler_name, handler_stats[key]))
+
+        if self._catchup is not None:
+            catchup_stats = self._catchup.stats()
+
+            for key, metric_type in (('replayed', 'counter'), ('duplicates', 'counter'), ('inflight', 'gauge')):
+                name = 'python_sealog_ws_catchup_' + key + ('_total' if metric_type == 'counter' else '')
+                lines.append('# TYPE {} {}'.format(name, metric_type))
+                lines.append('{}{{client="{}"}} {}'.format(name, self._client_id, catchup_stats[key]))
+
+        return lines
+
+    @property
+    def subscriptions(self):
+        '''
+        The paths of every registered handler
+        '''
+        return list(self._routes)
+
+    @property
+    def handlers(self):
+        '''
+        Getter method for the _handlers property
+        '''
+        return self._handlers
+
+
+def load_plugin(runtime, module_name):
+    '''
+    Import the handler plugin module_name and call its register(runtime)
+    function.
+    '''
+
+    module = importlib.import_module(module_name)
+
+    if not hasattr(module, 'register'):
+        raise ValueError("{} has no register(runtime) function".format(module_name))
+
+    module.register(runtime)
+    logging.info("Loaded handler plugin %s", module_name)
+
+    return module
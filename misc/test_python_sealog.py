@@ -18,14 +18,27 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
                 Copyright (C) OceanDataTools.org 2024
 '''
 
+import os
 import sys
+import asyncio
+import tempfile
+
+import requests
 
 from os.path import dirname, realpath
 sys.path.append(dirname(dirname(realpath(__file__))))
 
 from misc.python_sealog.cruises import get_cruises, get_cruise, get_cruise_uid_by_id, get_cruise_by_id, get_cruise_by_lowering, get_cruise_by_event
 from misc.python_sealog.lowerings import get_lowerings, get_lowering, get_lowering_uid_by_id, get_lowering_by_id, get_lowerings_by_cruise, get_lowering_uids_by_cruise, get_lowering_ids_by_cruise, get_lowering_by_event
-from misc.python_sealog.events import get_event, get_events_by_cruise, get_events_by_lowering
+from misc.python_sealog.events import get_event, get_events_by_cruise, get_events_by_lowering, get_events_by_ids, iter_events_by_cruise, iter_events_by_lowering
+from misc.python_sealog import metrics
+from misc.python_sealog.cache import ResponseCache
+from misc.python_sealog.json_stream import iter_json_array
+from misc.python_sealog.resolver import UIDResolver, CRUISE
+from misc.python_sealog.outbox import SealogOutbox, OutboxSender
+from misc.python_sealog.dedup import ExpiringIDSet
+from misc.python_sealog.catchup import EventCatchup
+from misc.python_sealog.event_exports import iter_event_exports_by_cruise, iter_event_exports_by_lowering, get_event_changes_since
 
 CRUISE_UID = '5981f167212b348aed7fa9f5'
 CRUISE_ID = 'AT37-13'
@@ -224,3 +237,183 @@ if get_events_by_lowering(LOWERING_UID, export_format='csv', event_filter=EVENT_
     print('PASS')
 else:
     print('FAIL')
+print("iter_events_by_cruise(CRUISE_UID, page_size=2) ", end='')
+if len(list(iter_events_by_cruise(CRUISE_UID, page_size=2))) == len(get_events_by_cruise(CRUISE_UID)):
+    print('PASS')
+else:
+    print('FAIL')
+print("iter_events_by_lowering(LOWERING_UID, page_size=2) ", end='')
+if len(list(iter_events_by_lowering(LOWERING_UID, page_size=2))) == len(get_events_by_lowering(LOWERING_UID)):
+    print('PASS')
+else:
+    print('FAIL')
+print("get_events_by_ids([EVENT_UID]) ", end='')
+if [event['id'] for event in get_events_by_ids([EVENT_UID])] == [EVENT_UID]:
+    print('PASS')
+else:
+    print('FAIL')
+print("get_events_by_cruise(CRUISE_UID, stream=True) ", end='')
+if list(get_events_by_cruise(CRUISE_UID, stream=True)) == get_events_by_cruise(CRUISE_UID):
+    print('PASS')
+else:
+    print('FAIL')
+print("get_events_by_lowering(LOWERING_UID, stream=True) ", end='')
+if list(get_events_by_lowering(LOWERING_UID, stream=True)) == get_events_by_lowering(LOWERING_UID):
+    print('PASS')
+else:
+    print('FAIL')
+
+print()
+print("Event Exports")
+print("iter_event_exports_by_cruise(CRUISE_UID, page_size=2) ", end='')
+if len(list(iter_event_exports_by_cruise(CRUISE_UID, page_size=2))) == len(get_events_by_cruise(CRUISE_UID)):
+    print('PASS')
+else:
+    print('FAIL')
+print("iter_event_exports_by_lowering(LOWERING_UID, page_size=2, prefetch=False) ", end='')
+if len(list(iter_event_exports_by_lowering(LOWERING_UID, page_size=2, prefetch=False))) == len(get_events_by_lowering(LOWERING_UID)):
+    print('PASS')
+else:
+    print('FAIL')
+print("get_event_changes_since(cursor) ", end='')
+all_changes, changes_cursor = get_event_changes_since()
+if len(get_event_changes_since(changes_cursor)[0]) <= len(all_changes):
+    print('PASS')
+else:
+    print('FAIL')
+
+print()
+print("Metrics")
+print("metrics.snapshot() ", end='')
+metrics.enable()
+get_cruises()
+if any(metric['function'] == 'cruises.get_cruises' and metric['count'] == 1 for metric in metrics.snapshot()):
+    print('PASS')
+else:
+    print('FAIL')
+print("metrics.to_prometheus() ", end='')
+prometheus_family = None
+prometheus_families = []
+prometheus_grouped = True
+for line in metrics.to_prometheus().splitlines():
+    if line.startswith('# TYPE'):
+        prometheus_family = line.split(' ')[2]
+        prometheus_grouped = prometheus_grouped and prometheus_family not in prometheus_families
+        prometheus_families.append(prometheus_family)
+    elif not line.startswith('#'):
+        prometheus_grouped = prometheus_grouped and prometheus_family is not None and line.startswith(prometheus_family)
+if prometheus_grouped and prometheus_families:
+    print('PASS')
+else:
+    print('FAIL')
+metrics.disable()
+
+print()
+print("JSON Stream")
+print("iter_json_array([b'[{\"a\":1}, ', b'{\"b\":2}]']) ", end='')
+if list(iter_json_array([b'[{"a":1}, ', b'{"b":2}]'])) == [{'a': 1}, {'b': 2}]:
+    print('PASS')
+else:
+    print('FAIL')
+print("iter_json_array([b'[{\"a\":1} {\"b\":2}]']) ", end='')
+try:
+    list(iter_json_array([b'[{"a":1} {"b":2}]']))
+    print('FAIL')
+except ValueError:
+    print('PASS')
+
+print()
+print("Response Cache")
+print("ResponseCache.build_key(url, headers={'authorization': token}) ", end='')
+if ResponseCache.build_key('/cruises', headers={'authorization': 'token1'}) != ResponseCache.build_key('/cruises', headers={'authorization': 'token2'}):
+    print('PASS')
+else:
+    print('FAIL')
+print("ResponseCache.conditional_headers(entry) ", end='')
+cached_response = requests.Response()
+cached_response.status_code = 200
+cached_response.url = '/cruises'
+cached_response.headers['ETag'] = '"abc"'
+cached_response._content = b'[]' # pylint: disable=protected-access
+response_cache = ResponseCache(cache_dir=tempfile.mkdtemp())
+cache_key = ResponseCache.build_key('/cruises')
+response_cache.put(cache_key, cached_response)
+if response_cache.conditional_headers(response_cache.get(cache_key)) == {'If-None-Match': '"abc"'} and response_cache.build_response(response_cache.get(cache_key)).json() == []:
+    print('PASS')
+else:
+    print('FAIL')
+
+print()
+print("UID Resolver")
+print("UIDResolver.handle_message(newCruises) ", end='')
+resolver = UIDResolver()
+resolver.attach()
+resolver.put(CRUISE, '', CRUISE_ID, CRUISE_UID)
+resolver.handle_message({'type': 'pub', 'path': '/ws/status/updateCruises', 'message': {'id': CRUISE_UID, 'cruise_id': CRUISE_ID, 'cruise_location': 'Woods Hole'}})
+kept = resolver.get(CRUISE, '', CRUISE_ID) == CRUISE_UID
+resolver.handle_message({'type': 'pub', 'path': '/ws/status/newCruises', 'message': {'id': '5981f167212b348aed7fa9f6', 'cruise_id': CRUISE_ID}})
+if kept and resolver.get(CRUISE, '', CRUISE_ID) is None:
+    print('PASS')
+else:
+    print('FAIL')
+
+print()
+print("Outbox")
+print("OutboxSender.run() ", end='')
+outbox = SealogOutbox(os.path.join(tempfile.mkdtemp(), 'outbox.db'), ['server1', 'server2'])
+for idx in range(3):
+    outbox.append('/ws/status/newEvents', {'id': str(idx)})
+outbox_batches = []
+def send_outbox_batch(batch):
+    outbox_batches.append([message['id'] for _, _, message in batch])
+    return 0 if len(outbox_batches) == 1 else len(batch)
+outbox_sender = OutboxSender(outbox, 'server1', send_outbox_batch, poll_interval=0.01, min_backoff=0.01)
+try:
+    asyncio.run(asyncio.wait_for(outbox_sender.run(), 0.5))
+except asyncio.TimeoutError:
+    pass
+if outbox_batches[:2] == [['0', '1', '2'], ['0', '1', '2']] and outbox_sender.retries == 1 and outbox.pending('server1') == 0 and outbox.pending('server2') == 3:
+    print('PASS')
+else:
+    print('FAIL')
+outbox.close()
+
+print()
+print("Expiring ID Set")
+print("ExpiringIDSet(ttl=10, max_size=2) ", end='')
+id_set_now = [0]
+id_set = ExpiringIDSet(ttl=10, max_size=2, clock=lambda: id_set_now[0])
+for _id in ('a', 'b', 'c'):
+    id_set.add(_id)
+evicted = 'a' not in id_set and 'b' in id_set and 'c' in id_set
+id_set_now[0] = 11
+if evicted and not id_set.pop('b') and len(id_set) == 0 and id_set.stats()['evicted'] == 1 and id_set.stats()['expired'] == 2:
+    print('PASS')
+else:
+    print('FAIL')
+
+print()
+print("Event Catch-up")
+print("EventCatchup.cursor ", end='')
+catchup_file = os.path.join(tempfile.mkdtemp(), 'catchup.json')
+catchup = EventCatchup(catchup_file)
+catchup_events = [
+    {'id': 'event1', 'ts': '2024-03-01T00:00:00.000Z', 'modified_ts': '2024-03-01T00:00:00.000Z'},
+    {'id': 'event2', 'ts': '2024-03-01T00:00:01.000Z', 'modified_ts': '2024-03-01T00:00:01.000Z'}
+]
+catchup_tokens = [catchup.track('/ws/status/newEvents', event) for event in catchup_events if not catchup.seen('/ws/status/newEvents', event)]
+catchup.release(catchup_tokens[1])
+oldest_inflight = catchup.cursor == '2024-03-01T00:00:00.000Z'
+catchup.release(catchup_tokens[0])
+catchup.save()
+reloaded_catchup = EventCatchup(catchup_file)
+if oldest_inflight and reloaded_catchup.cursor == '2024-03-01T00:00:01.000Z':
+    print('PASS')
+else:
+    print('FAIL')
+print("EventCatchup.seen() ", end='')
+updated_event = dict(catchup_events[0], modified_ts='2024-03-01T00:00:02.000Z')
+if all(reloaded_catchup.seen('/ws/status/updateEvents', event) for event in catchup_events) and not reloaded_catchup.seen('/ws/status/updateEvents', updated_event):
+    print('PASS')
+else:
+    print('FAIL')
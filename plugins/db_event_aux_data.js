@@ -2,6 +2,14 @@ const {
   eventAuxDataTable
 } = require('../config/db_constants');
 
+const _initModifiedTS = async (collection) => {
+
+  // records created before modified_ts was tracked are stamped with the
+  // creation time of the record so they can be found by modified_since queries.
+  await collection.updateMany({ modified_ts: { $exists: false } }, [{ $set: { modified_ts: { $toDate: '$_id' } } }]);
+  await collection.createIndex({ modified_ts: 1 });
+};
+
 exports.plugin = {
   name: 'db_populate_event_aux_data',
   dependencies: ['hapi-mongodb'],
@@ -182,6 +190,7 @@ exports.plugin = {
 
     if (result.length) {
       if (process.env.NODE_ENV !== 'development') {
+        await _initModifiedTS(db.collection(eventAuxDataTable));
         console.log('Event Aux Data Collection already exists... we\'re done here.');
         return;
       }
@@ -204,6 +213,8 @@ exports.plugin = {
         console.log('Populating Event Aux Data Collection');
         await collection.insertMany(init_data);
       }
+
+      await _initModifiedTS(collection);
     }
     catch (err) {
       console.log('CREATE ERROR:', err.code);
@@ -2,6 +2,14 @@ const {
   eventsTable
 } = require('../config/db_constants');
 
+const _initModifiedTS = async (collection) => {
+
+  // records created before modified_ts was tracked are stamped with the
+  // event ts so they can be found by modified_since queries.
+  await collection.updateMany({ modified_ts: { $exists: false } }, [{ $set: { modified_ts: '$ts' } }]);
+  await collection.createIndex({ modified_ts: 1 });
+};
+
 exports.plugin = {
   name: 'db_populate_events',
   dependencies: ['hapi-mongodb'],
@@ -69,6 +77,7 @@ exports.plugin = {
 
     if (result.length) {
       if (process.env.NODE_ENV !== 'development') {
+        await _initModifiedTS(db.collection(eventsTable));
         console.log('Events Collection already exists... we\'re done here.');
         return;
       }
@@ -91,6 +100,8 @@ exports.plugin = {
         console.log('Populating Events Collection');
         await collection.insertMany(init_data);
       }
+
+      await _initModifiedTS(collection);
     }
     catch (err) {
       console.log('CREATE ERROR:', err.code);
@@ -35,6 +35,7 @@ const {
 } = require('../../../lib/validations');
 
 const {
+  buildETag,
   rmDir,
   mvFilesToDir
 } = require('../../../lib/utils');
@@ -220,10 +221,10 @@ exports.plugin = {
               const parser = new AsyncParser({ fields: csv_headers }, {}, {});
               const csv_results = await parser.parse(flat_cruises).promise();
 
-              return h.response(csv_results).code(200);
+              return h.response(csv_results).etag(buildETag(csv_results)).code(200);
             }
 
-            return h.response(mod_cruises).code(200);
+            return h.response(mod_cruises).etag(buildETag(mod_cruises)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -323,10 +324,11 @@ exports.plugin = {
               const parser = new AsyncParser({ fields: csv_headers }, {}, {});
               const csv_results = await parser.parse(flat_cruises).promise();
 
-              return h.response(csv_results).code(200);
+              return h.response(csv_results).etag(buildETag(csv_results)).code(200);
             }
 
-            return h.response(_renameAndClearFields(cruise)).code(200);
+            const mod_cruise = _renameAndClearFields(cruise);
+            return h.response(mod_cruise).etag(buildETag(mod_cruise)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -417,10 +419,11 @@ exports.plugin = {
               const parser = new AsyncParser({ fields: csv_headers }, {}, {});
               const csv_results = await parser.parse(flat_cruises).promise();
 
-              return h.response(csv_results).code(200);
+              return h.response(csv_results).etag(buildETag(csv_results)).code(200);
             }
 
-            return h.response(_renameAndClearFields(cruise)).code(200);
+            const mod_cruise = _renameAndClearFields(cruise);
+            return h.response(mod_cruise).etag(buildETag(mod_cruise)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -504,10 +507,11 @@ exports.plugin = {
           const parser = new AsyncParser({ fields: csv_headers }, {}, {});
           const csv_results = await parser.parse(flat_cruises).promise();
 
-          return h.response(csv_results).code(200);
+          return h.response(csv_results).etag(buildETag(csv_results)).code(200);
         }
 
-        return h.response(_renameAndClearFields(cruise)).code(200);
+        const mod_cruise = _renameAndClearFields(cruise);
+        return h.response(mod_cruise).etag(buildETag(mod_cruise)).code(200);
       },
       config: {
         auth: {
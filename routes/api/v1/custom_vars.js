@@ -173,7 +173,7 @@ exports.plugin = {
         try {
           await db.collection(customVarsTable).updateOne(query, { $set: request.payload });
 
-          const custom_var = { id: request.params.id, custom_var_name, custom_var_value: request.payload.custom_var_value };
+          const custom_var = { id: request.params.id, custom_var_name: request.payload.custom_var_name || custom_var_name, custom_var_value: request.payload.custom_var_value };
 
           server.publish('/ws/status/updateCustomVars', custom_var );
 
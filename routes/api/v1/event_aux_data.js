@@ -22,6 +22,8 @@ const {
   databaseInsertResponse,
   auxDataParam,
   auxDataQuery,
+  auxDataBulkPayload,
+  auxDataBulkResponse,
   auxDataCreatePayload,
   auxDataUpdatePayload,
   auxDataSuccessResponse
@@ -45,6 +47,7 @@ exports.plugin = {
     server.subscription('/ws/status/newEventAuxData');
     server.subscription('/ws/status/updateEventAuxData');
     server.subscription('/ws/status/deleteEventAuxData');
+    server.subscription('/ws/status/bulkEventAuxData');
 
     server.route({
       method: 'GET',
@@ -85,6 +88,9 @@ exports.plugin = {
 
         const eventQuery = buildEventsQuery(request, cruise.start_ts, cruise.stop_ts);
 
+        // modified_since applies to the aux_data records, not the events
+        delete eventQuery.modified_ts;
+
         try {
           const results = await db.collection(eventsTable).find(eventQuery, { _id: 1 }).sort( { ts: 1 } ).toArray();
 
@@ -108,6 +114,12 @@ exports.plugin = {
               }
             }
 
+            // Change Filtering
+            if (request.query.modified_since) {
+              query.modified_ts = { $gte: new Date(request.query.modified_since) };
+            }
+
+            // Limiting & Offset
             const limit = (request.query.limit) ? request.query.limit : 0;
             const offset = (request.query.offset) ? request.query.offset : 0;
 
@@ -186,6 +198,9 @@ exports.plugin = {
 
         const eventQuery = buildEventsQuery(request, lowering.start_ts, lowering.stop_ts);
 
+        // modified_since applies to the aux_data records, not the events
+        delete eventQuery.modified_ts;
+
         try {
           const results = await db.collection(eventsTable).find(eventQuery, { _id: 1 }).sort( { ts: 1 } ).toArray();
 
@@ -208,6 +223,11 @@ exports.plugin = {
               }
             }
 
+            // Change Filtering
+            if (request.query.modified_since) {
+              query.modified_ts = { $gte: new Date(request.query.modified_since) };
+            }
+
             // Limiting & Offset
             const limit = (request.query.limit) ? request.query.limit : 0;
             const offset = (request.query.offset) ? request.query.offset : 0;
@@ -274,6 +294,9 @@ exports.plugin = {
 
           const eventQuery = buildEventsQuery(request);
 
+          // modified_since applies to the aux_data records, not the events
+          delete eventQuery.modified_ts;
+
           try {
             const results = await db.collection(eventsTable).find(eventQuery, { _id: 1 }).sort( { ts: 1 } ).toArray();
 
@@ -297,6 +320,12 @@ exports.plugin = {
                 }
               }
 
+              // Change Filtering
+              if (request.query.modified_since) {
+                query.modified_ts = { $gte: new Date(request.query.modified_since) };
+              }
+
+              // Limiting & Offset
               const limit = (request.query.limit) ? request.query.limit : 0;
               const offset = (request.query.offset) ? request.query.offset : 0;
 
@@ -353,6 +382,11 @@ exports.plugin = {
             }
           }
 
+          // Change Filtering
+          if (request.query.modified_since) {
+            query.modified_ts = { $gte: new Date(request.query.modified_since) };
+          }
+
           // Limiting & Offset
           const limit = (request.query.limit) ? request.query.limit : 0;
           const offset = (request.query.offset) ? request.query.offset : 0;
@@ -448,6 +482,7 @@ exports.plugin = {
         const ObjectID = server.mongo.ObjectID;
 
         const event_aux_data = request.payload;
+        event_aux_data.modified_ts = new Date();
 
         // If payload includes a valid _id, try to insert/update
         if (request.payload.id) {
@@ -576,6 +611,123 @@ exports.plugin = {
       }
     });
 
+    server.route({
+      method: 'POST',
+      path: '/event_aux_data/bulk',
+      async handler(request, h) {
+
+        const db = server.mongo.db;
+        const ObjectID = server.mongo.ObjectID;
+
+        const modified_ts = new Date();
+        let records = [];
+
+        try {
+          records = request.payload.map((record) => {
+
+            const event_aux_data = { ...record, event_id: new ObjectID(record.event_id), modified_ts };
+
+            if (record.id) {
+              event_aux_data._id = new ObjectID(record.id);
+              delete event_aux_data.id;
+            }
+
+            return event_aux_data;
+          });
+        }
+        catch (err) {
+          return Boom.badRequest('id must be a single String of 12 bytes or a string of 24 hex characters');
+        }
+
+        // timestamps of the referenced events, records for missing events are skipped
+        const event_ts = {};
+
+        try {
+          const event_ids = [...new Set(records.map((record) => record.event_id.toString()))].map((event_id) => new ObjectID(event_id));
+          const events = await db.collection(eventsTable).find({ _id: { $in: event_ids } }, { projection: { ts: 1 } }).toArray();
+
+          events.forEach((event) => {
+
+            event_ts[event._id.toString()] = event.ts;
+          });
+        }
+        catch (err) {
+          return Boom.serverUnavailable('ERROR find events:', err);
+        }
+
+        const valid_records = records.filter((record) => event_ts[record.event_id.toString()] !== undefined);
+
+        if (valid_records.length === 0) {
+          return h.response({ insertedCount: 0, updatedCount: 0, skippedCount: records.length }).code(200);
+        }
+
+        const operations = valid_records.map((record) => {
+
+          const { _id, ...event_aux_data } = record;
+          const filter = (_id) ? { _id } : { event_id: record.event_id, data_source: record.data_source };
+
+          return { updateOne: { filter, update: { $set: event_aux_data }, upsert: true } };
+        });
+
+        let result = null;
+
+        try {
+          result = await db.collection(eventAuxDataTable).bulkWrite(operations, { ordered: false });
+        }
+        catch (err) {
+          return Boom.serverUnavailable('database error', err);
+        }
+
+        // notify live clients of new aux_data for recent events the same way
+        // the single record route does.
+        Object.entries(result.upsertedIds).forEach(([index, id]) => {
+
+          const event_aux_data = { ...valid_records[index], id };
+          delete event_aux_data._id;
+
+          const diff = (new Date().getTime() - event_ts[event_aux_data.event_id.toString()].getTime()) / 1000;
+
+          if (Math.abs(Math.round(diff)) < THRESHOLD) {
+            server.publish('/ws/status/newEventAuxData', event_aux_data);
+          }
+        });
+
+        const response = {
+          insertedCount: result.upsertedCount,
+          updatedCount: result.modifiedCount,
+          skippedCount: records.length - valid_records.length
+        };
+
+        server.publish('/ws/status/bulkEventAuxData', { ...response, event_ids: [...new Set(valid_records.map((record) => record.event_id.toString()))] });
+
+        return h.response(response).code(200);
+      },
+      config: {
+        auth: {
+          strategy: 'jwt',
+          scope: ['admin', 'write_events']
+        },
+        validate: {
+          headers: authorizationHeader,
+          payload: auxDataBulkPayload,
+          failAction: (request, h, err) => {
+
+            throw Boom.badRequest(err.message);
+          }
+        },
+        response: {
+          status: {
+            200: auxDataBulkResponse
+          }
+        },
+        description: 'Create or update up to 1000 event_aux_data records',
+        notes: '<p>Requires authorization via: <strong>JWT token</strong></p>\
+          <p>Available to: <strong>admin</strong>, <strong>event_manager</strong> or <strong>event_logger</strong></p>\
+          <p>Records are matched by id, or by event_id and data_source, and inserted if no match is found.  Records for unknown events are skipped.  One message per request is published to /ws/status/bulkEventAuxData.</p>',
+        tags: ['event_aux_data','api']
+      }
+    });
+
     server.route({
       method: 'PATCH',
       path: '/event_aux_data/{id}',
@@ -641,6 +793,8 @@ exports.plugin = {
           });
         }
 
+        event_aux_data.modified_ts = new Date();
+
         try {
           await db.collection(eventAuxDataTable).updateOne( query, { $set: event_aux_data } );
           return h.response().code(204);
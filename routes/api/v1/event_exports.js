@@ -2,6 +2,7 @@ const Boom = require('@hapi/boom');
 const { AsyncParser } = require('@json2csv/node');
 
 const {
+  addAuxDataChangesToQuery,
   addEventRecordIDs,
   flattenEventObjs,
   buildEventCSVHeaders,
@@ -75,6 +76,15 @@ exports.plugin = {
         }
 
         const query = buildEventsQuery(request, cruise.start_ts, cruise.stop_ts);
+
+        try {
+          await addAuxDataChangesToQuery(request, query);
+        }
+        catch (err) {
+          console.log(err);
+          return Boom.serverUnavailable('database error');
+        }
+
         const offset = (request.query.offset) ? request.query.offset : 0;
 
         const lookup = {
@@ -86,18 +96,20 @@ exports.plugin = {
 
         const aggregate = [];
         aggregate.push({ $match: query });
-        aggregate.push({ $lookup: lookup });
-        aggregate.push({ $sort: { ts: 1 } });
+        aggregate.push({ $sort: { ts: 1, _id: 1 } });
+        aggregate.push({ $skip: offset });
 
         if (request.query.limit) {
           aggregate.push({ $limit: request.query.limit });
         }
 
+        aggregate.push({ $lookup: lookup });
+
         // console.log("aggregate:", aggregate);
         let results = [];
 
         try {
-          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).skip(offset).toArray();
+          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).toArray();
         }
         catch (err) {
           console.log(err);
@@ -217,6 +229,15 @@ exports.plugin = {
         }
 
         const query = buildEventsQuery(request, lowering.start_ts, lowering.stop_ts);
+
+        try {
+          await addAuxDataChangesToQuery(request, query);
+        }
+        catch (err) {
+          console.log(err);
+          return Boom.serverUnavailable('database error');
+        }
+
         const offset = (request.query.offset) ? request.query.offset : 0;
 
         const lookup = {
@@ -228,18 +249,20 @@ exports.plugin = {
 
         const aggregate = [];
         aggregate.push({ $match: query });
-        aggregate.push({ $lookup: lookup });
-        aggregate.push({ $sort: { ts: 1 } });
+        aggregate.push({ $sort: { ts: 1, _id: 1 } });
+        aggregate.push({ $skip: offset });
 
         if (request.query.limit) {
           aggregate.push({ $limit: request.query.limit });
         }
 
+        aggregate.push({ $lookup: lookup });
+
         // console.log("aggregate:", aggregate);
         let results = [];
 
         try {
-          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).skip(offset).toArray();
+          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).toArray();
         }
         catch (err) {
           console.log(err);
@@ -356,6 +379,15 @@ exports.plugin = {
           }
 
           const query = buildEventsQuery(request);
+
+          try {
+            await addAuxDataChangesToQuery(request, query);
+          }
+          catch (err) {
+            console.log(err);
+            return Boom.serverUnavailable('database error');
+          }
+
           query._id = { $in: eventIDs };
           const offset = (request.query.offset) ? request.query.offset : 0;
 
@@ -368,15 +400,17 @@ exports.plugin = {
 
           const aggregate = [];
           aggregate.push({ $match: query });
-          aggregate.push({ $lookup: lookup });
-          aggregate.push({ $sort: { ts: 1 } });
+          aggregate.push({ $sort: { ts: 1, _id: 1 } });
+          aggregate.push({ $skip: offset });
 
           if (request.query.limit) {
             aggregate.push({ $limit: request.query.limit });
           }
 
+          aggregate.push({ $lookup: lookup });
+
           try {
-            const results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).skip(offset).toArray();
+            const results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).toArray();
 
             if (results.length > 0) {
               results.forEach(_renameAndClearFields);
@@ -394,6 +428,15 @@ exports.plugin = {
         else {
 
           const query = buildEventsQuery(request);
+
+          try {
+            await addAuxDataChangesToQuery(request, query);
+          }
+          catch (err) {
+            console.log(err);
+            return Boom.serverUnavailable('database error');
+          }
+
           const offset = (request.query.offset) ? request.query.offset : 0;
 
           const lookup = {
@@ -405,17 +448,19 @@ exports.plugin = {
 
           const aggregate = [];
           aggregate.push({ $match: query });
-          aggregate.push({ $lookup: lookup });
-          aggregate.push({ $sort: { ts: 1 } });
+          aggregate.push({ $sort: { ts: 1, _id: 1 } });
+          aggregate.push({ $skip: offset });
 
           if (request.query.limit) {
             aggregate.push({ $limit: request.query.limit });
           }
 
+          aggregate.push({ $lookup: lookup });
+
           // console.log("aggregate:", aggregate);
 
           try {
-            let results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).skip(offset).toArray();
+            let results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).toArray();
 
             if (results.length > 0) {
               results.forEach(_renameAndClearFields);
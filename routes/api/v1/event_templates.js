@@ -14,6 +14,10 @@ const {
   eventTemplateUpdatePayload
 } = require('../../../lib/validations');
 
+const {
+  buildETag
+} = require('../../../lib/utils');
+
 const _renameAndClearFields = (doc, admin = false) => {
 
   //rename id
@@ -65,7 +69,7 @@ exports.plugin = {
               return _renameAndClearFields(result, request.auth.credentials.scope.includes('admin'));
             });
 
-            return h.response(results).code(200);
+            return h.response(results).etag(buildETag(results)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -121,7 +125,8 @@ exports.plugin = {
             return Boom.notFound('No record found for id: ' + request.params.id);
           }
 
-          return h.response(_renameAndClearFields(result, request.auth.credentials.scope.includes('admin'))).code(200);
+          const mod_event_template = _renameAndClearFields(result, request.auth.credentials.scope.includes('admin'));
+          return h.response(mod_event_template).etag(buildETag(mod_event_template)).code(200);
         }
         catch (err) {
           console.log(err);
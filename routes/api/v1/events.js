@@ -16,6 +16,7 @@ const {
 
 const {
   authorizationHeader,
+  eventIDsPayload,
   eventParam,
   eventQuery,
   eventCountSuccessResponse,
@@ -90,7 +91,7 @@ exports.plugin = {
         const query = buildEventsQuery(request, cruise.start_ts, cruise.stop_ts);
         const limit = (request.query.limit) ? request.query.limit : 0;
         const offset = (request.query.offset) ? request.query.offset : 0;
-        const sort = (request.query.sort === 'newest') ? { ts: -1 } : { ts: 1 };
+        const sort = (request.query.sort === 'newest') ? { ts: -1, _id: -1 } : { ts: 1, _id: 1 };
 
         let results = [];
 
@@ -332,7 +333,7 @@ exports.plugin = {
         const query = buildEventsQuery(request, lowering.start_ts, lowering.stop_ts);
         const limit = (request.query.limit) ? request.query.limit : 0;
         const offset = (request.query.offset) ? request.query.offset : 0;
-        const sort = (request.query.sort === 'newest') ? { ts: -1 } : { ts: 1 };
+        const sort = (request.query.sort === 'newest') ? { ts: -1, _id: -1 } : { ts: 1, _id: 1 };
 
         let results = [];
 
@@ -587,7 +588,7 @@ exports.plugin = {
           query._id = datasourceIDs;
           const limit = (request.query.limit) ? request.query.limit : 0;
           const offset = (request.query.offset) ? request.query.offset : 0;
-          const sort = (request.query.sort === 'newest') ? { ts: -1 } : { ts: 1 };
+          const sort = (request.query.sort === 'newest') ? { ts: -1, _id: -1 } : { ts: 1, _id: 1 };
 
           try {
             const results = await db.collection(eventsTable).find(query).sort(sort).skip(offset).limit(limit).toArray();
@@ -612,7 +613,7 @@ exports.plugin = {
           const query = buildEventsQuery(request);
           const limit = (request.query.limit) ? request.query.limit : 0;
           const offset = (request.query.offset) ? request.query.offset : 0;
-          const sort = (request.query.sort === 'newest') ? { ts: -1 } : { ts: 1 };
+          const sort = (request.query.sort === 'newest') ? { ts: -1, _id: -1 } : { ts: 1, _id: 1 };
 
           try {
             let results = await db.collection(eventsTable).find(query).sort(sort).skip(offset).limit(limit).toArray();
@@ -824,6 +825,79 @@ exports.plugin = {
       }
     });
 
+    server.route({
+      method: 'POST',
+      path: '/events/byids',
+      async handler(request, h) {
+
+        const db = request.mongo.db;
+        const ObjectID = request.mongo.ObjectID;
+
+        let query = {};
+
+        try {
+          query = { _id: { $in: request.payload.ids.map((id) => new ObjectID(id)) } };
+        }
+        catch (err) {
+          return Boom.badRequest('ids must be strings of 24 hex characters');
+        }
+
+        try {
+          let results = await db.collection(eventsTable).find(query).sort({ ts: 1, _id: 1 }).toArray();
+
+          if (results.length === 0) {
+            return Boom.notFound('No records found');
+          }
+
+          results = results.map(_renameAndClearFields);
+
+          if (request.query.add_record_ids) {
+            results = await addEventRecordIDs(request, results);
+          }
+
+          if (request.query.format && request.query.format === 'csv') {
+            const flat_events = flattenEventObjs(results);
+            const csv_headers = buildEventCSVHeaders(flat_events);
+            const parser = new AsyncParser({ fields: csv_headers }, {}, {});
+            const csv_results = await parser.parse(flat_events).promise();
+
+            return h.response(csv_results).code(200);
+          }
+
+          return h.response(results).code(200);
+        }
+        catch (err) {
+          console.log(err);
+          return Boom.serverUnavailable('database error');
+        }
+      },
+      config: {
+        auth: {
+          strategy: 'jwt',
+          scope: ['admin', 'read_events']
+        },
+        validate: {
+          headers: authorizationHeader,
+          payload: eventIDsPayload,
+          query: eventSingleQuery,
+          failAction: (request, h, err) => {
+
+            throw Boom.badRequest(err.message);
+          }
+        },
+        response: {
+          status: {
+            200: eventSuccessResponse
+          }
+        },
+        description: 'Return the events with the given event ids',
+        notes: '<p>Requires authorization via: <strong>JWT token</strong></p>\
+          <p>Available to: <strong>admin</strong>, <strong>event_manager</strong>, <strong>event_logger</strong> or <strong>event_watcher</strong></p>\
+          <p>Returns at most 1000 events per request, ordered by timestamp.  Unknown ids are ignored.</p>',
+        tags: ['events','api']
+      }
+    });
+
     server.route({
       method: 'POST',
       path: '/events',
@@ -869,6 +943,8 @@ exports.plugin = {
           event.event_free_text = '';
         }
 
+        event.modified_ts = new Date();
+
         if (!event.event_author) {
           try {
             const result = await db.collection(usersTable).findOne({ _id: new ObjectID(request.auth.credentials.id) });
@@ -996,6 +1072,8 @@ exports.plugin = {
           event.ts = new Date(event.ts);
         }
 
+        event.modified_ts = new Date();
+
         try {
           // const result = await db.collection(eventsTable).findOneAndUpdate(query, { $set: request.payload },{ returnDocument: 'after' });
           const result = await db.collection(eventsTable).findOneAndUpdate(query, { $set: event },{ returnDocument: 'after' });
@@ -1098,7 +1176,7 @@ exports.plugin = {
           query._id = datasourceIDs;
           const limit = (request.query.limit) ? request.query.limit : 0;
           const offset = (request.query.offset) ? request.query.offset : 0;
-          const sort = (request.query.sort === 'newest') ? { ts: -1 } : { ts: 1 };
+          const sort = (request.query.sort === 'newest') ? { ts: -1, _id: -1 } : { ts: 1, _id: 1 };
 
           let eventIDs = [];
 
@@ -1143,7 +1221,7 @@ exports.plugin = {
           const query = buildEventsQuery(request);
           const limit = (request.query.limit) ? request.query.limit : 0;
           const offset = (request.query.offset) ? request.query.offset : 0;
-          const sort = (request.query.sort === 'newest') ? { ts: -1 } : { ts: 1 };
+          const sort = (request.query.sort === 'newest') ? { ts: -1, _id: -1 } : { ts: 1, _id: 1 };
 
           let eventIDs = [];
 
@@ -21,6 +21,7 @@ const {
 } = require('../../../config/db_constants');
 
 const {
+  buildETag,
   rmDir,
   mvFilesToDir
 } = require('../../../lib/utils');
@@ -211,10 +212,10 @@ exports.plugin = {
               const parser = new AsyncParser({ fields: csv_headers }, {}, {});
               const csv_results = await parser.parse(flat_lowerings).promise();
 
-              return h.response(csv_results).code(200);
+              return h.response(csv_results).etag(buildETag(csv_results)).code(200);
             }
 
-            return h.response(mod_lowerings).code(200);
+            return h.response(mod_lowerings).etag(buildETag(mod_lowerings)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -358,10 +359,10 @@ exports.plugin = {
               const parser = new AsyncParser({ fields: csv_headers }, {}, {});
               const csv_results = await parser.parse(flat_lowerings).promise();
 
-              return h.response(csv_results).code(200);
+              return h.response(csv_results).etag(buildETag(csv_results)).code(200);
             }
 
-            return h.response(mod_lowerings).code(200);
+            return h.response(mod_lowerings).etag(buildETag(mod_lowerings)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -452,10 +453,11 @@ exports.plugin = {
               const parser = new AsyncParser({ fields: csv_headers }, {}, {});
               const csv_results = await parser.parse(flat_lowerings).promise();
 
-              return h.response(csv_results).code(200);
+              return h.response(csv_results).etag(buildETag(csv_results)).code(200);
             }
 
-            return h.response(_renameAndClearFields(lowering)).code(200);
+            const mod_lowering = _renameAndClearFields(lowering);
+            return h.response(mod_lowering).etag(buildETag(mod_lowering)).code(200);
           }
 
           return Boom.notFound('No records found');
@@ -539,10 +541,11 @@ exports.plugin = {
           const parser = new AsyncParser({ fields: csv_headers }, {}, {});
           const csv_results = await parser.parse(flat_lowerings).promise();
 
-          return h.response(csv_results).code(200);
+          return h.response(csv_results).etag(buildETag(csv_results)).code(200);
         }
 
-        return h.response(_renameAndClearFields(lowering)).code(200);
+        const mod_lowering = _renameAndClearFields(lowering);
+        return h.response(mod_lowering).etag(buildETag(mod_lowering)).code(200);
       },
       config: {
         auth: {